@@ -0,0 +1,289 @@
+import os
+import argparse
+import random
+import itertools
+from bisect import bisect
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+from dotenv import load_dotenv
+from pymongo import MongoClient, errors
+
+load_dotenv()
+
+uri = os.getenv("MONGO_URI")
+
+# Generador de datos sintéticos para pruebas de carga.
+# Uso (desde la raíz del repo):
+#   python DataBase/generate.py --brands 200 --clothing 20000 --users 100000 --sales 10000000 --seed 42
+# Con la misma semilla y los mismos parámetros se generan exactamente los mismos documentos,
+# sin importar la cantidad de procesos.
+
+COLECCIONES = ['brands', 'clothing', 'users', 'sales']
+
+PAISES = ['Costa Rica', 'USA', 'México', 'España', 'Colombia', 'Argentina', 'Chile', 'Panamá']
+
+CIUDADES = {
+    'Costa Rica': ['San José', 'Heredia', 'Alajuela', 'Cartago', 'Liberia'],
+    'USA': ['New York', 'Miami', 'Los Angeles', 'Chicago'],
+    'México': ['CDMX', 'Guadalajara', 'Monterrey'],
+    'España': ['Madrid', 'Barcelona', 'Valencia'],
+    'Colombia': ['Bogotá', 'Medellín', 'Cali'],
+    'Argentina': ['Buenos Aires', 'Córdoba', 'Rosario'],
+    'Chile': ['Santiago', 'Valparaíso'],
+    'Panamá': ['Ciudad de Panamá', 'David'],
+}
+
+NOMBRES = ['Ana', 'Carlos', 'María', 'José', 'Lucía', 'Diego', 'Sofía', 'Andrés', 'Valeria', 'Gabriel', 'Camila', 'Luis']
+
+APELLIDOS = ['Jiménez', 'Rodríguez', 'Mora', 'Vargas', 'Solano', 'Rojas', 'Castro', 'Herrera', 'Chaves', 'Araya']
+
+CATEGORIAS = ['T-Shirts', 'Pants', 'Outerwear', 'Shoes', 'Dresses', 'Accessories', 'Sportswear', 'Underwear']
+
+COLORES = ['Black', 'White', 'Blue', 'Red', 'Green', 'Gray', 'Beige', 'Pink']
+
+TALLAS = ['XS', 'S', 'M', 'L', 'XL']
+
+PALABRAS_MARCA = ['Urban', 'Style', 'Wear', 'Tico', 'Nova', 'Pura', 'Vida', 'Norte', 'Sol', 'Loom', 'Thread', 'Denim']
+
+def main():
+    args = leer_argumentos()
+
+    client = MongoClient(uri)
+
+    db = client.get_default_database('clothing-store-db')
+
+    try:
+
+        if args.drop:
+
+            print('\n--- LIMPIEZA ---')
+
+            for nombre in COLECCIONES:
+
+                db[nombre].drop()
+
+            print("🗑️ Colecciones brands, clothing, users y sales eliminadas.")
+
+        config = {
+            'seed': args.seed,
+            'brands': args.brands,
+            'clothing': args.clothing,
+            'users': args.users,
+            'skew': args.skew,
+            'desde': args.desde,
+            'hasta': args.hasta,
+        }
+
+        totales = {'brands': args.brands, 'clothing': args.clothing, 'users': args.users, 'sales': args.sales}
+
+        with Pool(args.workers, initializer=iniciar_proceso, initargs=(config,)) as pool:
+
+            for nombre in COLECCIONES:
+
+                print(f'\n--- GENERAR {nombre.upper()} ({totales[nombre]}) ---')
+
+                tareas = [(nombre, inicio, min(args.batch, totales[nombre] - inicio)) for inicio in range(0, totales[nombre], args.batch)]
+
+                insertados = 0
+
+                duplicados = 0
+
+                for i, (ok, dup) in enumerate(pool.imap_unordered(escribir_lote, tareas), 1):
+
+                    insertados += ok
+
+                    duplicados += dup
+
+                    if i % 100 == 0 or i == len(tareas):
+
+                        print(f"   • {insertados + duplicados}/{totales[nombre]} documentos")
+
+                print(f"✔️ {insertados} {nombre} insertados." + (f" ⚠️ {duplicados} ya existían." if duplicados else ""))
+
+        print('\n--- ROLLUPS ---')
+
+        print("⚠️ Reconstruir los rollups de reportes: flask --app run rollups rebuild (desde api/v1)")
+
+    except Exception as e:
+
+        print("\n❌ Error generando datos:", e)
+
+    finally:
+
+        client.close()
+
+        print("\n🔒 Conexión cerrada.")
+
+# Rango de fechas por defecto: fijo para que la misma semilla genere las mismas ventas cualquier día
+DESDE_POR_DEFECTO = datetime(2024, 1, 1)
+
+HASTA_POR_DEFECTO = datetime(2025, 1, 1)
+
+def leer_argumentos():
+    parser = argparse.ArgumentParser(description='Genera datos sintéticos para clothing-store-db.')
+
+    parser.add_argument('--brands', type=int, default=50)
+
+    parser.add_argument('--clothing', type=int, default=2000)
+
+    parser.add_argument('--users', type=int, default=10000)
+
+    parser.add_argument('--sales', type=int, default=100000)
+
+    parser.add_argument('--from', dest='desde', type=datetime.fromisoformat, default=DESDE_POR_DEFECTO)
+
+    parser.add_argument('--to', dest='hasta', type=datetime.fromisoformat, default=HASTA_POR_DEFECTO)
+
+    parser.add_argument('--skew', type=float, default=1.1, help='Exponente Zipf de popularidad de marcas y prendas (0 = uniforme)')
+
+    parser.add_argument('--seed', type=int, default=42)
+
+    parser.add_argument('--batch', type=int, default=5000, help='Documentos por insert_many')
+
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+
+    parser.add_argument('--drop', action='store_true', help='Eliminar las colecciones antes de generar')
+
+    args = parser.parse_args()
+
+    if min(args.brands, args.clothing, args.users) < 1 or args.sales < 0 or args.batch < 1 or args.desde >= args.hasta:
+
+        parser.error('cantidades, --batch o rango de fechas inválidos')
+
+    return args
+
+# --- Procesos de trabajo ---
+
+# Estado por proceso: cliente propio (MongoClient no se comparte entre procesos) y tablas de popularidad
+_client = None
+
+_config = None
+
+_popularidad = {}
+
+def iniciar_proceso(config):
+    global _client, _config
+
+    _client = MongoClient(uri)
+
+    _config = config
+
+    # Las tablas dependen solo de la semilla: todos los procesos calculan las mismas
+    _popularidad['brands'] = pesos_zipf(config['brands'], config['skew'], random.Random(f"{config['seed']}:brands"))
+
+    _popularidad['clothing'] = pesos_zipf(config['clothing'], config['skew'], random.Random(f"{config['seed']}:clothing"))
+
+def pesos_zipf(n, s, rng):
+
+    # Peso 1/rango^s con los rangos barajados, para que las más populares no sean siempre los primeros ids.
+    # Devuelve los pesos acumulados para elegir con bisect.
+
+    rangos = list(range(1, n + 1))
+
+    rng.shuffle(rangos)
+
+    return list(itertools.accumulate(1 / r ** s for r in rangos))
+
+def elegir(acumulados, rng):
+    return bisect(acumulados, rng.random() * acumulados[-1], hi=len(acumulados) - 1)
+
+def escribir_lote(tarea):
+    nombre, inicio, cantidad = tarea
+
+    # Cada lote tiene su propio generador: el resultado no depende del orden ni del proceso que lo ejecute
+    rng = random.Random(f"{_config['seed']}:{nombre}:{inicio}")
+
+    generar = GENERADORES[nombre]
+
+    docs = [generar(inicio + i, rng) for i in range(cantidad)]
+
+    db = _client.get_default_database('clothing-store-db')
+
+    try:
+
+        result = db[nombre].insert_many(docs, ordered=False)
+
+        return len(result.inserted_ids), 0
+
+    except errors.BulkWriteError as e:
+
+        # Volver a correr con la misma semilla choca con los _id existentes: se cuentan y se sigue
+        duplicados = sum(1 for err in e.details.get('writeErrors', []) if err.get('code') == 11000)
+
+        if duplicados != len(e.details.get('writeErrors', [])):
+
+            raise
+
+        return e.details.get('nInserted', 0), duplicados
+
+def id_marca(n):
+    return f'genbrand{n:06d}'
+
+def id_prenda(n):
+    return f'gencloth{n:07d}'
+
+def id_usuario(n):
+    return f'genuser{n:08d}'
+
+def generar_marca(n, rng):
+    return {
+        '_id': id_marca(n),
+        'name': f"{rng.choice(PALABRAS_MARCA)}{rng.choice(PALABRAS_MARCA)} {n}",
+        'country': rng.choice(PAISES),
+        'founded': rng.randint(1950, 2024),
+    }
+
+def generar_prenda(n, rng):
+    categoria = rng.choice(CATEGORIAS)
+
+    return {
+        '_id': id_prenda(n),
+        'name': f"{rng.choice(COLORES)} {categoria} {n}",
+        'category': categoria,
+        'price': round(rng.uniform(5, 250), 2),
+        'size': sorted(rng.sample(TALLAS, rng.randint(1, len(TALLAS))), key=TALLAS.index),
+        'color': rng.choice(COLORES),
+        'brand_id': id_marca(elegir(_popularidad['brands'], rng)),
+        'in_stock': rng.randint(0, 500),
+    }
+
+def generar_usuario(n, rng):
+    nombre = rng.choice(NOMBRES)
+
+    apellido = rng.choice(APELLIDOS)
+
+    pais = rng.choice(PAISES)
+
+    return {
+        '_id': id_usuario(n),
+        'name': f'{nombre} {apellido}',
+        'email': f'{nombre.lower()}.{apellido.lower()}{n}@example.com',
+        'password': f'hashed{n}',
+        'address': {'city': rng.choice(CIUDADES[pais]), 'country': pais},
+        'orders': [],
+    }
+
+def generar_venta(n, rng):
+    desde = _config['desde']
+
+    segundos = (_config['hasta'] - desde).total_seconds()
+
+    return {
+        '_id': f'gensale{n:09d}',
+        'user_id': id_usuario(rng.randrange(_config['users'])),
+        'clothing_id': id_prenda(elegir(_popularidad['clothing'], rng)),
+        # Pocas unidades por venta, con cola larga
+        'quantity': min(1 + int(rng.expovariate(0.8)), 10),
+        'date': desde + timedelta(seconds=int(rng.random() * segundos)),
+    }
+
+GENERADORES = {
+    'brands': generar_marca,
+    'clothing': generar_prenda,
+    'users': generar_usuario,
+    'sales': generar_venta,
+}
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,104 @@
+import os
+from dotenv import load_dotenv
+from pymongo import MongoClient, ReplaceOne, DeleteOne
+
+load_dotenv()
+
+uri = os.getenv("MONGO_URI")
+client = MongoClient(uri)
+
+# Referencias entre colecciones que deben quedar como string
+REFERENCIAS = {
+    'clothing': ['brand_id'],
+    'sales': ['user_id', 'clothing_id'],
+}
+
+LOTE = 1000
+
+def main():
+    print("\n➡️ Conectando a la base de datos...")
+
+    db = client.get_default_database('clothing-store-db')
+
+    try:
+
+        for nombre in ['brands', 'clothing', 'users', 'sales']:
+
+            print(f'\n--- NORMALIZAR _id DE {nombre.upper()} ---')
+
+            migrados = normalize_ids(db[nombre])
+
+            print(f"✔️ {migrados} documentos con _id ObjectId pasados a string.")
+
+        for nombre, campos in REFERENCIAS.items():
+
+            print(f'\n--- NORMALIZAR REFERENCIAS DE {nombre.upper()} ---')
+
+            for campo in campos:
+
+                result = db[nombre].update_many(
+
+                    {campo: {'$type': 'objectId'}},
+
+                    [{'$set': {campo: {'$toString': f'${campo}'}}}]
+
+                )
+
+                print(f"✔️ {nombre}.{campo}: {result.modified_count} referencias pasadas a string.")
+
+        print('\n--- ÍNDICES ---')
+
+        db.sales.create_index('clothing_id')
+
+        db.clothing.create_index('brand_id')
+
+        print("✔️ Índices sales.clothing_id y clothing.brand_id creados.")
+
+    except Exception as e:
+
+        print("\n❌ Error en la migración:", e)
+
+    finally:
+
+        client.close()
+
+        print("\n🔒 Conexión cerrada.")
+
+def normalize_ids(coleccion):
+
+    # El _id es inmutable: se reemplaza cada documento por una copia con _id string.
+    # ReplaceOne con upsert hace que la migración se pueda repetir si se interrumpe.
+
+    total = 0
+
+    operaciones = []
+
+    for doc in coleccion.find({'_id': {'$type': 'objectId'}}):
+
+        viejo = doc['_id']
+
+        doc['_id'] = str(viejo)
+
+        operaciones.append(ReplaceOne({'_id': doc['_id']}, doc, upsert=True))
+
+        operaciones.append(DeleteOne({'_id': viejo}))
+
+        if len(operaciones) >= LOTE:
+
+            coleccion.bulk_write(operaciones, ordered=True)
+
+            total += len(operaciones) // 2
+
+            operaciones = []
+
+    if operaciones:
+
+        coleccion.bulk_write(operaciones, ordered=True)
+
+        total += len(operaciones) // 2
+
+    return total
+
+if __name__ == "__main__":
+
+    main()
@@ -7,7 +7,8 @@
  *   - users: { address: { city, country }, email, name, orders: [], password }
  *
  * - También incluye selects dinámicos: marcas en prenda, usuarios y prendas en venta.
- * - Paginación cliente: 10 items por página.
+ *   Cargan los primeros SELECT_LIMIT por nombre y se filtran escribiendo en el buscador (/search).
+ * - Paginación en servidor (keyset): 10 items por página, navegando con ?limit=&after=<cursor>.
  */
 
 const BASE_API = 'http://127.0.0.1:5000/api/v1/admin';
@@ -16,9 +17,13 @@ const URLS = {
   clothing: `${BASE_API}/clothing`,
   users: `${BASE_API}/users`,
   sales: `${BASE_API}/sales`,
-  reports: `${BASE_API}/reports`
+  reports: `${BASE_API}/reports`,
+  search: `${BASE_API}/search`
 };
 const PER_PAGE = 10;
+// nombres de usuario y prenda resueltos en el servidor para la tabla de ventas
+const PAGE_EXPAND = { sales: '&expand=user,clothing' };
+const SELECT_LIMIT = 50;
 
 /* helpers */
 const $ = id => document.getElementById(id);
@@ -49,13 +54,19 @@ async function apiDeleteSmart(base, id){
   try { return await apiDelete(`${base}/${id}`); } catch(e){ return await apiDelete(`${base}?id=${id}`); }
 }
 
-/* state & pagination */
+/* state & pagination
+ * items: documentos de la página actual; cursors: pila con el cursor "after" de cada página visitada;
+ * next: cursor de la página siguiente (null si es la última); total: conteo estimado del servidor.
+ */
+const newPageState = () => ({ items: [], page: 1, cursors: [null], next: null, total: null });
 const state = {
-  brands: { items: [], page: 1 },
-  clothing: { items: [], page: 1 },
-  users: { items: [], page: 1 },
-  sales: { items: [], page: 1 }
+  brands: newPageState(),
+  clothing: newPageState(),
+  users: newPageState(),
+  sales: newPageState()
 };
+/* listas completas usadas por los selects de los formularios */
+const selectData = { brands: [], clothing: [], users: [] };
 
 /* tab navigation */
 document.querySelectorAll('#mainTabs button').forEach(btn=>{
@@ -109,6 +120,11 @@ document.addEventListener('DOMContentLoaded', ()=>{
   $('users-prev').addEventListener('click', () => changePage('users', -1));
   $('users-next').addEventListener('click', () => changePage('users', 1));
 
+  // Buscadores de los selects
+  wireSearchSelect('clothing-brand_id-search', 'clothing-brand_id', 'brands', fillBrandSelect);
+  wireSearchSelect('sale-user_id-search', 'sale-user_id', 'users', fillUserSelect);
+  wireSearchSelect('sale-clothing_id-search', 'sale-clothing_id', 'clothing', fillClothingSelect);
+
   // initial load (and fill selects)
   loadAllDataForSelects();
   loadCollection('clothing');
@@ -117,22 +133,40 @@ document.addEventListener('DOMContentLoaded', ()=>{
   loadCollection('sales');
 });
 
-/* pagination */
-function changePage(collection, delta){
+/* pagination (keyset en servidor) */
+async function changePage(collection, delta){
+  const st = state[collection];
+  if(delta > 0){
+    if(!st.next) return;
+    st.cursors.push(st.next);
+    st.page += 1;
+  } else {
+    if(st.page <= 1) return;
+    st.cursors.pop();
+    st.page -= 1;
+  }
+  await fetchPage(collection);
+}
+
+/* pide al servidor la página actual (cursor en el tope de la pila) */
+async function fetchPage(collection){
   const st = state[collection];
-  st.page = Math.max(1, st.page + delta);
+  const after = st.cursors[st.cursors.length - 1];
+  let url = `${URLS[collection]}?limit=${PER_PAGE}${PAGE_EXPAND[collection] || ''}`;
+  if(after) url += `&after=${encodeURIComponent(after)}`;
+  if(st.total == null) url += '&total=1';
+  const data = await apiGet(url);
+  st.items = Array.isArray(data.items) ? data.items : [];
+  st.next = data.next_cursor || null;
+  if(data.total_estimate != null) st.total = data.total_estimate;
   renderCollection(collection);
 }
 
-/* load generic collection */
+/* load generic collection (vuelve a la primera página) */
 async function loadCollection(collection){
   try{
-    const items = await apiGet(URLS[collection]);
-    state[collection].items = Array.isArray(items) ? items : (items ? [items] : []);
-    state[collection].page = 1;
-    renderCollection(collection);
-    // update selects when collections change
-    if(collection === 'brands' || collection === 'clothing' || collection === 'users') fillSelectsFromState();
+    state[collection] = newPageState();
+    await fetchPage(collection);
   }catch(err){
     console.error('loadCollection', collection, err);
     const tbody = $(`table-${collection}`);
@@ -140,20 +174,19 @@ async function loadCollection(collection){
   }
 }
 
-/* render collection with pagination */
+/* render current page */
 function renderCollection(collection){
   const st = state[collection];
-  const items = st.items || [];
+  const pageItems = st.items || [];
   const page = st.page || 1;
-  const total = items.length;
   const from = (page - 1) * PER_PAGE;
-  const to = Math.min(total, page * PER_PAGE);
-  const pageItems = items.slice(from, to);
+  const to = from + pageItems.length;
 
-  $(`${collection}-page-info`).textContent = total === 0 ? 'Sin registros' : `Mostrando ${from+1}-${to} de ${total}`;
+  const totalText = st.total != null ? ` de ~${st.total}` : '';
+  $(`${collection}-page-info`).textContent = pageItems.length === 0 ? 'Sin registros' : `Mostrando ${from+1}-${to}${totalText}`;
   const prevBtn = $(`${collection}-prev`), nextBtn = $(`${collection}-next`);
   prevBtn.style.display = page > 1 ? 'inline-block' : 'none';
-  nextBtn.style.display = to < total ? 'inline-block' : 'none';
+  nextBtn.style.display = st.next ? 'inline-block' : 'none';
 
   if(collection === 'clothing') renderClothingRows(pageItems);
   if(collection === 'brands') renderBrandRows(pageItems);
@@ -233,6 +266,12 @@ function renderUserRows(items){
   });
 }
 
+/* "Nombre (id)" si la relación vino expandida; si no, el id */
+function relationLabel(doc, id){
+  if(doc && typeof doc === 'object') return `${doc.name ?? ''} (${doc._id})`;
+  return id ?? doc ?? '';
+}
+
 function renderSalesRows(items){
   const tbody = $('table-sales'); tbody.innerHTML = '';
   if(!items.length){ tbody.innerHTML = `<tr><td colspan="6" class="text-center p-3 text-muted">No hay ventas.</td></tr>`; return; }
@@ -242,8 +281,8 @@ function renderSalesRows(items){
     const tr = document.createElement('tr');
     tr.innerHTML = `
       <td>${escapeHtml(s._id)}</td>
-      <td>${escapeHtml(s.user_id ?? s.user ?? '')}</td>
-      <td>${escapeHtml(s.clothing_id ?? s.item ?? '')}</td>
+      <td>${escapeHtml(relationLabel(s.user, s.user_id))}</td>
+      <td>${escapeHtml(relationLabel(s.clothing, s.clothing_id ?? s.item))}</td>
       <td>${qty}</td>
       <td>${escapeHtml(dateStr)}</td>
       <td class="actions text-center">
@@ -272,12 +311,11 @@ async function onDelete(collection, id){
   if(!confirm('¿Eliminar este elemento?')) return;
   try{
     await apiDeleteSmart(URLS[collection], id);
-    await loadCollection(collection);
-    // keep page in range
+    // recargar la página actual; si quedó vacía, volver a la anterior
     const st = state[collection];
-    const maxPage = Math.max(1, Math.ceil((st.items.length||0) / PER_PAGE));
-    if(st.page > maxPage) st.page = maxPage;
-    renderCollection(collection);
+    st.total = null;
+    await fetchPage(collection);
+    if(!st.items.length && st.page > 1) await changePage(collection, -1);
   }catch(err){ console.error('onDelete', err); alert('Error eliminando'); }
 }
 
@@ -291,6 +329,7 @@ async function openClothingForm(item=null){
   $('form-clothing-title').textContent = item ? 'Editar Prenda' : 'Nueva Prenda';
   $('clothing-id').value = item ? item._id : '';
   $('clothing-name').value = item ? item.name : '';
+  if(item) ensureOption('clothing-brand_id', item.brand_id);
   $('clothing-brand_id').value = item ? (item.brand_id ?? '') : '';
   // price can be object { $numberDouble: "..." } or number
   const priceVal = item ? ((item.price && item.price.$numberDouble) ? item.price.$numberDouble : (item.price ?? '')) : '';
@@ -379,7 +418,8 @@ function openUserForm(item=null){
   $('user-email').value = item ? item.email : '';
   $('user-city').value = item ? (item.address?.city || '') : '';
   $('user-country').value = item ? (item.address?.country || '') : '';
-  $('user-password').value = item ? (item.password || '') : '';
+  // la API no devuelve la contraseña: vacío = no cambiarla
+  $('user-password').value = '';
 }
 
 function clearUserForm(){ ['user-id','user-name','user-email','user-city','user-country','user-password'].forEach(id=>$(id).value=''); }
@@ -397,10 +437,11 @@ async function saveUser(){
   const payload = {
     address: { city: city, country: country },
     email: email,
-    name: name,
-    orders: [],
-    password: password || ''
+    name: name
   };
+  // Al editar no se envían orders ni una contraseña vacía (la API no los devuelve y se borrarían)
+  if(!id) payload.orders = [];
+  if(password || !id) payload.password = password || '';
 
   try{
     if(id) await apiPutSmart(URLS.users, id, payload);
@@ -416,6 +457,7 @@ async function openSaleForm(item=null){
   show($('form-sale'));
   $('form-sale-title').textContent = item ? 'Editar Venta' : 'Nueva Venta';
   $('sale-id').value = item ? item._id : '';
+  if(item){ ensureOption('sale-user_id', item.user_id); ensureOption('sale-clothing_id', item.clothing_id); }
   $('sale-user_id').value = item ? (item.user_id || '') : '';
   $('sale-clothing_id').value = item ? (item.clothing_id || '') : '';
   const qty = item && item.quantity && item.quantity.$numberInt ? item.quantity.$numberInt : (item?.quantity ?? item?.amount ?? 1);
@@ -449,9 +491,14 @@ async function saveSale(){
 
   try{
     if(id) await apiPutSmart(URLS.sales, id, payload);
-    else await apiPost(URLS.sales, payload);
+    // venta nueva: checkout descuenta el stock solo si alcanza
+    else await apiPost(`${URLS.sales}/checkout`, { user_id, date: payload.date, items: [{ clothing_id, quantity: payload.quantity }] });
     hide($('form-sale')); clearSaleForm(); await loadCollection('sales'); await loadCollection('clothing'); // refresh stock view
-  }catch(err){ console.error('saveSale', err); alert('Error guardando venta'); }
+  }catch(err){
+    console.error('saveSale', err);
+    if(err.response && err.response.status === 409) alert('Stock insuficiente para esta venta');
+    else alert('Error guardando venta');
+  }
 }
 
 /* ------- Selects (brands/users/clothing) ------- */
@@ -460,44 +507,79 @@ async function loadAllDataForSelects(){
 }
 async function ensureBrandsLoaded(){
   try{
-    const brands = await apiGet(URLS.brands);
-    state.brands.items = Array.isArray(brands) ? brands : (brands ? [brands] : []);
+    await loadSelectPage('brands');
     fillBrandSelect();
   }catch(err){ console.warn('ensureBrandsLoaded', err); }
 }
 async function ensureUsersAndClothingLoaded(){
   try{
-    const [users, clothing] = await Promise.all([apiGet(URLS.users), apiGet(URLS.clothing)]);
-    state.users.items = Array.isArray(users) ? users : (users ? [users] : []);
-    state.clothing.items = Array.isArray(clothing) ? clothing : (clothing ? [clothing] : []);
+    await Promise.all([loadSelectPage('users'), loadSelectPage('clothing')]);
     fillUserSelect();
     fillClothingSelect();
   }catch(err){ console.warn('ensureUsersAndClothingLoaded', err); }
 }
 
+/* primera página ordenada por nombre (el resto se encuentra con el buscador) */
+async function loadSelectPage(coleccion){
+  const page = await apiGet(`${URLS[coleccion]}?fields=name&sort=name&limit=${SELECT_LIMIT}`);
+  selectData[coleccion] = (page && page.items) ? page.items : [];
+}
+
+/* buscador sobre un select: pide /search mientras se escribe y rellena el select con los resultados */
+function wireSearchSelect(inputId, selectId, coleccion, fill){
+  const input = $(inputId);
+  if(!input) return;
+  let timer = null;
+  input.addEventListener('input', () => {
+    clearTimeout(timer);
+    timer = setTimeout(async () => {
+      const q = input.value.trim();
+      try{
+        if(q){
+          const res = await apiGet(`${URLS.search}?in=${coleccion}&q=${encodeURIComponent(q)}&limit=20`);
+          selectData[coleccion] = res[coleccion] || [];
+        } else {
+          await loadSelectPage(coleccion);
+        }
+        fill();
+        const sel = $(selectId);
+        if(q && sel.options.length > 1) sel.selectedIndex = 1;
+      }catch(err){ console.warn('wireSearchSelect', err); }
+    }, 200);
+  });
+}
+
+/* al editar, el valor guardado puede no estar entre las opciones cargadas */
+function ensureOption(selectId, value){
+  const sel = $(selectId);
+  if(value && !Array.from(sel.options).some(o => o.value === value)){
+    sel.insertAdjacentHTML('beforeend', `<option value="${escapeHtml(value)}">${escapeHtml(value)}</option>`);
+  }
+}
+
 function fillBrandSelect(){
   const sel = $('clothing-brand_id');
   sel.innerHTML = '<option value="">-- Seleccione marca --</option>';
-  (state.brands.items||[]).forEach(b=>{
+  (selectData.brands||[]).forEach(b=>{
     sel.insertAdjacentHTML('beforeend', `<option value="${escapeHtml(b._id)}">${escapeHtml(b.name)} (${escapeHtml(b._id)})</option>`);
   });
 }
 function fillUserSelect(){
   const sel = $('sale-user_id');
   sel.innerHTML = '<option value="">-- Seleccione usuario --</option>';
-  (state.users.items||[]).forEach(u=>{
+  (selectData.users||[]).forEach(u=>{
     sel.insertAdjacentHTML('beforeend', `<option value="${escapeHtml(u._id)}">${escapeHtml(u.name)} (${escapeHtml(u._id)})</option>`);
   });
 }
 function fillClothingSelect(){
   const sel = $('sale-clothing_id');
   sel.innerHTML = '<option value="">-- Seleccione prenda --</option>';
-  (state.clothing.items||[]).forEach(c=>{
+  (selectData.clothing||[]).forEach(c=>{
     sel.insertAdjacentHTML('beforeend', `<option value="${escapeHtml(c._id)}">${escapeHtml(c.name)} (${escapeHtml(c._id)})</option>`);
   });
 }
 
-/* called when collections refresh to keep selects updated */
+/* rellena los selects con las listas ya descargadas */
 function fillSelectsFromState(){
   fillBrandSelect();
   fillUserSelect();
@@ -505,11 +587,13 @@ function fillSelectsFromState(){
 }
 
 /* ------- Analytics (request /reports or fallback) ------- */
+/* estado del dashboard: se carga con /reports y luego se mantiene con los deltas de /reports/stream */
+const analytics = { items: new Map(), brands: new Map(), top5: [], source: null };
+
 async function loadAnalytics(){
   const ulBrands = $('analytics-brands-with-sales');
   const tbodyItems = $('analytics-items-stock');
   const tbodyTop5 = $('analytics-top5');
-  const updated = $('analytics-updated');
 
   ulBrands.innerHTML = '<li class="list-group-item text-muted">Cargando...</li>';
   tbodyItems.innerHTML = `<tr><td colspan="4" class="text-center p-3 text-muted">Cargando...</td></tr>`;
@@ -517,57 +601,92 @@ async function loadAnalytics(){
 
   try{
     const data = await apiGet(URLS.reports);
-    // brands with sales
-    ulBrands.innerHTML = '';
-    (data.brands_with_sales || []).forEach(b => {
-      const li = document.createElement('li');
-      li.className = 'list-group-item d-flex justify-content-between align-items-center';
-      li.innerHTML = `<span>${escapeHtml(b.name)}</span><span class="badge bg-primary rounded-pill">${b.sales_count}</span>`;
-      ulBrands.appendChild(li);
-    });
-
-    // items sold
-    tbodyItems.innerHTML = '';
-    (data.items_sold || []).forEach(it => {
-      const tr = document.createElement('tr');
-      tr.innerHTML = `<td>${escapeHtml(it.name)}</td><td>${it.sold}</td><td>${it.in_stock ?? 'N/A'}</td><td>${it.remaining ?? 'N/A'}</td>`;
-      tbodyItems.appendChild(tr);
-    });
-
-    // top5
-    tbodyTop5.innerHTML = '';
-    (data.top5_brands || []).forEach(b => {
-      const tr = document.createElement('tr');
-      tr.innerHTML = `<td>${escapeHtml(b.name)}</td><td>${b.sales_count}</td>`;
-      tbodyTop5.appendChild(tr);
-    });
-
-    updated.textContent = new Date().toLocaleString();
+    analytics.items = new Map((data.items_sold || []).map(it => [it.item_id, it]));
+    analytics.brands = new Map((data.brands_with_sales || []).map(b => [b.brand_id, b]));
+    analytics.top5 = data.top5_brands || [];
+    renderAnalytics();
+    openAnalyticsStream();
   }catch(err){
     console.warn('loadAnalytics failed, using fallback', err);
     await loadAnalyticsFallbackClient();
   }
 }
 
+/* SSE: "snapshot" reemplaza el estado completo, "delta" trae solo las filas que cambiaron */
+function openAnalyticsStream(){
+  if(analytics.source || typeof EventSource === 'undefined') return;
+  const source = new EventSource(`${URLS.reports}/stream`);
+  source.addEventListener('snapshot', ev => {
+    const snap = JSON.parse(ev.data);
+    analytics.items = new Map(Object.entries(snap.items || {}));
+    analytics.brands = new Map(Object.entries(snap.brands || {}));
+    analytics.top5 = snap.top5 || [];
+    renderAnalytics();
+  });
+  source.addEventListener('delta', ev => {
+    const delta = JSON.parse(ev.data);
+    (delta.items || []).forEach(it => analytics.items.set(it.item_id, it));
+    (delta.items_removed || []).forEach(id => analytics.items.delete(id));
+    (delta.brands || []).forEach(b => analytics.brands.set(b.brand_id, b));
+    (delta.brands_removed || []).forEach(id => analytics.brands.delete(id));
+    if(delta.top5) analytics.top5 = delta.top5;
+    renderAnalytics();
+  });
+  analytics.source = source;
+}
+
+function renderAnalytics(){
+  const ulBrands = $('analytics-brands-with-sales');
+  const tbodyItems = $('analytics-items-stock');
+  const tbodyTop5 = $('analytics-top5');
+
+  // brands with sales
+  ulBrands.innerHTML = '';
+  Array.from(analytics.brands.values()).sort((a,b)=>b.sales_count-a.sales_count).forEach(b => {
+    const li = document.createElement('li');
+    li.className = 'list-group-item d-flex justify-content-between align-items-center';
+    li.innerHTML = `<span>${escapeHtml(b.name)}</span><span class="badge bg-primary rounded-pill">${b.sales_count}</span>`;
+    ulBrands.appendChild(li);
+  });
+
+  // items sold
+  tbodyItems.innerHTML = '';
+  Array.from(analytics.items.values()).sort((a,b)=>(b.sold-a.sold) || String(a.name ?? '').localeCompare(String(b.name ?? ''))).forEach(it => {
+    const tr = document.createElement('tr');
+    tr.innerHTML = `<td>${escapeHtml(it.name)}</td><td>${it.sold}</td><td>${it.in_stock ?? 'N/A'}</td><td>${it.remaining ?? 'N/A'}</td>`;
+    tbodyItems.appendChild(tr);
+  });
+
+  // top5
+  tbodyTop5.innerHTML = '';
+  analytics.top5.forEach(b => {
+    const tr = document.createElement('tr');
+    tr.innerHTML = `<td>${escapeHtml(b.name)}</td><td>${b.sales_count}</td>`;
+    tbodyTop5.appendChild(tr);
+  });
+
+  $('analytics-updated').textContent = new Date().toLocaleString();
+}
+
 /* fallback (client-side) - same logic as before but adapted to wrappers */
 async function loadAnalyticsFallbackClient(){
   try{
-    const [sales, clothing, brands] = await Promise.all([apiGet(URLS.sales), apiGet(URLS.clothing), apiGet(URLS.brands)]);
-    const clothMap = new Map((Array.isArray(clothing)?clothing:[]).map(c => [c._id, c]));
-    const brandMap = new Map((Array.isArray(brands)?brands:[]).map(b => [b._id, b]));
+    // prenda y marca de cada venta resueltas en el servidor (?expand=), sin descargar clothing ni brands
+    const sales = await apiGet(`${URLS.sales}?fields=clothing_id,item,quantity,amount&expand=clothing.brand`);
+    const clothMap = new Map();
     const brandSales = new Map();
     const soldByItem = new Map();
 
     (Array.isArray(sales)?sales:[]).forEach(s => {
       const qty = (s.quantity && s.quantity.$numberInt) ? Number(s.quantity.$numberInt) : (s.quantity ?? s.amount ?? 0);
       if(qty <= 0) return;
-      const cloth = clothMap.get(s.clothing_id) || null;
+      const cloth = s.clothing || null;
+      if(cloth) clothMap.set(cloth._id, cloth);
       const itemKey = cloth ? cloth._id : (s.clothing_id || s.item || ('unknown-' + Math.random()));
       soldByItem.set(itemKey, (soldByItem.get(itemKey) || 0) + qty);
-      const brandId = cloth ? cloth.brand_id : null;
-      if(brandId && brandMap.has(brandId)){
-        const name = brandMap.get(brandId).name;
-        brandSales.set(name, (brandSales.get(name) || 0) + qty);
+      const brand = cloth ? cloth.brand : null;
+      if(brand){
+        brandSales.set(brand.name, (brandSales.get(brand.name) || 0) + qty);
       }
     });
 
@@ -611,17 +730,15 @@ async function loadAllDataForSelects(){
 
 /* Reuse earlier helpers for selects */
 async function ensureBrandsLoaded(){
-  try{ const brands = await apiGet(URLS.brands); state.brands.items = Array.isArray(brands)?brands:(brands?[brands]:[]); fillBrandSelect(); }catch(e){ console.warn(e); }
+  try{ await loadSelectPage('brands'); fillBrandSelect(); }catch(e){ console.warn(e); }
 }
 async function ensureUsersAndClothingLoaded(){
   try{
-    const [users, clothing] = await Promise.all([apiGet(URLS.users), apiGet(URLS.clothing)]);
-    state.users.items = Array.isArray(users)?users:(users?[users]:[]);
-    state.clothing.items = Array.isArray(clothing)?clothing:(clothing?[clothing]:[]);
+    await Promise.all([loadSelectPage('users'), loadSelectPage('clothing')]);
     fillUserSelect(); fillClothingSelect();
   }catch(e){ console.warn(e); }
 }
-function fillBrandSelect(){ const sel=$('clothing-brand_id'); sel.innerHTML = '<option value="">-- Seleccione marca --</option>'; (state.brands.items||[]).forEach(b=> sel.insertAdjacentHTML('beforeend', `<option value="${escapeHtml(b._id)}">${escapeHtml(b.name)} (${escapeHtml(b._id)})</option>`)); }
-function fillUserSelect(){ const sel=$('sale-user_id'); sel.innerHTML = '<option value="">-- Seleccione usuario --</option>'; (state.users.items||[]).forEach(u=> sel.insertAdjacentHTML('beforeend', `<option value="${escapeHtml(u._id)}">${escapeHtml(u.name)} (${escapeHtml(u._id)})</option>`)); }
-function fillClothingSelect(){ const sel=$('sale-clothing_id'); sel.innerHTML = '<option value="">-- Seleccione prenda --</option>'; (state.clothing.items||[]).forEach(c=> sel.insertAdjacentHTML('beforeend', `<option value="${escapeHtml(c._id)}">${escapeHtml(c.name)} (${escapeHtml(c._id)})</option>`)); }
+function fillBrandSelect(){ const sel=$('clothing-brand_id'); sel.innerHTML = '<option value="">-- Seleccione marca --</option>'; (selectData.brands||[]).forEach(b=> sel.insertAdjacentHTML('beforeend', `<option value="${escapeHtml(b._id)}">${escapeHtml(b.name)} (${escapeHtml(b._id)})</option>`)); }
+function fillUserSelect(){ const sel=$('sale-user_id'); sel.innerHTML = '<option value="">-- Seleccione usuario --</option>'; (selectData.users||[]).forEach(u=> sel.insertAdjacentHTML('beforeend', `<option value="${escapeHtml(u._id)}">${escapeHtml(u.name)} (${escapeHtml(u._id)})</option>`)); }
+function fillClothingSelect(){ const sel=$('sale-clothing_id'); sel.innerHTML = '<option value="">-- Seleccione prenda --</option>'; (selectData.clothing||[]).forEach(c=> sel.insertAdjacentHTML('beforeend', `<option value="${escapeHtml(c._id)}">${escapeHtml(c.name)} (${escapeHtml(c._id)})</option>`)); }
 function fillSelectsFromState(){ fillBrandSelect(); fillUserSelect(); fillClothingSelect(); }
\ No newline at end of file
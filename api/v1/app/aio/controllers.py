@@ -0,0 +1,141 @@
+# api/v1/app/aio/controllers.py
+from quart import Blueprint, Response, jsonify, request
+
+from .models import brands_model, clothing_model, sales_model, users_model, AsyncReportsModel
+from ..utils.cache import report_cache, COLECCIONES_REPORTES
+from ..utils.json_body import decodificar_json
+from ..utils.pagination import leer_paginacion
+from ..utils.filters import leer_filtros, leer_orden
+from ..utils.projection import leer_campos
+
+# Mismos mensajes que los controladores síncronos
+MENSAJES = {
+    "brands": {
+        "no_encontrado": "Marca no encontrada", "creado": "Marca creada", "error_crear": "Error al crear la marca",
+        "actualizado": "Marca actualizada", "no_actualizado": "Marca no actualizada",
+        "eliminado": "Marca eliminada", "no_eliminado": "Marca no eliminada",
+    },
+    "clothing": {
+        "no_encontrado": "Prenda no encontrada", "creado": "Prenda creada", "error_crear": "Error al crear prenda",
+        "actualizado": "Prenda actualizada", "no_actualizado": "Prenda no actualizada",
+        "eliminado": "Prenda eliminada", "no_eliminado": "Prenda no eliminada",
+    },
+    "sales": {
+        "no_encontrado": "Venta no encontrada", "creado": "Venta creada", "error_crear": "Error al crear venta",
+        "actualizado": "Venta actualizada", "no_actualizado": "Venta no actualizada",
+        "eliminado": "Venta eliminada", "no_eliminado": "Venta no eliminada",
+    },
+    "users": {
+        "no_encontrado": "Usuario no encontrado", "creado": "Usuario creado", "error_crear": "Error al crear usuario",
+        "actualizado": "Usuario actualizado", "no_actualizado": "Usuario no actualizado",
+        "eliminado": "Usuario eliminado", "no_eliminado": "Usuario no eliminado",
+    },
+}
+
+
+async def _leer_json():
+    return decodificar_json(await request.get_data(as_text=True))
+
+
+def crud_blueprint(nombre, modelo):
+    """
+    GET/POST/PUT/DELETE /<nombre> con el mismo contrato que controllers/<nombre>.py
+    (?id=, paginación ?limit=&after=, filtros, ?sort=, ?fields=, mensajes y códigos de estado).
+    """
+    endpoint = Blueprint(f"{nombre}_async_endpoint", __name__)
+    mensajes = MENSAJES[nombre]
+
+    @endpoint.route(f"/{nombre}", methods=["GET"])
+    async def obtener_todos():
+        id_doc = request.args.get("id")
+
+        try:
+            proyeccion = leer_campos(request.args)
+        except ValueError:
+            return jsonify({"error": "Parámetro fields inválido"}), 400
+
+        if id_doc:
+            doc = await modelo.obtener_por_id(id_doc, proyeccion)
+            if doc:
+                return jsonify(doc), 200
+            return jsonify({"error": mensajes["no_encontrado"]}), 404
+
+        try:
+            filtro = leer_filtros(request.args, nombre)
+            orden = leer_orden(request.args, nombre, filtro)
+            paginacion = leer_paginacion(request.args, orden)
+        except ValueError:
+            return jsonify({"error": "Parámetros de consulta inválidos"}), 400
+        if paginacion:
+            return jsonify(await modelo.obtener_pagina(**paginacion, proyeccion=proyeccion, filtro=filtro, orden=orden)), 200
+
+        return jsonify(await modelo.obtener_todos(proyeccion, filtro, orden)), 200
+
+    @endpoint.route(f"/{nombre}", methods=["POST"])
+    async def crear():
+        data = await _leer_json()
+        nuevo_id = await modelo.crear(data)
+        if nuevo_id:
+            return jsonify({"mensaje": mensajes["creado"], "id": nuevo_id}), 201
+        return jsonify({"error": mensajes["error_crear"]}), 400
+
+    @endpoint.route(f"/{nombre}", methods=["PUT"])
+    async def actualizar():
+        id_doc = request.args.get("id")
+        data = await _leer_json()
+        actualizado = await modelo.actualizar(id_doc, data)
+        if actualizado > 0:
+            return jsonify({"mensaje": mensajes["actualizado"]}), 200
+        return jsonify({"error": mensajes["no_actualizado"]}), 400
+
+    @endpoint.route(f"/{nombre}", methods=["DELETE"])
+    async def eliminar():
+        id_doc = request.args.get("id")
+        eliminado = await modelo.eliminar(id_doc)
+        if eliminado > 0:
+            return jsonify({"mensaje": mensajes["eliminado"]}), 200
+        return jsonify({"error": mensajes["no_eliminado"]}), 400
+
+    return endpoint
+
+
+crud_endpoints = [
+    crud_blueprint("brands", brands_model),
+    crud_blueprint("clothing", clothing_model),
+    crud_blueprint("sales", sales_model),
+    crud_blueprint("users", users_model),
+]
+
+reports_endpoint = Blueprint("reports_async_endpoint", __name__)
+
+
+async def _respuesta_reporte(clave, calcular):
+    # Igual que utils.cache.respuesta_reporte: ETag + 304 sin consultar MongoDB
+    data, etag = await report_cache.obtener_async(clave, calcular, COLECCIONES_REPORTES)
+    if request.if_none_match.contains(etag):
+        respuesta = Response("", status=304)
+    else:
+        respuesta = jsonify(data)
+    respuesta.set_etag(etag)
+    respuesta.headers["Cache-Control"] = "no-cache"
+    return respuesta
+
+
+@reports_endpoint.route("/reports", methods=["GET"])
+async def reports_combined():
+    return await _respuesta_reporte("combinado", AsyncReportsModel.obtener_todos_combinado)
+
+
+@reports_endpoint.route("/reports/marcas", methods=["GET"])
+async def marcas_con_ventas():
+    return await _respuesta_reporte("marcas", AsyncReportsModel.obtener_marcas_con_ventas)
+
+
+@reports_endpoint.route("/reports/prendas", methods=["GET"])
+async def prendas_vendidas_stock():
+    return await _respuesta_reporte("prendas", AsyncReportsModel.obtener_prendas_vendidas_stock)
+
+
+@reports_endpoint.route("/reports/top5", methods=["GET"])
+async def top5_marcas():
+    return await _respuesta_reporte("top5", AsyncReportsModel.obtener_top5_marcas)
@@ -0,0 +1,73 @@
+# api/v1/app/aio/index.py
+"""
+Variante ASGI de la API (Quart + AsyncMongoClient de PyMongo).
+Expone las mismas rutas y respuestas que app/index.py para CRUD y reportes,
+sin bloquear un worker mientras MongoDB responde. Se ejecuta con run_async.py.
+"""
+import os
+from dotenv import load_dotenv
+from pymongo import AsyncMongoClient, MongoClient
+from quart import Quart
+from quart_cors import cors
+
+
+class AsyncMongo:
+    """
+    Cliente async compartido por los modelos de app/aio. Se crea al arrancar el
+    servidor (dentro del event loop y después del fork de cada worker).
+    db_sync es la misma base con un cliente síncrono, para las cachés
+    compartidas (app/utils/cache.py), que se leen y escriben desde código síncrono.
+    """
+    cx = None
+    db = None
+    cx_sync = None
+    db_sync = None
+
+    async def conectar(self, uri):
+        self.cx = AsyncMongoClient(uri)
+        self.db = self.cx.get_default_database()
+        self.cx_sync = MongoClient(uri)
+        self.db_sync = self.cx_sync.get_default_database()
+
+    async def cerrar(self):
+        if self.cx is not None:
+            await self.cx.close()
+        if self.cx_sync is not None:
+            self.cx_sync.close()
+
+
+amongo = AsyncMongo()
+
+def create_async_app():
+    load_dotenv()  # Cargar variables de .env
+
+    app = Quart(__name__)
+    app.config["MONGO_URI"] = os.getenv("MONGO_URI")
+    # Mismo codificador que la app Flask: ObjectId, fechas y Decimal128 sin conversiones por documento
+    from ..utils.json_provider import BSONJSONProvider
+    app.json = BSONJSONProvider(app)
+    app = cors(app, allow_origin="*")  # Permitir CORS para todos los orígenes
+
+    @app.before_serving
+    async def conectar_mongo():
+        await amongo.conectar(app.config["MONGO_URI"])
+        # La app async no inicializa Flask-PyMongo: las cachés compartidas usan db_sync
+        from ..utils.cache import configurar_cache
+        configurar_cache(amongo.db_sync)
+        # Rollups de una base sin ventas, igual que create_app
+        from .models import construir_rollups_si_vacia
+        try:
+            await construir_rollups_si_vacia()
+        except Exception as e:
+            print("create_async_app: no se pudieron construir los rollups:", e)
+
+    @app.after_serving
+    async def cerrar_mongo():
+        await amongo.cerrar()
+
+    from .controllers import crud_endpoints, reports_endpoint
+    for endpoint in crud_endpoints:
+        app.register_blueprint(endpoint, url_prefix="/api/v1/admin")
+    app.register_blueprint(reports_endpoint, url_prefix="/api/v1/admin")
+
+    return app
@@ -0,0 +1,280 @@
+# api/v1/app/aio/models.py
+import asyncio
+
+from pymongo import ReturnDocument
+
+from app.aio.index import amongo
+from app.models.reports import ReportsModel
+from app.models.search import search_index, CAMPOS_BUSQUEDA
+from app.models.rollups import (
+    RollupsModel, ROLLUP_PRENDAS, ROLLUP_MARCAS, ROLLUP_ESTADO, MARCADOR_CONSTRUIDOS, FILTRO_MARCAS_CON_VENTAS, ORDEN_MARCAS
+)
+from app.models.users import UsersModel
+from app.utils.cache import report_cache, document_cache, EDICIONES_VENTAS
+from app.utils.ids import nuevo_id, filtro_por_id
+from app.utils.pagination import filtro_pagina, armar_pagina, combinar_filtros, orden_find, proyeccion_con_orden
+
+
+async def rollups_construidos():
+    # Igual que RollupsModel.construidos(): el marcador se recuerda en el proceso
+    if not RollupsModel.recordar_marcador():
+        RollupsModel.recordar_marcador(await amongo.db[ROLLUP_ESTADO].find_one(MARCADOR_CONSTRUIDOS))
+    return RollupsModel.recordar_marcador()
+
+
+async def construir_rollups_si_vacia():
+    # Igual que RollupsModel.construir_si_vacia(): solo al arrancar, nunca en una lectura
+    if await rollups_construidos() or await amongo.db.sales.estimated_document_count():
+        return
+    for origen, pipeline in RollupsModel.pasos_reconstruccion():
+        await (await amongo.db[origen].aggregate(pipeline)).to_list(None)
+    await amongo.db[ROLLUP_ESTADO].replace_one(MARCADOR_CONSTRUIDOS, RollupsModel.marcador(), upsert=True)
+    RollupsModel.recordar_marcador(MARCADOR_CONSTRUIDOS)
+
+
+class AsyncCrudModel:
+    """
+    Mismo contrato que BrandsModel / ClothingModel / SalesModel / UsersModel
+    (valores de retorno incluidos), con métodos async sobre AsyncMongoClient.
+    """
+
+    def __init__(self, coleccion, proyeccion=None):
+        self.coleccion = coleccion
+        self.proyeccion = proyeccion
+
+    @property
+    def col(self):
+        return amongo.db[self.coleccion]
+
+    def _invalidar(self, id_doc=None):
+        # Igual que los modelos de Flask: reportes y, si cambió un documento existente, la caché por _id
+        report_cache.invalidar(self.coleccion)
+        if id_doc is not None:
+            document_cache.invalidar(self.coleccion, id_doc)
+
+    def _indexar(self, id_doc, cambios=None):
+        # Mantiene el índice de búsqueda de este proceso; cambios=None quita el documento
+        if self.coleccion not in CAMPOS_BUSQUEDA:
+            return
+        if cambios is None:
+            search_index.eliminar(self.coleccion, id_doc)
+        else:
+            search_index.actualizar(self.coleccion, id_doc, cambios)
+
+    async def obtener_todos(self, proyeccion=None, filtro=None, orden=None):
+        cursor = self.col.find(filtro or {}, proyeccion or self.proyeccion)
+        return await (cursor.sort(orden_find(orden)) if orden else cursor).to_list(None)
+
+    async def obtener_pagina(self, limit, after=None, con_total=False, proyeccion=None, filtro=None, orden=None):
+        consulta = combinar_filtros(filtro, filtro_pagina(after, orden))
+        proyeccion = proyeccion_con_orden(proyeccion or self.proyeccion, orden)
+        cursor = self.col.find(consulta, proyeccion).sort(orden_find(orden)).limit(limit + 1)
+        if con_total:
+            conteo = self.col.count_documents(filtro) if filtro else self.col.estimated_document_count()
+            docs, total = await asyncio.gather(cursor.to_list(None), conteo)
+        else:
+            docs, total = await cursor.to_list(None), None
+        pagina = armar_pagina(docs, limit, orden)
+        if total is not None:
+            pagina["total_estimate"] = total
+        return pagina
+
+    async def obtener_por_id(self, id, proyeccion=None):
+        try:
+            return await self.col.find_one(filtro_por_id(id), proyeccion or self.proyeccion)
+        except Exception:
+            return None
+
+    async def crear(self, data):
+        try:
+            data.setdefault("_id", nuevo_id())
+            result = await self.col.insert_one(data)
+        except Exception:
+            return None
+        self._invalidar()
+        self._indexar(result.inserted_id, data)
+        await self._despues_de_crear(data)
+        return str(result.inserted_id)
+
+    async def actualizar(self, id, data):
+        try:
+            anterior = await self.col.find_one_and_update(
+                filtro_por_id(id), {"$set": data}, return_document=ReturnDocument.BEFORE
+            )
+        except Exception:
+            return -1
+        if not anterior or all(anterior.get(k) == v for k, v in data.items()):
+            return 0
+        self._invalidar(anterior["_id"])
+        self._indexar(anterior["_id"], data)
+        await self._despues_de_actualizar(anterior, data)
+        return 1
+
+    async def eliminar(self, id):
+        try:
+            anterior = await self.col.find_one_and_delete(filtro_por_id(id))
+        except Exception:
+            return -1
+        if not anterior:
+            return 0
+        self._invalidar(anterior["_id"])
+        self._indexar(anterior["_id"])
+        await self._despues_de_eliminar(anterior)
+        return 1
+
+    # Ganchos para mantener los rollups (ver AsyncSalesModel / AsyncClothingModel)
+    async def _despues_de_crear(self, nuevo):
+        pass
+
+    async def _despues_de_actualizar(self, anterior, data):
+        pass
+
+    async def _despues_de_eliminar(self, anterior):
+        pass
+
+
+class AsyncSalesModel(AsyncCrudModel):
+    """
+    Mantiene sales_rollup_by_item / sales_rollup_by_brand igual que SalesModel.
+    """
+
+    async def _aplicar_venta(self, venta, signo):
+        cantidad = RollupsModel.cantidad(venta) * signo
+        clothing_id = venta.get("clothing_id")
+        if not cantidad or clothing_id is None or not await rollups_construidos():
+            return
+        prenda = await amongo.db.clothing.find_one({"_id": clothing_id}, {"brand_id": 1})
+        if not prenda:
+            return
+        await asyncio.gather(*[
+            amongo.db[coleccion].update_one(filtro, cambios, upsert=True)
+            for coleccion, filtro, cambios in RollupsModel.operaciones_venta(clothing_id, prenda.get("brand_id"), cantidad)
+        ])
+
+    async def _rollups(self, anterior=None, nueva=None):
+        if anterior:
+            report_cache.invalidar(EDICIONES_VENTAS)
+        try:
+            if anterior:
+                await self._aplicar_venta(anterior, -1)
+            if nueva:
+                await self._aplicar_venta(nueva, 1)
+        except Exception as e:
+            print("AsyncSalesModel rollups error:", e)
+
+    async def _despues_de_crear(self, nuevo):
+        await self._rollups(nueva=nuevo)
+
+    async def _despues_de_actualizar(self, anterior, data):
+        await self._rollups(anterior=anterior, nueva={**anterior, **data})
+
+    async def _despues_de_eliminar(self, anterior):
+        await self._rollups(anterior=anterior)
+
+
+class AsyncClothingModel(AsyncCrudModel):
+    """
+    Mueve o quita los totales de la prenda en los rollups igual que ClothingModel.
+    """
+
+    async def _despues_de_actualizar(self, anterior, data):
+        if "brand_id" not in data or anterior.get("brand_id") == data["brand_id"]:
+            return
+        try:
+            if not await rollups_construidos():
+                return
+            prenda = await amongo.db[ROLLUP_PRENDAS].find_one_and_update(
+                *RollupsModel.cambio_marca(anterior["_id"], data["brand_id"]), return_document=ReturnDocument.BEFORE
+            )
+            await self._aplicar(RollupsModel.operaciones_mover(prenda, anterior.get("brand_id"), data["brand_id"]))
+        except Exception as e:
+            print("AsyncClothingModel rollups error:", e)
+
+    async def _despues_de_eliminar(self, anterior):
+        try:
+            if not await rollups_construidos():
+                return
+            prenda = await amongo.db[ROLLUP_PRENDAS].find_one_and_delete({"_id": anterior["_id"]})
+            await self._aplicar(RollupsModel.operaciones_quitar(prenda))
+        except Exception as e:
+            print("AsyncClothingModel rollups error:", e)
+
+    @staticmethod
+    async def _aplicar(operaciones):
+        for coleccion, filtro, cambios, upsert in operaciones:
+            await amongo.db[coleccion].update_one(filtro, cambios, upsert=upsert)
+
+
+brands_model = AsyncCrudModel("brands")
+clothing_model = AsyncClothingModel("clothing")
+sales_model = AsyncSalesModel("sales")
+users_model = AsyncCrudModel("users", UsersModel.PROYECCION)
+
+
+class AsyncReportsModel:
+    """
+    Mismos reportes que ReportsModel: reutiliza sus pipelines y normalizaciones,
+    pero lanza en paralelo las consultas independientes (asyncio.gather).
+    """
+
+    @staticmethod
+    async def _rollups_disponibles():
+        # Igual que RollupsModel.disponibles()
+        return await rollups_construidos()
+
+    @staticmethod
+    async def _marcas_y_vendidas():
+        # (marcas, { clothing_id: vendidas }) desde los rollups o con el $facet
+        if await AsyncReportsModel._rollups_disponibles():
+            totales, vendidas = await asyncio.gather(
+                amongo.db[ROLLUP_MARCAS].find(FILTRO_MARCAS_CON_VENTAS).sort(ORDEN_MARCAS).to_list(None),
+                amongo.db[ROLLUP_PRENDAS].find({}, {"sold": 1}).to_list(None)
+            )
+            marcas = await amongo.db.brands.find({"_id": {"$in": [t["_id"] for t in totales]}}, {"name": 1}).to_list(None)
+            return ReportsModel._armar_marcas(totales, marcas), {r["_id"]: r.get("sold", 0) for r in vendidas}
+        cursor = await amongo.db.sales.aggregate(ReportsModel._pipeline_facet())
+        return ReportsModel._leer_facet(next(iter(await cursor.to_list(1)), None))
+
+    @staticmethod
+    async def obtener_marcas_con_ventas():
+        try:
+            marcas, _ = await AsyncReportsModel._marcas_y_vendidas()
+            return marcas
+        except Exception as e:
+            print("AsyncReportsModel.obtener_marcas_con_ventas error:", e)
+            return []
+
+    @staticmethod
+    async def obtener_top5_marcas():
+        try:
+            marcas, _ = await AsyncReportsModel._marcas_y_vendidas()
+            return [{"brand": m["brand"], "ventas": m["ventas"]} for m in marcas[:5]]
+        except Exception as e:
+            print("AsyncReportsModel.obtener_top5_marcas error:", e)
+            return []
+
+    @staticmethod
+    async def _prendas_y_marcas():
+        (marcas, vendidas), documentos = await asyncio.gather(
+            AsyncReportsModel._marcas_y_vendidas(),
+            amongo.db.clothing.find({}, ReportsModel.PROYECCION_PRENDAS).to_list(None)
+        )
+        return marcas, ReportsModel._armar_prendas(documentos, vendidas)
+
+    @staticmethod
+    async def obtener_prendas_vendidas_stock():
+        try:
+            _, prendas = await AsyncReportsModel._prendas_y_marcas()
+            return prendas
+        except Exception as e:
+            print("AsyncReportsModel.obtener_prendas_vendidas_stock error:", e)
+            return []
+
+    @staticmethod
+    async def obtener_todos_combinado():
+        try:
+            marcas, prendas = await AsyncReportsModel._prendas_y_marcas()
+            return ReportsModel._armar_combinado(marcas, prendas)
+        except Exception as e:
+            print("AsyncReportsModel.obtener_todos_combinado error:", e)
+            return {"brands_with_sales": [], "items_sold": [], "top5_brands": []}
@@ -0,0 +1,146 @@
+# api/v1/app/commands.py
+"""
+Comandos de mantenimiento (Flask CLI). Uso, desde api/v1:
+    flask --app run rollups rebuild
+    flask --app run rollups verify [--repair]
+    flask --app run profiling run [--umbral-ms 0] [--sin-rollups] [--fail-on-alert]
+    flask --app run profiling show [--url http://127.0.0.1:5000]
+    flask --app run indexes apply
+    flask --app run indexes verify
+"""
+import json
+import urllib.request
+
+import click
+from flask.cli import AppGroup
+
+rollups_cli = AppGroup("rollups", help="Rollups de ventas por prenda y por marca.")
+
+
+@rollups_cli.command("rebuild")
+def rollups_rebuild():
+    """Recalcula los rollups desde sales."""
+    from .models.rollups import RollupsModel
+    RollupsModel.reconstruir()
+    click.echo("✔️ Rollups reconstruidos.")
+
+
+@rollups_cli.command("verify")
+@click.option("--repair", is_flag=True, help="Reconstruir si hay diferencias.")
+def rollups_verify(repair):
+    """Compara los rollups con los totales recalculados desde sales."""
+    from .models.rollups import RollupsModel
+    diferencias = RollupsModel.verificar()
+    total = len(diferencias["prendas"]) + len(diferencias["marcas"])
+    if not total:
+        click.echo("✔️ Rollups consistentes.")
+        return
+    for tipo in ("prendas", "marcas"):
+        for d in diferencias[tipo]:
+            click.echo(f"⚠️ {tipo} {d['_id']}: guardado={d['guardado']} esperado={d['esperado']}")
+    if repair:
+        RollupsModel.reconstruir()
+        click.echo("✔️ Rollups reconstruidos.")
+    else:
+        raise SystemExit(1)
+
+
+profiling_cli = AppGroup("profiling", help="Explain de consultas lentas de reportes y modelos.")
+
+
+def _imprimir_consultas(consultas):
+    if not consultas:
+        click.echo("✔️ Sin consultas lentas registradas.")
+    for c in consultas:
+        click.echo(f"\n{c['comando']} {c['coleccion']}  max={c['max_ms']:.1f} ms  x{c['conteo']}")
+        click.echo(f"   plan: {' > '.join(c.get('plan') or []) or '-'}")
+        click.echo(f"   docs examinados: {c.get('docs_examinados')}  claves: {c.get('claves_examinadas')}  devueltos: {c.get('n_devueltos')}")
+        for alerta in c.get("alertas", []):
+            click.echo(f"   ⚠️ {alerta}")
+
+
+@profiling_cli.command("run")
+@click.option("--umbral-ms", default=0.0, help="Explicar las consultas que tarden más que esto.")
+@click.option("--sin-rollups", is_flag=True, help="Forzar los pipelines de agregación sobre sales.")
+@click.option("--fail-on-alert", is_flag=True, help="Terminar con código 1 si alguna consulta tiene alertas.")
+def profiling_run(umbral_ms, sin_rollups, fail_on_alert):
+    """Ejecuta los reportes y las lecturas de los modelos y muestra sus planes."""
+    from datetime import datetime, timedelta, timezone
+    from .models.reports import ReportsModel
+    from .models.rollups import RollupsModel
+    from .models.brands import BrandsModel
+    from .models.clothing import ClothingModel
+    from .models.sales import SalesModel
+    from .models.users import UsersModel
+    from .utils.profiling import slow_queries
+
+    slow_queries.limpiar()
+    # Sin el hilo de fondo: procesar_pendientes() corre todos los explain antes del reporte
+    slow_queries.configurar(activo=True, umbral_ms=umbral_ms, sincronico=True)
+    disponibles = RollupsModel.disponibles
+    if sin_rollups:
+        RollupsModel.disponibles = staticmethod(lambda: False)
+    try:
+        ReportsModel.obtener_todos_combinado()
+        ReportsModel.obtener_prendas_vendidas_stock()
+        hasta = datetime.now(timezone.utc)
+        for grupo in ReportsModel.GRUPOS_PERIODO:
+            ReportsModel.obtener_ventas_por_periodo(hasta - timedelta(days=7), hasta, "day", grupo)
+        for modelo in (BrandsModel, ClothingModel, SalesModel, UsersModel):
+            pagina = modelo.obtener_pagina(50)
+            if pagina["items"]:
+                modelo.obtener_por_id(pagina["items"][0]["_id"])
+    finally:
+        RollupsModel.disponibles = disponibles
+        slow_queries.configurar(activo=False, sincronico=False)
+
+    slow_queries.procesar_pendientes()
+    consultas = slow_queries.entradas()
+    _imprimir_consultas(consultas)
+    if fail_on_alert and any(c.get("alertas") for c in consultas):
+        raise SystemExit(1)
+
+
+@profiling_cli.command("show")
+@click.option("--url", default="http://127.0.0.1:5000", help="API en ejecución.")
+def profiling_show(url):
+    """Muestra las consultas lentas capturadas por una API en ejecución."""
+    with urllib.request.urlopen(f"{url.rstrip('/')}/api/v1/admin/profiling/slow-queries") as respuesta:
+        datos = json.load(respuesta)
+    if not datos["activo"]:
+        click.echo("⚠️ El perfilado está desactivado (SLOW_QUERY_PROFILING=1 o PUT /api/v1/admin/profiling/slow-queries).")
+    _imprimir_consultas(datos["consultas"])
+
+
+indexes_cli = AppGroup("indexes", help="Índices del manifiesto app/indexes.py.")
+
+
+@indexes_cli.command("apply")
+def indexes_apply():
+    """Crea los índices del manifiesto que falten."""
+    from .index import mongo
+    from .indexes import asegurar_indices, verificar_indices
+    faltantes = verificar_indices(mongo.db)["faltantes"]
+    asegurar_indices(mongo.db)
+    for coleccion, claves in faltantes:
+        click.echo(f"✔️ {coleccion}: creado {claves}")
+    if not faltantes:
+        click.echo("✔️ Índices al día.")
+
+
+@indexes_cli.command("verify")
+def indexes_verify():
+    """Compara el manifiesto con la base y con los filtros/órdenes soportados."""
+    from .index import mongo
+    from .indexes import verificar_indices, combinaciones_sin_indice
+    diferencias = verificar_indices(mongo.db)
+    sin_indice = combinaciones_sin_indice()
+    for coleccion, claves in diferencias["faltantes"]:
+        click.echo(f"⚠️ {coleccion}: falta {claves}")
+    for coleccion, filtro, orden in sin_indice:
+        click.echo(f"⚠️ {coleccion}: filtro={filtro or '-'} sort={orden or '_id'} sin índice en el manifiesto")
+    for coleccion, nombre, claves in diferencias["sobrantes"]:
+        click.echo(f"   {coleccion}: {nombre} no está en el manifiesto")
+    if diferencias["faltantes"] or sin_indice:
+        raise SystemExit(1)
+    click.echo("✔️ Índices consistentes con el manifiesto.")
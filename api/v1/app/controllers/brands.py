@@ -1,33 +1,86 @@
 from flask import Blueprint, jsonify, request
+from ..utils.pagination import leer_paginacion
+from ..utils.filters import leer_filtros, leer_orden
+from ..utils.projection import leer_campos
+from ..utils.json_body import leer_json
+from ..utils.bulk import leer_bulk, limites_bulk, respuesta_bulk, LoteDemasiadoGrande
+from ..utils.cache import listado_condicional
+from ..utils.export import leer_exportacion, respuesta_exportacion
 from ..models.brands import BrandsModel
 
 brands_endpoint = Blueprint('brands_endpoint', __name__)
 
 @brands_endpoint.route('/brands', methods=['GET'])
+@listado_condicional("brands")
 def obtener_todos():
     id_brand = request.args.get('id')
 
+    try:
+        proyeccion = leer_campos(request.args)
+    except ValueError:
+        return jsonify({"error": "Parámetro fields inválido"}), 400
+
     if id_brand:
-        brand = BrandsModel.obtener_por_id(id_brand)
+        brand = BrandsModel.obtener_por_id(id_brand, proyeccion)
         if brand:
             return jsonify(brand), 200
         return jsonify({"error": "Marca no encontrada"}), 404
     
-    brands = BrandsModel.obtener_todos()
+    try:
+        filtro = leer_filtros(request.args, "brands")
+        orden = leer_orden(request.args, "brands", filtro)
+        paginacion = leer_paginacion(request.args, orden)
+    except ValueError:
+        return jsonify({"error": "Parámetros de consulta inválidos"}), 400
+    if paginacion:
+        return jsonify(BrandsModel.obtener_pagina(**paginacion, proyeccion=proyeccion, filtro=filtro, orden=orden)), 200
+
+    brands = BrandsModel.obtener_todos(proyeccion, filtro, orden)
     return jsonify(brands), 200
 
+@brands_endpoint.route('/brands/export', methods=['GET'])
+def exportar():
+    """
+    GET /api/v1/admin/brands/export?format=ndjson|csv&batch_size=1000&fields=a,b,c
+    """
+    try:
+        opciones = leer_exportacion(request.args)
+    except ValueError:
+        return jsonify({"error": "Parámetros de exportación inválidos"}), 400
+
+    filas = BrandsModel.exportar(**opciones)
+    return respuesta_exportacion("brands", filas, opciones["formato"])
+
 @brands_endpoint.route('/brands', methods=['POST'])
 def crear():
-    data = request.get_json()
+    data = leer_json()
     nuevo_id = BrandsModel.crear(data)
     if nuevo_id:
         return jsonify({"mensaje": "Marca creada", "id": nuevo_id}), 201
     return jsonify({"error": "Error al crear la marca"}), 400
 
+@brands_endpoint.route('/brands/bulk', methods=['POST'])
+def bulk():
+    """
+    POST /api/v1/admin/brands/bulk
+    Body: { "upserts": [doc, ...], "patches": [{"_id": "brand01", "country": "CL"}, ...], "deletes": ["id", ...] }
+    Retorna el resultado por item: 200 si se aplicaron todos, 207 si solo algunos.
+    """
+    max_items, batch_size = limites_bulk()
+    try:
+        operaciones = leer_bulk(leer_json(), max_items)
+    except LoteDemasiadoGrande as e:
+        return jsonify({"error": str(e)}), 413
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    cuerpo, codigo = respuesta_bulk(BrandsModel.bulk(operaciones, batch_size))
+    return jsonify(cuerpo), codigo
+
 @brands_endpoint.route('/brands', methods=['PUT'])
 def actualizar():
     id_brand = request.args.get('id')
-    data = request.get_json()
+    data = leer_json()
     actualizado = BrandsModel.actualizar(id_brand, data)
     if actualizado > 0:
         return jsonify({"mensaje": "Marca actualizada"}), 200
@@ -0,0 +1,19 @@
+from flask import Blueprint, jsonify
+from ..utils.cache import document_cache
+
+cache_endpoint = Blueprint('cache_endpoint', __name__)
+
+@cache_endpoint.route('/cache/documents', methods=['GET'])
+def obtener_estadisticas():
+    """
+    GET /api/v1/admin/cache/documents
+    Retorna: { "items", "max_items", "ttl", "canal",
+               "colecciones": { "<colección>": { hit, miss, eviction, invalidation } } }
+    Los contadores son del proceso que responde (en Prometheus: document_cache_events_total).
+    """
+    return jsonify(document_cache.estadisticas()), 200
+
+@cache_endpoint.route('/cache/documents', methods=['DELETE'])
+def limpiar():
+    document_cache.limpiar()
+    return jsonify({"mensaje": "Caché de documentos vaciada"}), 200
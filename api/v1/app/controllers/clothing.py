@@ -1,33 +1,86 @@
 from flask import Blueprint, jsonify, request
+from ..utils.pagination import leer_paginacion
+from ..utils.filters import leer_filtros, leer_orden
+from ..utils.projection import leer_campos
+from ..utils.json_body import leer_json
+from ..utils.bulk import leer_bulk, limites_bulk, respuesta_bulk, LoteDemasiadoGrande
+from ..utils.cache import listado_condicional
+from ..utils.export import leer_exportacion, respuesta_exportacion
 from ..models.clothing import ClothingModel
 
 clothing_endpoint = Blueprint('clothing_endpoint', __name__)
 
 @clothing_endpoint.route('/clothing', methods=['GET'])
+@listado_condicional("clothing")
 def obtener_todos():
     id_clothing = request.args.get('id')
 
+    try:
+        proyeccion = leer_campos(request.args)
+    except ValueError:
+        return jsonify({"error": "Parámetro fields inválido"}), 400
+
     if id_clothing:
-        item = ClothingModel.obtener_por_id(id_clothing)
+        item = ClothingModel.obtener_por_id(id_clothing, proyeccion)
         if item:
             return jsonify(item), 200
         return jsonify({"error": "Prenda no encontrada"}), 404
 
-    clothes = ClothingModel.obtener_todos()
+    try:
+        filtro = leer_filtros(request.args, "clothing")
+        orden = leer_orden(request.args, "clothing", filtro)
+        paginacion = leer_paginacion(request.args, orden)
+    except ValueError:
+        return jsonify({"error": "Parámetros de consulta inválidos"}), 400
+    if paginacion:
+        return jsonify(ClothingModel.obtener_pagina(**paginacion, proyeccion=proyeccion, filtro=filtro, orden=orden)), 200
+
+    clothes = ClothingModel.obtener_todos(proyeccion, filtro, orden)
     return jsonify(clothes), 200
 
+@clothing_endpoint.route('/clothing/export', methods=['GET'])
+def exportar():
+    """
+    GET /api/v1/admin/clothing/export?format=ndjson|csv&batch_size=1000&fields=a,b,c
+    """
+    try:
+        opciones = leer_exportacion(request.args)
+    except ValueError:
+        return jsonify({"error": "Parámetros de exportación inválidos"}), 400
+
+    filas = ClothingModel.exportar(**opciones)
+    return respuesta_exportacion("clothing", filas, opciones["formato"])
+
 @clothing_endpoint.route('/clothing', methods=['POST'])
 def crear():
-    data = request.get_json()
+    data = leer_json()
     nuevo_id = ClothingModel.crear(data)
     if nuevo_id:
         return jsonify({"mensaje": "Prenda creada", "id": nuevo_id}), 201
     return jsonify({"error": "Error al crear prenda"}), 400
 
+@clothing_endpoint.route('/clothing/bulk', methods=['POST'])
+def bulk():
+    """
+    POST /api/v1/admin/clothing/bulk
+    Body: { "upserts": [doc, ...], "patches": [{"_id": "cloth010", "price": 19.9, "in_stock": 4}, ...], "deletes": ["id", ...] }
+    Retorna el resultado por item: 200 si se aplicaron todos, 207 si solo algunos.
+    """
+    max_items, batch_size = limites_bulk()
+    try:
+        operaciones = leer_bulk(leer_json(), max_items)
+    except LoteDemasiadoGrande as e:
+        return jsonify({"error": str(e)}), 413
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    cuerpo, codigo = respuesta_bulk(ClothingModel.bulk(operaciones, batch_size))
+    return jsonify(cuerpo), codigo
+
 @clothing_endpoint.route('/clothing', methods=['PUT'])
 def actualizar():
     id_clothing = request.args.get('id')
-    data = request.get_json()
+    data = leer_json()
     actualizado = ClothingModel.actualizar(id_clothing, data)
     if actualizado > 0:
         return jsonify({"mensaje": "Prenda actualizada"}), 200
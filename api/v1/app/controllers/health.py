@@ -0,0 +1,30 @@
+import os
+
+import pymongo
+from flask import Blueprint, jsonify
+from ..index import mongo
+
+health_endpoint = Blueprint('health_endpoint', __name__)
+
+@health_endpoint.route('/healthz', methods=['GET'])
+def healthz():
+    """
+    GET /healthz
+    El proceso responde (liveness). No consulta MongoDB: una caída de la base
+    no debe hacer que se reinicien los workers.
+    """
+    return jsonify({"status": "ok"}), 200
+
+@health_endpoint.route('/readyz', methods=['GET'])
+def readyz():
+    """
+    GET /readyz
+    Listo para recibir tráfico: MongoDB responde a ping dentro de READYZ_TIMEOUT_MS (2000).
+    Retorna 503 si no.
+    """
+    try:
+        with pymongo.timeout(int(os.getenv("READYZ_TIMEOUT_MS", "2000")) / 1000):
+            mongo.cx.admin.command("ping")
+    except Exception as e:
+        return jsonify({"status": "error", "mongo": str(e)}), 503
+    return jsonify({"status": "ok", "mongo": "ok"}), 200
@@ -0,0 +1,14 @@
+from flask import Blueprint, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from ..utils.metrics import exportar_metricas
+
+metrics_endpoint = Blueprint('metrics_endpoint', __name__)
+
+@metrics_endpoint.route('/metrics', methods=['GET'])
+def metricas():
+    """
+    GET /metrics
+    Latencias por ruta, peticiones en curso, tamaño de respuestas y tiempos de
+    los comandos de MongoDB, en formato de texto de Prometheus.
+    """
+    return Response(exportar_metricas(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,40 @@
+from flask import Blueprint, jsonify
+from ..utils.json_body import leer_json
+from ..utils.profiling import slow_queries
+
+profiling_endpoint = Blueprint('profiling_endpoint', __name__)
+
+@profiling_endpoint.route('/profiling/slow-queries', methods=['GET'])
+def obtener_consultas_lentas():
+    """
+    GET /api/v1/admin/profiling/slow-queries
+    Retorna: { "activo", "umbral_ms", "consultas": [{ comando, coleccion, consulta, conteo,
+               ultima_ms, max_ms, plan, docs_examinados, claves_examinadas, alertas, ... }] }
+    Las consultas lentas se guardan por proceso: con varios workers cada uno tiene las suyas.
+    """
+    return jsonify({
+        "activo": slow_queries.activo,
+        "umbral_ms": slow_queries.umbral_ms,
+        "consultas": slow_queries.entradas()
+    }), 200
+
+@profiling_endpoint.route('/profiling/slow-queries', methods=['PUT'])
+def configurar():
+    """
+    PUT /api/v1/admin/profiling/slow-queries
+    Body: { "activo": true, "umbral_ms": 50 }
+    """
+    data = leer_json()
+    if not isinstance(data, dict):
+        return jsonify({"error": "Configuración inválida"}), 400
+    try:
+        umbral = float(data["umbral_ms"]) if "umbral_ms" in data else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "umbral_ms inválido"}), 400
+    slow_queries.configurar(activo=bool(data["activo"]) if "activo" in data else None, umbral_ms=umbral)
+    return jsonify({"mensaje": "Perfilado actualizado", "activo": slow_queries.activo, "umbral_ms": slow_queries.umbral_ms}), 200
+
+@profiling_endpoint.route('/profiling/slow-queries', methods=['DELETE'])
+def limpiar():
+    slow_queries.limpiar()
+    return jsonify({"mensaje": "Consultas lentas eliminadas"}), 200
@@ -1,22 +1,43 @@
 # api/v1/app/controllers/reports.py
-from flask import Blueprint, jsonify
+import queue
+import re
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from pymongo.errors import PyMongoError
 from ..models.reports import ReportsModel
+from ..models.live_reports import live_reports
+from ..models.analytics import analytics, ConsultaDemasiadoGrande, DIMENSIONES, LIMITE_FILAS, LIMITE_FILAS_MAXIMO
+from ..utils.cache import respuesta_reporte
+from ..utils.json_provider import codificar
 
 reports_endpoint = Blueprint('reports_endpoint', __name__)
 
+# Desplazamientos que acepta $dateTrunc además de los nombres Olson: +03, -0530, +05:30
+DESPLAZAMIENTO_UTC = re.compile(r"[+-]\d{2}(:?\d{2})?")
+
+def zona_valida(zona):
+    if DESPLAZAMIENTO_UTC.fullmatch(zona):
+        return True
+    try:
+        ZoneInfo(zona)
+        return True
+    except (ValueError, KeyError):
+        return False
+
 @reports_endpoint.route('/reports', methods=['GET'])
 def reports_combined():
     """
     GET /api/v1/admin/reports
-    Devuelve un objeto con las 3 vistas útiles para el front-end:
+    Devuelve un objeto con las 3 vistas útiles para el front-end
+    (cacheado; responde 304 si If-None-Match coincide con el ETag):
     {
       "brands_with_sales": [...],
       "items_sold": [...],
       "top5_brands": [...]
     }
     """
-    data = ReportsModel.obtener_todos_combinado()
-    return jsonify(data), 200
+    return respuesta_reporte("combinado", ReportsModel.obtener_todos_combinado)
 
 @reports_endpoint.route('/reports/marcas', methods=['GET'])
 def marcas_con_ventas():
@@ -24,8 +45,7 @@ def marcas_con_ventas():
     GET /api/v1/admin/reports/marcas
     Retorna: [{ "brand": "<nombre>", "ventas": <cantidad>, "brand_id": "<id>" }, ...]
     """
-    data = ReportsModel.obtener_marcas_con_ventas()
-    return jsonify(data), 200
+    return respuesta_reporte("marcas", ReportsModel.obtener_marcas_con_ventas)
 
 @reports_endpoint.route('/reports/prendas', methods=['GET'])
 def prendas_vendidas_stock():
@@ -33,8 +53,7 @@ def prendas_vendidas_stock():
     GET /api/v1/admin/reports/prendas
     Retorna: [{ "item_id": "<id>", "name": "<nombre>", "sold": n, "in_stock": n, "remaining": n }, ...]
     """
-    data = ReportsModel.obtener_prendas_vendidas_stock()
-    return jsonify(data), 200
+    return respuesta_reporte("prendas", ReportsModel.obtener_prendas_vendidas_stock)
 
 @reports_endpoint.route('/reports/top5', methods=['GET'])
 def top5_marcas():
@@ -42,5 +61,101 @@ def top5_marcas():
     GET /api/v1/admin/reports/top5
     Retorna: [{ "brand": "<nombre>", "ventas": <cantidad> }, ...] (máx 5)
     """
-    data = ReportsModel.obtener_top5_marcas()
-    return jsonify(data), 200
\ No newline at end of file
+    return respuesta_reporte("top5", ReportsModel.obtener_top5_marcas)
+
+@reports_endpoint.route('/reports/ventas', methods=['GET'])
+def ventas_por_periodo():
+    """
+    GET /api/v1/admin/reports/ventas?from=<ISO>&to=<ISO>&bucket=hour|day|week&group=item|brand|category&tz=UTC
+    Por defecto: últimos 7 días, por día y por prenda.
+    Retorna: [{ "bucket": "<ISO>", "key": "<id o categoría>", "name": "<nombre>", "ventas": n }, ...]
+    """
+    bucket = request.args.get("bucket", "day")
+    grupo = request.args.get("group", "item")
+    zona = request.args.get("tz", "UTC")
+    if bucket not in ("hour", "day", "week") or grupo not in ReportsModel.GRUPOS_PERIODO:
+        return jsonify({"error": "bucket o group inválido"}), 400
+    if not zona_valida(zona):
+        return jsonify({"error": "tz inválida (nombre IANA, p. ej. America/Costa_Rica, o desplazamiento +HH:MM)"}), 400
+    try:
+        hasta = datetime.fromisoformat(request.args["to"]) if request.args.get("to") else datetime.now(timezone.utc)
+        desde = datetime.fromisoformat(request.args["from"]) if request.args.get("from") else hasta - timedelta(days=7)
+    except ValueError:
+        return jsonify({"error": "Fechas inválidas (formato ISO 8601)"}), 400
+
+    data = ReportsModel.obtener_ventas_por_periodo(desde, hasta, bucket, grupo, zona)
+    return jsonify(data), 200
+
+@reports_endpoint.route('/reports/analytics', methods=['GET'])
+def analitica():
+    """
+    GET /api/v1/admin/reports/analytics?group=brand,day&from=<ISO>&to=<ISO>&top=5&window=7&limit=1000
+    Filtros opcionales: brand_id, category, clothing_id. group: una o dos de brand,
+    category, item, day; window requiere day. Las fechas se comparan por día (UTC).
+    400 si window necesita más de MAX_CELDAS_DENSAS celdas (series x días del rango);
+    503 si la instantánea no se pudo leer de MongoDB.
+    Retorna: { "rows": [{ "brand": "<id>", "brand_name": ..., "day": "<fecha>", "ventas": n, "lineas": n, "ventana"?: n }],
+               "total_rows": n, "snapshot": { "sales", "refreshed_at", "watermark" } }
+    """
+    if not analytics.disponible():
+        return jsonify({"error": "Analítica no disponible (falta numpy)"}), 503
+    grupo = [d.strip() for d in request.args.get("group", "brand").split(",") if d.strip()]
+    try:
+        if not 1 <= len(grupo) <= 2 or len(set(grupo)) != len(grupo) or not set(grupo) <= set(DIMENSIONES):
+            raise ValueError("group inválido")
+        top = int(request.args["top"]) if request.args.get("top") else None
+        ventana = int(request.args["window"]) if request.args.get("window") else None
+        limite = int(request.args.get("limit", LIMITE_FILAS))
+        if limite <= 0:
+            raise ValueError("limit inválido")
+        if (top is not None and top <= 0) or (ventana is not None and (ventana <= 0 or "day" not in grupo)):
+            raise ValueError("top o window inválido")
+        desde = datetime.fromisoformat(request.args["from"]) if request.args.get("from") else None
+        hasta = datetime.fromisoformat(request.args["to"]) if request.args.get("to") else None
+    except ValueError:
+        return jsonify({"error": "Parámetros de analítica inválidos"}), 400
+
+    filtros = {c: request.args[c] for c in ("brand_id", "category", "clothing_id") if request.args.get(c)}
+    try:
+        data = analytics.consultar(grupo, desde, hasta, top, ventana, min(limite, LIMITE_FILAS_MAXIMO), **filtros)
+    except ConsultaDemasiadoGrande as e:
+        return jsonify({"error": str(e)}), 400
+    except PyMongoError as e:
+        # La primera consulta arma la instantánea: sin MongoDB no hay datos que responder
+        print("analitica error:", e)
+        return jsonify({"error": "Analítica no disponible, reintente"}), 503, {"Retry-After": "5"}
+    return jsonify(data), 200
+
+def _evento_sse(evento, data):
+    return f"event: {evento}\ndata: {codificar(data).decode()}\n\n"
+
+@reports_endpoint.route('/reports/stream', methods=['GET'])
+def reports_stream():
+    """
+    GET /api/v1/admin/reports/stream  (Server-Sent Events)
+    event: snapshot -> { "items": {id: fila}, "brands": {id: fila}, "top5": [...] }
+    event: delta    -> solo las filas que cambiaron (ver LiveReportsHub)
+    """
+    cola = live_reports.suscribir()
+
+    def eventos():
+        try:
+            yield _evento_sse("snapshot", live_reports.actual())
+            while True:
+                try:
+                    delta = cola.get(timeout=15)
+                except queue.Empty:
+                    yield ": ping\n\n"  # mantener viva la conexión
+                    continue
+                if delta is None:
+                    yield _evento_sse("snapshot", live_reports.actual())
+                else:
+                    yield _evento_sse("delta", delta)
+        finally:
+            live_reports.desuscribir(cola)
+
+    return Response(
+        stream_with_context(eventos()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,33 +1,157 @@
 from flask import Blueprint, jsonify, request
+from ..utils.pagination import leer_paginacion
+from ..utils.filters import leer_filtros, leer_orden
+from ..utils.projection import leer_campos
+from ..utils.expand import leer_expand, colecciones_expand, campos_expand
+from ..utils.json_body import leer_json
+from ..utils.bulk import leer_bulk, limites_bulk, respuesta_bulk, LoteDemasiadoGrande
+from ..utils.cache import listado_condicional
+from ..utils.export import leer_exportacion, respuesta_exportacion
 from ..models.sales import SalesModel
+from ..models.checkout import CheckoutModel
+from ..models.sales_ingest import sales_ingest, ColaLlena, SinConfirmar
 
 sales_endpoint = Blueprint('sales_endpoint', __name__)
 
 @sales_endpoint.route('/sales', methods=['GET'])
+@listado_condicional("sales", lambda args: colecciones_expand(args, "sales"))
 def obtener_todos():
+    """
+    ?expand=user,clothing,clothing.brand agrega a cada venta sus documentos
+    relacionados (una consulta $in por relación y por página).
+    """
     id_sale = request.args.get('id')
 
+    try:
+        proyeccion = leer_campos(request.args)
+    except ValueError:
+        return jsonify({"error": "Parámetro fields inválido"}), 400
+    try:
+        expand = leer_expand(request.args, "sales")
+    except ValueError:
+        return jsonify({"error": "Parámetro expand inválido"}), 400
+    if expand and proyeccion:
+        proyeccion = {**proyeccion, **dict.fromkeys(campos_expand("sales", expand), 1)}
+
     if id_sale:
-        sale = SalesModel.obtener_por_id(id_sale)
+        sale = SalesModel.obtener_por_id(id_sale, proyeccion)
         if sale:
-            return jsonify(sale), 200
+            # Copia: el documento de la caché no se modifica
+            return jsonify(SalesModel.expandir([dict(sale)], expand)[0]), 200
         return jsonify({"error": "Venta no encontrada"}), 404
 
-    sales = SalesModel.obtener_todos()
-    return jsonify(sales), 200
+    try:
+        filtro = leer_filtros(request.args, "sales")
+        orden = leer_orden(request.args, "sales", filtro)
+        paginacion = leer_paginacion(request.args, orden)
+    except ValueError:
+        return jsonify({"error": "Parámetros de consulta inválidos"}), 400
+    if paginacion:
+        pagina = SalesModel.obtener_pagina(**paginacion, proyeccion=proyeccion, filtro=filtro, orden=orden)
+        SalesModel.expandir(pagina["items"], expand)
+        return jsonify(pagina), 200
+
+    sales = SalesModel.obtener_todos(proyeccion, filtro, orden)
+    return jsonify(SalesModel.expandir(sales, expand)), 200
+
+@sales_endpoint.route('/sales/export', methods=['GET'])
+def exportar():
+    """
+    GET /api/v1/admin/sales/export?format=ndjson|csv&batch_size=1000
+    Filtros opcionales: from, to (ISO 8601 sobre date), user_id, clothing_id, fields=a,b,c
+    """
+    try:
+        opciones = leer_exportacion(request.args)
+        filtro = leer_filtros(request.args, "sales")
+    except ValueError:
+        return jsonify({"error": "Parámetros de exportación inválidos"}), 400
+
+    filas = SalesModel.exportar(filtro=filtro, **opciones)
+    return respuesta_exportacion("sales", filas, opciones["formato"])
 
 @sales_endpoint.route('/sales', methods=['POST'])
 def crear():
-    data = request.get_json()
+    """
+    Con SALES_INGEST=1 la venta entra al buffer de ingesta y se escribe por lotes:
+    201 si ya está en MongoDB (SALES_INGEST_ACK=flush), 200 si es el reintento de una
+    venta ya escrita con el mismo _id, 202 con el recibo si quedó en la cola (ack async), 503 con Retry-After si la cola está llena o si la
+    escritura no se confirmó a tiempo (ack flush; el cuerpo trae el _id para
+    reintentar con el mismo).
+    """
+    data = leer_json()
+    if sales_ingest.activo:
+        return encolar(data)
     nuevo_id = SalesModel.crear(data)
     if nuevo_id:
         return jsonify({"mensaje": "Venta creada", "id": nuevo_id}), 201
     return jsonify({"error": "Error al crear venta"}), 400
 
+def encolar(data):
+    if not isinstance(data, dict):
+        return jsonify({"error": "Error al crear venta"}), 400
+    try:
+        recibo, estado = sales_ingest.encolar(data)
+    except ColaLlena:
+        return jsonify({"error": "Demasiadas ventas en cola, reintente"}), 503, {"Retry-After": "1"}
+    except SinConfirmar as e:
+        return jsonify({"error": "La venta no se confirmó a tiempo, reintente", "id": e.args[0]}), 503, {"Retry-After": "1"}
+    except ValueError:
+        return jsonify({"error": "Error al crear venta"}), 400
+    if estado == "escrita":
+        return jsonify({"mensaje": "Venta creada", "id": recibo}), 201
+    if estado == "repetida":
+        return jsonify({"mensaje": "Venta ya registrada", "id": recibo}), 200
+    return jsonify({"mensaje": "Venta recibida", "id": recibo}), 202
+
+@sales_endpoint.route('/sales/ingest', methods=['GET'])
+def estado_ingesta():
+    """
+    GET /api/v1/admin/sales/ingest
+    Estado del buffer de ingesta de este proceso: ventas en cola y contadores.
+    """
+    return jsonify(sales_ingest.estadisticas()), 200
+
+@sales_endpoint.route('/sales/bulk', methods=['POST'])
+def bulk():
+    """
+    POST /api/v1/admin/sales/bulk
+    Body: { "upserts": [doc, ...], "patches": [{"_id": "sale01", "quantity": 3}, ...], "deletes": ["id", ...] }
+    Retorna el resultado por item: 200 si se aplicaron todos, 207 si solo algunos.
+    """
+    max_items, batch_size = limites_bulk()
+    try:
+        operaciones = leer_bulk(leer_json(), max_items)
+    except LoteDemasiadoGrande as e:
+        return jsonify({"error": str(e)}), 413
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    cuerpo, codigo = respuesta_bulk(SalesModel.bulk(operaciones, batch_size))
+    return jsonify(cuerpo), codigo
+
+@sales_endpoint.route('/sales/checkout', methods=['POST'])
+def checkout():
+    """
+    POST /api/v1/admin/sales/checkout
+    Body: { "user_id": "...", "items": [{ "clothing_id": "...", "quantity": n }, ...], "date"?: ... }
+    Retorna el resultado por línea: 201 si todas se vendieron, 207 si solo algunas, 409 si ninguna.
+    """
+    data = leer_json()
+    if not isinstance(data, dict) or not data.get("user_id") or not isinstance(data.get("items"), list) or not data["items"]:
+        return jsonify({"error": "Se requiere user_id y una lista de items"}), 400
+
+    lineas = CheckoutModel.procesar(data["user_id"], data["items"], data.get("date"))
+    vendidas = sum(1 for l in lineas if l["ok"])
+    if vendidas == len(lineas):
+        return jsonify({"mensaje": "Compra registrada", "items": lineas}), 201
+    if vendidas:
+        return jsonify({"mensaje": "Compra registrada parcialmente", "items": lineas}), 207
+    return jsonify({"error": "No se pudo vender ningún item", "items": lineas}), 409
+
 @sales_endpoint.route('/sales', methods=['PUT'])
 def actualizar():
     id_sale = request.args.get('id')
-    data = request.get_json()
+    data = leer_json()
     actualizado = SalesModel.actualizar(id_sale, data)
     if actualizado > 0:
         return jsonify({"mensaje": "Venta actualizada"}), 200
@@ -0,0 +1,30 @@
+from flask import Blueprint, jsonify, request
+from ..models.search import search_index, CAMPOS_BUSQUEDA, LIMITE_POR_DEFECTO, LIMITE_MAXIMO
+
+search_endpoint = Blueprint('search_endpoint', __name__)
+
+@search_endpoint.route('/search', methods=['GET'])
+def buscar():
+    """
+    GET /api/v1/admin/search?q=cam&in=clothing,brands,users&limit=10
+    Autocompletado por prefijo (y aproximado si hay pocos resultados) sobre el nombre
+    de prendas y marcas y el nombre y email de usuarios.
+    Retorna: { "clothing": [{ _id, name, price, brand_id }], "brands": [{ _id, name }],
+               "users": [{ _id, name, email }] } con las colecciones pedidas en "in".
+    """
+    consulta = request.args.get('q', '')
+    colecciones = request.args.get('in') or ",".join(CAMPOS_BUSQUEDA)
+    colecciones = [c.strip() for c in colecciones.split(",")]
+    try:
+        limit = int(request.args.get('limit', LIMITE_POR_DEFECTO))
+    except ValueError:
+        limit = 0
+    if limit <= 0 or any(c not in CAMPOS_BUSQUEDA for c in colecciones):
+        return jsonify({"error": "Parámetros de búsqueda inválidos"}), 400
+
+    try:
+        resultados = {c: search_index.buscar(c, consulta, min(limit, LIMITE_MAXIMO)) for c in colecciones}
+    except Exception as e:
+        print("buscar error:", e)
+        return jsonify({"error": "Búsqueda no disponible"}), 503
+    return jsonify(resultados), 200
@@ -1,33 +1,86 @@
 from flask import Blueprint, jsonify, request
+from ..utils.pagination import leer_paginacion
+from ..utils.filters import leer_filtros, leer_orden
+from ..utils.projection import leer_campos
+from ..utils.json_body import leer_json
+from ..utils.bulk import leer_bulk, limites_bulk, respuesta_bulk, LoteDemasiadoGrande
+from ..utils.cache import listado_condicional
+from ..utils.export import leer_exportacion, respuesta_exportacion
 from ..models.users import UsersModel
 
 users_endpoint = Blueprint('users_endpoint', __name__)
 
 @users_endpoint.route('/users', methods=['GET'])
+@listado_condicional("users")
 def obtener_todos():
     id_user = request.args.get('id')
 
+    try:
+        proyeccion = leer_campos(request.args)
+    except ValueError:
+        return jsonify({"error": "Parámetro fields inválido"}), 400
+
     if id_user:
-        user = UsersModel.obtener_por_id(id_user)
+        user = UsersModel.obtener_por_id(id_user, proyeccion)
         if user:
             return jsonify(user), 200
         return jsonify({"error": "Usuario no encontrado"}), 404
 
-    users = UsersModel.obtener_todos()
+    try:
+        filtro = leer_filtros(request.args, "users")
+        orden = leer_orden(request.args, "users", filtro)
+        paginacion = leer_paginacion(request.args, orden)
+    except ValueError:
+        return jsonify({"error": "Parámetros de consulta inválidos"}), 400
+    if paginacion:
+        return jsonify(UsersModel.obtener_pagina(**paginacion, proyeccion=proyeccion, filtro=filtro, orden=orden)), 200
+
+    users = UsersModel.obtener_todos(proyeccion, filtro, orden)
     return jsonify(users), 200
 
+@users_endpoint.route('/users/export', methods=['GET'])
+def exportar():
+    """
+    GET /api/v1/admin/users/export?format=ndjson|csv&batch_size=1000&fields=a,b,c
+    """
+    try:
+        opciones = leer_exportacion(request.args)
+    except ValueError:
+        return jsonify({"error": "Parámetros de exportación inválidos"}), 400
+
+    filas = UsersModel.exportar(**opciones)
+    return respuesta_exportacion("users", filas, opciones["formato"])
+
 @users_endpoint.route('/users', methods=['POST'])
 def crear():
-    data = request.get_json()
+    data = leer_json()
     nuevo_id = UsersModel.crear(data)
     if nuevo_id:
         return jsonify({"mensaje": "Usuario creado", "id": nuevo_id}), 201
     return jsonify({"error": "Error al crear usuario"}), 400
 
+@users_endpoint.route('/users/bulk', methods=['POST'])
+def bulk():
+    """
+    POST /api/v1/admin/users/bulk
+    Body: { "upserts": [doc, ...], "patches": [{"_id": "user01", "name": "Ana"}, ...], "deletes": ["id", ...] }
+    Retorna el resultado por item: 200 si se aplicaron todos, 207 si solo algunos.
+    """
+    max_items, batch_size = limites_bulk()
+    try:
+        operaciones = leer_bulk(leer_json(), max_items)
+    except LoteDemasiadoGrande as e:
+        return jsonify({"error": str(e)}), 413
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    cuerpo, codigo = respuesta_bulk(UsersModel.bulk(operaciones, batch_size))
+    return jsonify(cuerpo), codigo
+
 @users_endpoint.route('/users', methods=['PUT'])
 def actualizar():
     id_user = request.args.get('id')
-    data = request.get_json()
+    data = leer_json()
     actualizado = UsersModel.actualizar(id_user, data)
     if actualizado > 0:
         return jsonify({"mensaje": "Usuario actualizado"}), 200
@@ -12,15 +12,99 @@ def create_app():
     app = Flask(__name__)
     app.config["MONGO_URI"] = os.getenv("MONGO_URI")
 
-    mongo.init_app(app)
+    # El MongoClient se crea aquí, no al importar el módulo: con gunicorn cada worker
+    # llama a create_app después del fork y tiene su propio pool de conexiones.
+    # Tamaño del pool y timeouts: MONGO_MAX_POOL_SIZE, MONGO_SERVER_SELECTION_TIMEOUT_MS, ...
+    # Métricas Prometheus: el listener de comandos se registra al crear el MongoClient
+    from .utils.metrics import configurar_metricas, mongo_metrics
+    from .utils.profiling import slow_queries
+    from .utils.mongo_client import opciones_cliente, configurar_limite_consultas
+    mongo.init_app(app, event_listeners=[mongo_metrics, slow_queries], **opciones_cliente())
+    configurar_limite_consultas(app, int(os.getenv("MONGO_MAX_TIME_MS", "0")))
+    # init_app instala el BSONProvider de Flask-PyMongo (json_util); las respuestas usan orjson
+    from .utils.json_provider import BSONJSONProvider
+    app.json = BSONJSONProvider(app)
+    configurar_metricas(app)
+
+    # Compresión gzip/brotli según Accept-Encoding (respuestas de al menos COMPRESS_MIN_SIZE bytes)
+    from .utils.compression import configurar_compresion
+    configurar_compresion(app)
+
+    # Perfilado de consultas lentas (explain de los find/aggregate sobre el umbral), apagado por defecto
+    slow_queries.configurar(
+        cliente=mongo.cx,
+        activo=os.getenv("SLOW_QUERY_PROFILING", "0") == "1",
+        umbral_ms=float(os.getenv("SLOW_QUERY_MS", "100"))
+    )
     CORS(app)
 
+    # Caché de reportes: LRU en memoria por defecto, o un backend compartido ("modulo:Clase").
+    # Caché de documentos por _id (obtener_por_id) con canal de invalidación opcional.
+    from .utils.cache import configurar_cache
+    configurar_cache()
+
+    # Reportes en vivo (SSE): change stream si hay replica set, si no sondeo periódico
+    from .models.live_reports import live_reports
+    live_reports.configurar(
+        modo=os.getenv("REPORTS_STREAM_MODE", "auto"),
+        intervalo_sondeo=float(os.getenv("REPORTS_STREAM_POLL_SECONDS", "5"))
+    )
+
+    # Búsqueda / autocompletado: índice en memoria por proceso, construido con la
+    # primera búsqueda o al iniciar (SEARCH_WARMUP=1)
+    from .models.search import search_index
+    search_index.configurar(
+        edad_maxima=float(os.getenv("SEARCH_MAX_AGE_SECONDS", "300")),
+        precargar=os.getenv("SEARCH_WARMUP", "0") == "1"
+    )
+
+    # Analítica ad-hoc (GET /reports/analytics): instantánea columnar en memoria de cada
+    # proceso, leída de un secundario si hay y extendida por marca de agua
+    from .models.analytics import analytics
+    analytics.configurar(
+        intervalo=float(os.getenv("ANALYTICS_REFRESH_SECONDS", "5")),
+        reconstruccion=float(os.getenv("ANALYTICS_REBUILD_SECONDS", "3600")),
+        lectura=os.getenv("ANALYTICS_READ_PREFERENCE", "secondaryPreferred"),
+        precargar=os.getenv("ANALYTICS_WARMUP", "0") == "1"
+    )
+
+    # Ingesta de ventas por lotes para POST /sales (SALES_INGEST=1), apagada por defecto
+    from .models.sales_ingest import sales_ingest
+    sales_ingest.configurar(
+        activo=os.getenv("SALES_INGEST", "0") == "1",
+        capacidad=int(os.getenv("SALES_INGEST_QUEUE_SIZE", "10000")),
+        max_lote=int(os.getenv("SALES_INGEST_BATCH_SIZE", "500")),
+        intervalo_ms=float(os.getenv("SALES_INGEST_FLUSH_MS", "50")),
+        confirmacion=os.getenv("SALES_INGEST_ACK", "flush")
+    )
+
+    # Crear los índices del manifiesto (app/indexes.py). Con colecciones grandes se
+    # puede desactivar (INDEXES_ON_STARTUP=0) y aplicar con "flask --app run indexes apply".
+    from .indexes import asegurar_indices
+    if os.getenv("INDEXES_ON_STARTUP", "1") == "1":
+        try:
+            asegurar_indices(mongo.db)
+        except Exception as e:
+            print("create_app: no se pudieron crear los índices:", e)
+
+    # Rollups de una base sin ventas (vacíos); con ventas se construyen con "rollups rebuild"
+    from .models.rollups import RollupsModel
+    try:
+        RollupsModel.construir_si_vacia()
+    except Exception as e:
+        print("create_app: no se pudieron construir los rollups:", e)
+
     # Importar los controladores correctos
     from .controllers.brands import brands_endpoint
     from .controllers.clothing import clothing_endpoint
     from .controllers.sales import sales_endpoint
     from .controllers.users import users_endpoint
     from .controllers.reports import reports_endpoint
+    from .controllers.metrics import metrics_endpoint
+    from .controllers.profiling import profiling_endpoint
+    from .controllers.health import health_endpoint
+    from .controllers.search import search_endpoint
+    from .controllers.cache import cache_endpoint
 
     # Registrar los blueprints con prefijos adecuados
     app.register_blueprint(brands_endpoint, url_prefix="/api/v1/admin")
@@ -28,6 +112,17 @@ def create_app():
     app.register_blueprint(sales_endpoint, url_prefix="/api/v1/admin")
     app.register_blueprint(users_endpoint, url_prefix="/api/v1/admin")
     app.register_blueprint(reports_endpoint, url_prefix="/api/v1/admin")
+    app.register_blueprint(profiling_endpoint, url_prefix="/api/v1/admin")
+    app.register_blueprint(search_endpoint, url_prefix="/api/v1/admin")
+    app.register_blueprint(cache_endpoint, url_prefix="/api/v1/admin")
+    app.register_blueprint(metrics_endpoint)
+    app.register_blueprint(health_endpoint)
     CORS(app, origins="*")  # Permitir CORS para todos los orígenes
 
+    # Comandos de mantenimiento (flask --app run <comando>)
+    from .commands import rollups_cli, profiling_cli, indexes_cli
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(profiling_cli)
+    app.cli.add_command(indexes_cli)
+
     return app
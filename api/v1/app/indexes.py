@@ -0,0 +1,96 @@
+# api/v1/app/indexes.py
+"""
+Manifiesto de los índices que necesitan los reportes y consultas de la API.
+Los joins de ReportsModel resuelven sales.clothing_id -> clothing._id y
+clothing.brand_id -> brands._id por igualdad, y el reporte de prendas busca
+las ventas de cada prenda por sales.clothing_id. Los reportes por periodo
+filtran por rango sobre sales.date.
+
+Los listados aceptan un filtro de igualdad y un orden (utils/filters.py): cada
+par tiene un índice { filtro, orden, _id } (el _id desempata la paginación keyset),
+así el orden sale del índice sin ordenar en memoria. Los rangos (precio, fecha)
+ordenan por su propio campo y usan el mismo índice; in_stock y un segundo
+filtro de igualdad se evalúan sobre los documentos que trae el índice.
+
+Se aplican al iniciar la app (INDEXES_ON_STARTUP=0 lo desactiva) o con
+    flask --app run indexes apply
+y se comparan con la base con
+    flask --app run indexes verify
+"""
+from .utils.filters import IGUALDAD, ORDENES
+
+INDICES = {
+    "sales": [
+        [("clothing_id", 1), ("_id", 1)],
+        [("clothing_id", 1), ("date", 1), ("_id", 1)],
+        [("user_id", 1), ("_id", 1)],
+        [("user_id", 1), ("date", 1), ("_id", 1)],
+        [("date", 1), ("_id", 1)],
+    ],
+    "clothing": [
+        [("brand_id", 1), ("_id", 1)],
+        [("brand_id", 1), ("price", 1), ("_id", 1)],
+        [("brand_id", 1), ("name", 1), ("_id", 1)],
+        [("category", 1), ("_id", 1)],
+        [("category", 1), ("price", 1), ("_id", 1)],
+        [("category", 1), ("name", 1), ("_id", 1)],
+        [("price", 1), ("_id", 1)],
+        [("name", 1), ("_id", 1)],
+    ],
+    "users": [
+        [("address.city", 1), ("_id", 1)],
+        [("address.city", 1), ("name", 1), ("_id", 1)],
+        [("address.country", 1), ("_id", 1)],
+        [("address.country", 1), ("name", 1), ("_id", 1)],
+        [("name", 1), ("_id", 1)],
+    ],
+    "brands": [
+        [("name", 1), ("_id", 1)],
+    ],
+}
+
+
+def asegurar_indices(db):
+    # create_index es idempotente: los índices existentes no se reconstruyen
+    for coleccion, indices in INDICES.items():
+        for claves in indices:
+            db[coleccion].create_index(claves)
+
+
+def verificar_indices(db):
+    """
+    Compara el manifiesto con los índices de la base.
+    Retorna { faltantes: [(coleccion, claves)], sobrantes: [(coleccion, nombre, claves)] }.
+    Los sobrantes (p. ej. los de DataBase/normalize_ids.py) solo se informan.
+    """
+    faltantes, sobrantes = [], []
+    for coleccion, indices in INDICES.items():
+        existentes = {
+            nombre: [(k, d if isinstance(d, str) else int(d)) for k, d in info["key"]]
+            for nombre, info in db[coleccion].index_information().items()
+        }
+        for claves in indices:
+            if claves not in existentes.values():
+                faltantes.append((coleccion, claves))
+        for nombre, claves in existentes.items():
+            if nombre != "_id_" and claves not in indices:
+                sobrantes.append((coleccion, nombre, claves))
+    return {"faltantes": faltantes, "sobrantes": sobrantes}
+
+
+def combinaciones_sin_indice():
+    """
+    Pares (filtro, orden) de utils/filters.py sin un índice del manifiesto que
+    empiece por { filtro, orden, _id }. Debe estar vacío.
+    """
+    sin_indice = []
+    for coleccion, filtros in IGUALDAD.items():
+        prefijos = [[k for k, _ in claves] for claves in INDICES.get(coleccion, [])]
+        for filtro in [None, *filtros.values()]:
+            for orden in [None, *ORDENES[coleccion]]:
+                requerido = [c for c in (filtro, orden) if c] + ["_id"]
+                if requerido == ["_id"]:
+                    continue  # índice de _id
+                if not any(p[:len(requerido)] == requerido for p in prefijos):
+                    sin_indice.append((coleccion, filtro, orden))
+    return sin_indice
@@ -0,0 +1,463 @@
+# api/v1/app/models/analytics.py
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ReadPreference
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin el paquete /reports/analytics responde 503
+    np = None
+
+from app.index import mongo
+from app.models.rollups import RollupsModel
+from app.utils.cache import report_cache, EDICIONES_VENTAS
+from app.utils.pagination import _filtro_despues_de, orden_find
+
+DIMENSIONES = ("brand", "category", "item", "day")
+ORDEN_MARCA = ("date", 1)  # la marca de agua avanza por (date, _id), con el índice de sales.date
+PROYECCION_VENTAS = {"clothing_id": 1, "quantity": 1, "amount": 1, "date": 1}
+EPOCA = datetime(1970, 1, 1)
+SIN_FECHA = -(2 ** 31)
+LOTE_LECTURA = 10000
+MAX_CELDAS_DENSAS = 2_000_000  # más grupos posibles que esto: np.unique en vez de bincount; tope de la matriz de window
+LIMITE_FILAS = 1000
+LIMITE_FILAS_MAXIMO = 50000
+
+PREFERENCIAS_LECTURA = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+class ConsultaDemasiadoGrande(ValueError):
+    pass
+
+
+def _dia(fecha):
+    # Días desde 1970 (UTC); SIN_FECHA si la venta no tiene una fecha válida
+    if not isinstance(fecha, datetime):
+        return SIN_FECHA
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return (fecha - EPOCA).days
+
+
+def _fecha_iso(dia):
+    return (EPOCA + timedelta(days=int(dia))).date().isoformat()
+
+
+def _numero(valor):
+    return int(valor) if float(valor).is_integer() else float(valor)
+
+
+class _Instantanea:
+    """
+    Copia columnar de sales en memoria, una fila por venta:
+      - prenda: código de la prenda (int32, índice en ids_prenda)
+      - cantidad: quantity o amount, igual que en los rollups (float64)
+      - dia: días desde 1970 (int32, SIN_FECHA si no tiene date)
+    y las dimensiones por código de prenda (marca_de_prenda, categoria_de_prenda,
+    -1 si la prenda o la marca no existen: igual que el join de los reportes, esas
+    ventas no cuentan al agrupar por prenda, marca o categoría).
+    """
+
+    def __init__(self):
+        self.codigos_prenda = {}
+        self.ids_prenda = []
+        self.prenda = np.empty(0, np.int32)
+        self.cantidad = np.empty(0, np.float64)
+        self.dia = np.empty(0, np.int32)
+        self.marca = None       # (date, _id) de la última venta leída
+        self.versiones = None   # versiones de clothing y brands con que se armaron las dimensiones
+        self.ediciones = None   # versión de EDICIONES_VENTAS al leer sales desde cero
+        self.completa = self.leida = time.monotonic()
+        self.actualizada = datetime.now(timezone.utc)
+
+    # ---- carga ----
+
+    @classmethod
+    def construir(cls, db):
+        instantanea = cls()
+        # Antes de leer: una edición durante la lectura obliga a reconstruir la próxima vez
+        instantanea.ediciones = report_cache.version(EDICIONES_VENTAS)
+        instantanea._agregar(*instantanea._leer_ventas(db, {}))
+        instantanea._armar_dimensiones(db)
+        instantanea._armar_columnas()
+        return instantanea
+
+    def extender(self, db):
+        """
+        Nueva instantánea con las ventas posteriores a la marca de agua. Retorna None
+        (hay que reconstruir) si se editó o borró alguna venta desde la lectura
+        completa, o si el conteo de sales no coincide con las filas leídas (ventas
+        con fecha anterior a la marca o sin fecha, borrados hechos por fuera de la API).
+        """
+        if report_cache.version(EDICIONES_VENTAS) != self.ediciones:
+            return None
+        # Las altas concurrentes quedan entre los conteos de antes y después de leer
+        conteo_antes = db.sales.estimated_document_count()
+        nueva = _Instantanea()
+        nueva.ediciones = self.ediciones
+        nueva.codigos_prenda = dict(self.codigos_prenda)
+        nueva.ids_prenda = list(self.ids_prenda)
+        nueva.prenda, nueva.cantidad, nueva.dia = self.prenda, self.cantidad, self.dia
+        nueva.marca, nueva.completa = self.marca, self.completa
+        filtro = _filtro_despues_de(ORDEN_MARCA, *self.marca) if self.marca else {}
+        nueva._agregar(*nueva._leer_ventas(db, filtro))
+        if not conteo_antes <= len(nueva.prenda) <= db.sales.estimated_document_count():
+            return None
+        if nueva.ids_prenda != self.ids_prenda or self.versiones != nueva._versiones_dimensiones():
+            nueva._armar_dimensiones(db)
+            nueva._armar_columnas()
+        else:
+            nueva._copiar_dimensiones(self)
+            nueva._armar_columnas(self)
+        return nueva
+
+    def _leer_ventas(self, db, filtro):
+        prendas, cantidades, dias = [], [], []
+        cursor = db.sales.find(filtro, PROYECCION_VENTAS, batch_size=LOTE_LECTURA).sort(orden_find(ORDEN_MARCA))
+        for venta in cursor:
+            clothing_id = venta.get("clothing_id")
+            codigo = self.codigos_prenda.get(clothing_id)
+            if codigo is None:
+                codigo = self.codigos_prenda[clothing_id] = len(self.ids_prenda)
+                self.ids_prenda.append(clothing_id)
+            prendas.append(codigo)
+            cantidades.append(RollupsModel.cantidad(venta))
+            dias.append(_dia(venta.get("date")))
+            self.marca = (venta.get("date"), venta["_id"])
+        return prendas, cantidades, dias
+
+    def _agregar(self, prendas, cantidades, dias):
+        if prendas:
+            self.prenda = np.concatenate([self.prenda, np.array(prendas, np.int32)])
+            self.cantidad = np.concatenate([self.cantidad, np.array(cantidades, np.float64)])
+            self.dia = np.concatenate([self.dia, np.array(dias, np.int32)])
+
+    @staticmethod
+    def _versiones_dimensiones():
+        return report_cache.version("clothing"), report_cache.version("brands")
+
+    def _armar_dimensiones(self, db):
+        self.versiones = self._versiones_dimensiones()
+        marcas = {b["_id"]: b.get("name") for b in db.brands.find({}, {"name": 1})}
+        self.ids_marca = list(marcas)
+        self.nombres_marca = list(marcas.values())
+        codigos_marca = {id_marca: i for i, id_marca in enumerate(self.ids_marca)}
+        self.categorias = []
+        codigos_categoria = {}
+        self.marca_de_prenda = np.full(len(self.ids_prenda), -1, np.int32)
+        self.categoria_de_prenda = np.full(len(self.ids_prenda), -1, np.int32)
+        self.existe_prenda = np.zeros(len(self.ids_prenda), bool)
+        self.nombres_prenda = [None] * len(self.ids_prenda)
+        for prenda in db.clothing.find({"_id": {"$in": self.ids_prenda}}, {"name": 1, "brand_id": 1, "category": 1}):
+            codigo = self.codigos_prenda[prenda["_id"]]
+            self.existe_prenda[codigo] = True
+            self.nombres_prenda[codigo] = prenda.get("name")
+            self.marca_de_prenda[codigo] = codigos_marca.get(prenda.get("brand_id"), -1)
+            categoria = prenda.get("category")
+            if categoria is not None:
+                if categoria not in codigos_categoria:
+                    codigos_categoria[categoria] = len(self.categorias)
+                    self.categorias.append(categoria)
+                self.categoria_de_prenda[codigo] = codigos_categoria[categoria]
+        self.codigos_marca = codigos_marca
+        self.codigos_categoria = codigos_categoria
+
+    def _copiar_dimensiones(self, otra):
+        for atributo in ("versiones", "ids_marca", "nombres_marca", "codigos_marca", "categorias", "codigos_categoria",
+                         "marca_de_prenda", "categoria_de_prenda", "existe_prenda", "nombres_prenda"):
+            setattr(self, atributo, getattr(otra, atributo))
+
+    def _armar_columnas(self, anterior=None):
+        """
+        Código de cada dimensión por fila (-1 = la venta no entra en esa agrupación),
+        calculado al cargar y no en cada consulta. Con anterior (mismas dimensiones)
+        solo se calculan las filas nuevas.
+        """
+        inicio = len(anterior.prenda) if anterior is not None else 0
+        prendas = self.prenda[inicio:]
+        columnas = {
+            "item": np.where(self.existe_prenda[prendas], prendas, -1).astype(np.int32),
+            "brand": self.marca_de_prenda[prendas],
+            "category": self.categoria_de_prenda[prendas],
+        }
+        if anterior is not None:
+            columnas = {d: np.concatenate([anterior.columnas[d], c]) for d, c in columnas.items()}
+        columnas["day"] = self.dia
+        self.columnas = columnas
+        # Dimensiones con filas que no cuentan: solo esas necesitan máscara al agrupar
+        self.incompletas = {d for d, c in columnas.items() if len(c) and c.min() < 0}
+
+    def resumen(self):
+        fecha, id_venta = self.marca or (None, None)
+        return {
+            "sales": int(len(self.prenda)),
+            "refreshed_at": self.actualizada.isoformat(),
+            "watermark": {"date": fecha, "_id": id_venta},
+        }
+
+    # ---- consultas ----
+
+    def mascara(self, desde=None, hasta=None, brand_id=None, category=None, clothing_id=None):
+        # None si no hay filtros: las consultas sin filtros no recorren una máscara
+        condiciones = []
+        if desde is not None:
+            condiciones.append(self.dia >= _dia(desde))
+        if hasta is not None:
+            condiciones.append((self.dia < _dia(hasta)) & (self.dia != SIN_FECHA))
+        for dimension, valor, codigos in (
+            ("brand", brand_id, self.codigos_marca),
+            ("category", category, self.codigos_categoria),
+            ("item", clothing_id, self.codigos_prenda),
+        ):
+            if valor is not None:
+                condiciones.append(self.columnas[dimension] == codigos.get(valor, -2))
+        if not condiciones:
+            return None
+        mascara = condiciones[0]
+        for condicion in condiciones[1:]:
+            mascara &= condicion
+        return mascara
+
+    def valor(self, dimension, codigo):
+        if dimension == "item":
+            return {"item": self.ids_prenda[codigo], "item_name": self.nombres_prenda[codigo]}
+        if dimension == "brand":
+            return {"brand": self.ids_marca[codigo], "brand_name": self.nombres_marca[codigo]}
+        if dimension == "category":
+            return {"category": self.categorias[codigo]}
+        return {"day": _fecha_iso(codigo)}
+
+
+def _sumar(clave, pesos, celdas):
+    """
+    Suma de pesos y conteo por clave. Retorna (claves presentes, sumas, conteos)
+    ordenados por clave: bincount si las celdas posibles caben en memoria, si no np.unique.
+    """
+    if celdas <= MAX_CELDAS_DENSAS:
+        conteos = np.bincount(clave, minlength=celdas)
+        sumas = np.bincount(clave, weights=pesos, minlength=celdas)
+        presentes = np.flatnonzero(conteos)
+        return presentes, sumas[presentes], conteos[presentes]
+    presentes, inversa, conteos = np.unique(clave, return_inverse=True, return_counts=True)
+    return presentes, np.bincount(inversa, weights=pesos), conteos
+
+
+class AnalyticsEngine:
+    """
+    Consultas ad-hoc de ventas sobre una instantánea columnar en memoria (NumPy),
+    una por proceso: group-by de una o dos dimensiones (brand, category, item, day),
+    top N y ventanas móviles por día, todo con operaciones vectorizadas.
+
+    La instantánea se arma con la primera consulta (o al iniciar, con
+    ANALYTICS_WARMUP=1) leyendo de un secundario si hay (read preference configurable)
+    y se extiende en segundo plano cada intervalo segundos con las ventas posteriores a
+    la marca de agua (date, _id). Cada reconstruccion segundos, o si se editaron o
+    borraron ventas (ver _Instantanea.extender), se vuelve a leer completa.
+    """
+
+    def __init__(self, intervalo=5.0, reconstruccion=3600.0, lectura="secondaryPreferred"):
+        self.intervalo = intervalo
+        self.reconstruccion = reconstruccion
+        self.lectura = lectura
+        self._instantanea = None
+        self._comprobado = 0
+        self._construccion = threading.Lock()
+        self._lock = threading.Lock()
+
+    def configurar(self, intervalo=None, reconstruccion=None, lectura=None, precargar=False):
+        if intervalo is not None:
+            self.intervalo = intervalo
+        if reconstruccion is not None:
+            self.reconstruccion = reconstruccion
+        if lectura is not None:
+            if lectura not in PREFERENCIAS_LECTURA:
+                raise ValueError(f"ANALYTICS_READ_PREFERENCE debe ser uno de {tuple(PREFERENCIAS_LECTURA)}")
+            self.lectura = lectura
+        if precargar and np is not None:
+            threading.Thread(target=self._actualizar_en_segundo_plano, name="analytics-warmup", daemon=True).start()
+
+    @staticmethod
+    def disponible():
+        return np is not None
+
+    # ---- instantánea ----
+
+    def _db(self):
+        return mongo.cx.get_database(mongo.db.name, read_preference=PREFERENCIAS_LECTURA[self.lectura])
+
+    def _vigente(self):
+        instantanea = self._instantanea
+        if instantanea is None:
+            return self._actualizar()
+        ahora = time.monotonic()
+        with self._lock:
+            comprobar = ahora - instantanea.leida >= self.intervalo and ahora - self._comprobado >= self.intervalo
+            if comprobar:
+                self._comprobado = ahora
+        if comprobar:
+            threading.Thread(target=self._actualizar_en_segundo_plano, name="analytics-refresh", daemon=True).start()
+        return instantanea
+
+    def _actualizar_en_segundo_plano(self):
+        try:
+            self._actualizar(esperar=False)
+        except Exception as e:
+            print("AnalyticsEngine actualización error:", e)
+
+    def _actualizar(self, esperar=True):
+        # Una lectura a la vez; las consultas siguen usando la instantánea anterior
+        if not self._construccion.acquire(blocking=esperar):
+            return self._instantanea
+        try:
+            anterior = self._instantanea
+            if esperar and anterior is not None:
+                return anterior
+            db = self._db()
+            nueva = None
+            if anterior is not None and time.monotonic() - anterior.completa < self.reconstruccion:
+                nueva = anterior.extender(db)
+            self._instantanea = nueva or _Instantanea.construir(db)
+            return self._instantanea
+        finally:
+            self._construccion.release()
+
+    def estado(self):
+        instantanea = self._instantanea
+        return instantanea.resumen() if instantanea is not None else None
+
+    # ---- consultas ----
+
+    def consultar(self, grupo, desde=None, hasta=None, top=None, ventana=None, limite=LIMITE_FILAS, **filtros):
+        """
+        grupo: una o dos dimensiones de DIMENSIONES (day siempre queda al final).
+        top: deja las N claves de la primera dimensión con más ventas.
+        ventana: con day en el grupo, agrega la suma móvil de los últimos N días
+        (la serie de cada clave incluye los días sin ventas).
+        Las filas se ordenan por día y por ventas (desc) y se devuelven hasta limite.
+        Lanza ConsultaDemasiadoGrande si la ventana necesita más de MAX_CELDAS_DENSAS
+        celdas (series x días del rango).
+        Retorna { "rows": [{<dimensión>: valor, ..., ventas, lineas[, ventana]}], "total_rows": n, "snapshot": {...} }
+        """
+        instantanea = self._vigente()
+        grupo = sorted(grupo, key=lambda d: d == "day")
+        mascara = instantanea.mascara(desde, hasta, **filtros)
+        for dimension in grupo:
+            if dimension in instantanea.incompletas:
+                validas = instantanea.columnas[dimension] >= 0
+                mascara = validas if mascara is None else mascara & validas
+        codigos = [instantanea.columnas[d] for d in grupo]
+        pesos = instantanea.cantidad
+        if mascara is not None:
+            codigos = [columna[mascara] for columna in codigos]
+            pesos = pesos[mascara]
+
+        # Los días se numeran desde el primero del rango para que las claves sean densas
+        base_dia = 0
+        if grupo[-1] == "day":
+            base_dia = _dia(desde) if desde is not None else (int(codigos[-1].min()) if len(pesos) else 0)
+            codigos[-1] = codigos[-1] - base_dia
+        elegidas = None
+        if top and len(grupo) == 2:
+            codigos, pesos, elegidas = _solo_top(codigos, pesos, top)
+        tamanos = [int(c.max()) + 1 if len(c) else 1 for c in codigos]
+        if grupo[-1] == "day" and hasta is not None:
+            tamanos[-1] = max(tamanos[-1], _dia(hasta) - base_dia)
+        clave = codigos[0].astype(np.int64)
+        if len(grupo) == 2:
+            clave = clave * tamanos[1] + codigos[1]
+        claves, sumas, conteos = _sumar(clave, pesos, tamanos[0] * (tamanos[1] if len(grupo) == 2 else 1))
+        partes = [claves // tamanos[1], claves % tamanos[1]] if len(grupo) == 2 else [claves]
+
+        if elegidas is not None:
+            partes[0] = elegidas[partes[0]]
+        elif top:
+            totales = np.bincount(partes[0], weights=sumas, minlength=tamanos[0])
+            elegidas = np.argsort(-totales, kind="stable")[:top]
+            dentro = np.isin(partes[0], elegidas[totales[elegidas] > 0])
+            partes, sumas, conteos = [p[dentro] for p in partes], sumas[dentro], conteos[dentro]
+
+        moviles = None
+        if ventana and grupo[-1] == "day":
+            series = len(np.unique(partes[0])) if len(grupo) == 2 else 1
+            if series * tamanos[-1] > MAX_CELDAS_DENSAS:
+                raise ConsultaDemasiadoGrande(
+                    f"window necesita {series} series x {tamanos[-1]} días; máximo {MAX_CELDAS_DENSAS} celdas "
+                    "(acotar from/to o usar top)"
+                )
+            partes, sumas, conteos, moviles = _ventana_movil(partes, sumas, conteos, tamanos[-1], ventana)
+
+        if grupo[-1] == "day":
+            partes[-1] = partes[-1] + base_dia
+            orden = np.lexsort((-sumas, partes[-1]))
+        else:
+            orden = np.argsort(-sumas, kind="stable")
+        total = len(orden)
+        orden = orden[:limite]
+        filas = _filas(instantanea, grupo, [p[orden] for p in partes], sumas[orden], conteos[orden],
+                       moviles[orden] if moviles is not None else None)
+        return {"rows": filas, "total_rows": total, "snapshot": instantanea.resumen()}
+
+
+def _solo_top(codigos, pesos, top):
+    """
+    Deja las filas de las N claves de la primera dimensión con más ventas, renumeradas
+    0..N-1: la agregación por (clave, segunda dimensión) recorre solo esas filas y sus
+    celdas caben en bincount. Retorna (codigos, pesos, códigos originales de las N claves).
+    """
+    totales = np.bincount(codigos[0], weights=pesos)
+    elegidas = np.argsort(-totales, kind="stable")[:top]
+    elegidas = elegidas[totales[elegidas] > 0]
+    nuevos = np.full(len(totales), -1, np.int64)
+    nuevos[elegidas] = np.arange(len(elegidas))
+    renumerados = nuevos[codigos[0]]
+    dentro = renumerados >= 0
+    return [renumerados[dentro], codigos[1][dentro]], pesos[dentro], elegidas
+
+
+def _ventana_movil(partes, sumas, conteos, dias, ventana):
+    """
+    Completa cada serie con todos los días del rango (matriz clave x día) y agrega
+    la suma de los últimos ventana días, calculada con la suma acumulada.
+    """
+    if len(partes) == 2:
+        series, fila = np.unique(partes[0], return_inverse=True)
+    else:
+        series, fila = np.zeros(1, np.int64), np.zeros(len(sumas), np.int64)
+    matriz_ventas = np.zeros((len(series), dias))
+    matriz_lineas = np.zeros((len(series), dias), np.int64)
+    matriz_ventas[fila, partes[-1]] = sumas
+    matriz_lineas[fila, partes[-1]] = conteos
+    acumulada = np.cumsum(matriz_ventas, axis=1)
+    moviles = acumulada.copy()
+    if ventana < dias:
+        moviles[:, ventana:] -= acumulada[:, :-ventana]
+    todos_los_dias = np.tile(np.arange(dias), len(series))
+    partes = [np.repeat(series, dias), todos_los_dias] if len(partes) == 2 else [todos_los_dias]
+    return partes, matriz_ventas.ravel(), matriz_lineas.ravel(), np.round(moviles.ravel(), 9)
+
+
+def _filas(instantanea, grupo, partes, sumas, conteos, moviles):
+    columnas = [p.tolist() for p in partes]
+    moviles = moviles.tolist() if moviles is not None else None
+    filas = []
+    for i, (suma, conteo) in enumerate(zip(sumas.tolist(), conteos.tolist())):
+        fila = {}
+        for dimension, codigos in zip(grupo, columnas):
+            fila.update(instantanea.valor(dimension, codigos[i]))
+        fila["ventas"] = _numero(suma)
+        fila["lineas"] = int(conteo)
+        if moviles is not None:
+            fila["ventana"] = _numero(moviles[i])
+        filas.append(fila)
+    return filas
+
+
+analytics = AnalyticsEngine()
@@ -1,30 +1,48 @@
-from bson.objectid import ObjectId
 from app.index import mongo
+from app.utils.cache import report_cache, document_cache
+from app.models.search import search_index
+from app.utils.ids import nuevo_id, filtro_por_id
+from app.utils.pagination import paginar, orden_find
+from app.utils.export import exportar as exportar_coleccion
+from app.utils.bulk import ejecutar_bulk
 
 class BrandsModel:
+    # Columnas del CSV de exportación (sin fields)
+    COLUMNAS_CSV = ["_id", "name", "country", "founded"]
+
+    @staticmethod
+    def obtener_todos(proyeccion=None, filtro=None, orden=None):
+        cursor = mongo.db.brands.find(filtro or {}, proyeccion)
+        return list(cursor.sort(orden_find(orden)) if orden else cursor)
+
+    @staticmethod
+    def obtener_pagina(limit, after=None, con_total=False, proyeccion=None, filtro=None, orden=None):
+        return paginar(mongo.db.brands, limit, after, con_total, proyeccion, filtro, orden)
+
+    @staticmethod
+    def exportar(formato, batch_size, campos=None, filtro=None):
+        return exportar_coleccion(mongo.db.brands, formato, batch_size, BrandsModel.COLUMNAS_CSV, campos, filtro)
+
     @staticmethod
-    def obtener_todos():
-        brands_cursor = mongo.db.brands.find()
-        brands = []
-        for brand in brands_cursor:
-            brand["_id"] = str(brand["_id"])
-            brands.append(brand)
-        return brands
+    def bulk(operaciones, batch_size):
+        return ejecutar_bulk(mongo.db.brands, "brands", operaciones, batch_size, search_index)[0]
 
     @staticmethod
-    def obtener_por_id(id):
+    def obtener_por_id(id, proyeccion=None):
         try:
-            brand = mongo.db.brands.find_one({"_id": ObjectId(id)})
-            if brand:
-                brand["_id"] = str(brand["_id"])
-            return brand
+            return document_cache.obtener(
+                "brands", id, proyeccion, lambda: mongo.db.brands.find_one(filtro_por_id(id), proyeccion)
+            )
         except:
             return None
 
     @staticmethod
     def crear(data):
         try:
+            data.setdefault("_id", nuevo_id())
             result = mongo.db.brands.insert_one(data)
+            report_cache.invalidar("brands")
+            search_index.actualizar("brands", result.inserted_id, data)
             return str(result.inserted_id)
         except:
             return None
@@ -32,7 +50,11 @@ class BrandsModel:
     @staticmethod
     def actualizar(id, data):
         try:
-            result = mongo.db.brands.update_one({"_id": ObjectId(id)}, {"$set": data})
+            result = mongo.db.brands.update_one(filtro_por_id(id), {"$set": data})
+            if result.modified_count:
+                report_cache.invalidar("brands")
+                document_cache.invalidar("brands", id)
+                search_index.actualizar("brands", id, data)
             return result.modified_count
         except:
             return -1
@@ -40,7 +62,11 @@ class BrandsModel:
     @staticmethod
     def eliminar(id):
         try:
-            result = mongo.db.brands.delete_one({"_id": ObjectId(id)})
+            result = mongo.db.brands.delete_one(filtro_por_id(id))
+            if result.deleted_count:
+                report_cache.invalidar("brands")
+                document_cache.invalidar("brands", id)
+                search_index.eliminar("brands", id)
             return result.deleted_count
         except:
             return -1
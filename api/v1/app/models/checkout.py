@@ -0,0 +1,142 @@
+# api/v1/app/models/checkout.py
+from datetime import datetime
+
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.index import mongo
+from app.models.rollups import RollupsModel
+from app.utils.cache import report_cache, document_cache
+from app.utils.ids import nuevo_id, filtro_por_id
+
+
+class _StockIncompleto(Exception):
+    """Alguna línea del camino rápido no tenía stock: se aborta la transacción."""
+
+
+class CheckoutModel:
+    """
+    Checkout de un carrito: descuenta stock solo si alcanza (in_stock >= quantity)
+    e inserta todas las ventas con un único insert_many.
+      - Con replica set: todo dentro de una transacción. Primero se intenta reservar
+        el carrito completo con un solo bulk_write; si alguna línea no tiene stock,
+        se aborta y se reserva línea por línea para saber cuáles fallaron.
+      - Sin transacciones (standalone): reserva por línea con find_one_and_update
+        condicional; si el insert falla se devuelve el stock reservado.
+    """
+
+    _transacciones = None  # None = todavía no se sabe si el servidor las soporta
+
+    @staticmethod
+    def procesar(user_id, items, fecha=None):
+        """
+        items: [{ clothing_id, quantity }, ...]
+        Retorna una lista con el resultado de cada línea, en el mismo orden:
+          { clothing_id, quantity, ok: true, id: <venta> } | { clothing_id, quantity, ok: false, error }
+        """
+        fecha = fecha or datetime.now()
+        resultados = []
+        lineas = []
+        for i, item in enumerate(items):
+            clothing_id = item.get("clothing_id") if isinstance(item, dict) else None
+            cantidad = item.get("quantity") if isinstance(item, dict) else None
+            resultados.append({"clothing_id": clothing_id, "quantity": cantidad, "ok": False})
+            if not clothing_id or isinstance(cantidad, bool) or not isinstance(cantidad, int) or cantidad <= 0:
+                resultados[i]["error"] = "Línea inválida"
+            else:
+                lineas.append((i, clothing_id, cantidad))
+
+        ventas = CheckoutModel._ejecutar(user_id, lineas, fecha) if lineas else {}
+
+        for i, _, _ in lineas:
+            if i in ventas:
+                resultados[i].update({"ok": True, "id": ventas[i]["_id"]})
+            else:
+                resultados[i]["error"] = "Stock insuficiente o prenda inexistente"
+
+        if ventas:
+            report_cache.invalidar("sales")
+            report_cache.invalidar("clothing")
+            for venta in ventas.values():
+                document_cache.invalidar("clothing", venta["clothing_id"])
+            try:
+                RollupsModel.aplicar_ventas(list(ventas.values()))
+            except Exception as e:
+                print("CheckoutModel rollups error:", e)
+        return resultados
+
+    @staticmethod
+    def _ejecutar(user_id, lineas, fecha):
+        if CheckoutModel._transacciones is not False:
+            try:
+                with mongo.cx.start_session() as sesion:
+                    try:
+                        ventas = sesion.with_transaction(
+                            lambda s: CheckoutModel._reservar_e_insertar(user_id, lineas, fecha, s, completo=True)
+                        )
+                    except _StockIncompleto:
+                        ventas = sesion.with_transaction(
+                            lambda s: CheckoutModel._reservar_e_insertar(user_id, lineas, fecha, s)
+                        )
+                CheckoutModel._transacciones = True
+                return ventas
+            except OperationFailure as e:
+                # 20 = IllegalOperation: el servidor es standalone y no admite transacciones
+                if e.code != 20 or CheckoutModel._transacciones:
+                    raise
+                CheckoutModel._transacciones = False
+        return CheckoutModel._reservar_e_insertar(user_id, lineas, fecha, None)
+
+    @staticmethod
+    def _reservar_e_insertar(user_id, lineas, fecha, sesion, completo=False):
+        reservadas = CheckoutModel._reservar_completo(lineas, sesion) if completo else CheckoutModel._reservar(lineas, sesion)
+        ventas = {
+            i: {"_id": nuevo_id(), "user_id": user_id, "clothing_id": clothing_id, "quantity": cantidad, "date": fecha}
+            for i, clothing_id, cantidad in reservadas
+        }
+        if ventas:
+            try:
+                mongo.db.sales.insert_many(list(ventas.values()), session=sesion)
+            except PyMongoError:
+                if sesion is None:
+                    CheckoutModel._devolver_stock(reservadas)
+                raise
+        return ventas
+
+    @staticmethod
+    def _condicion(clothing_id, cantidad):
+        return {**filtro_por_id(clothing_id), "in_stock": {"$gte": cantidad}}
+
+    @staticmethod
+    def _reservar_completo(lineas, sesion):
+        # Un solo round-trip para todo el carrito
+        result = mongo.db.clothing.bulk_write(
+            [UpdateOne(CheckoutModel._condicion(c, q), {"$inc": {"in_stock": -q}}) for _, c, q in lineas],
+            ordered=False, session=sesion
+        )
+        if result.matched_count != len(lineas):
+            raise _StockIncompleto()
+        return lineas
+
+    @staticmethod
+    def _reservar(lineas, sesion):
+        reservadas = []
+        for i, clothing_id, cantidad in lineas:
+            prenda = mongo.db.clothing.find_one_and_update(
+                CheckoutModel._condicion(clothing_id, cantidad),
+                {"$inc": {"in_stock": -cantidad}},
+                projection={"_id": 1}, session=sesion
+            )
+            if prenda:
+                reservadas.append((i, clothing_id, cantidad))
+        return reservadas
+
+    @staticmethod
+    def _devolver_stock(reservadas):
+        try:
+            mongo.db.clothing.bulk_write(
+                [UpdateOne(filtro_por_id(c), {"$inc": {"in_stock": q}}) for _, c, q in reservadas],
+                ordered=False
+            )
+        except PyMongoError as e:
+            print("CheckoutModel._devolver_stock error:", e)
@@ -1,30 +1,62 @@
-from bson.objectid import ObjectId
+from pymongo import ReturnDocument
 from app.index import mongo
+from app.utils.cache import report_cache, document_cache
+from app.models.search import search_index
+from app.models.rollups import RollupsModel
+from app.utils.ids import nuevo_id, filtro_por_id
+from app.utils.pagination import paginar, orden_find
+from app.utils.export import exportar as exportar_coleccion
+from app.utils.bulk import ejecutar_bulk
 
 class ClothingModel:
+    # Columnas del CSV de exportación (sin fields)
+    COLUMNAS_CSV = ["_id", "name", "category", "price", "size", "color", "brand_id", "in_stock"]
+
+    @staticmethod
+    def obtener_todos(proyeccion=None, filtro=None, orden=None):
+        cursor = mongo.db.clothing.find(filtro or {}, proyeccion)
+        return list(cursor.sort(orden_find(orden)) if orden else cursor)
+
+    @staticmethod
+    def obtener_pagina(limit, after=None, con_total=False, proyeccion=None, filtro=None, orden=None):
+        return paginar(mongo.db.clothing, limit, after, con_total, proyeccion, filtro, orden)
+
+    @staticmethod
+    def exportar(formato, batch_size, campos=None, filtro=None):
+        return exportar_coleccion(mongo.db.clothing, formato, batch_size, ClothingModel.COLUMNAS_CSV, campos, filtro)
+
     @staticmethod
-    def obtener_todos():
-        clothes_cursor = mongo.db.clothing.find()
-        clothes = []
-        for item in clothes_cursor:
-            item["_id"] = str(item["_id"])
-            clothes.append(item)
-        return clothes
+    def bulk(operaciones, batch_size):
+        resultados, cambios = ejecutar_bulk(mongo.db.clothing, "clothing", operaciones, batch_size, search_index)
+        # Los cambios de precio o stock no tocan los rollups; solo mover de marca o borrar
+        for _, _, anterior, nuevo in cambios:
+            if anterior is None:
+                continue
+            try:
+                if nuevo is None:
+                    RollupsModel.quitar_prenda(anterior["_id"])
+                elif anterior.get("brand_id") != nuevo.get("brand_id"):
+                    RollupsModel.mover_prenda(anterior["_id"], anterior.get("brand_id"), nuevo.get("brand_id"))
+            except Exception as e:
+                print("ClothingModel.bulk rollups error:", e)
+        return resultados
 
     @staticmethod
-    def obtener_por_id(id):
+    def obtener_por_id(id, proyeccion=None):
         try:
-            item = mongo.db.clothing.find_one({"_id": ObjectId(id)})
-            if item:
-                item["_id"] = str(item["_id"])
-            return item
+            return document_cache.obtener(
+                "clothing", id, proyeccion, lambda: mongo.db.clothing.find_one(filtro_por_id(id), proyeccion)
+            )
         except:
             return None
 
     @staticmethod
     def crear(data):
         try:
+            data.setdefault("_id", nuevo_id())
             result = mongo.db.clothing.insert_one(data)
+            report_cache.invalidar("clothing")
+            search_index.actualizar("clothing", result.inserted_id, data)
             return str(result.inserted_id)
         except:
             return None
@@ -32,15 +64,43 @@ class ClothingModel:
     @staticmethod
     def actualizar(id, data):
         try:
-            result = mongo.db.clothing.update_one({"_id": ObjectId(id)}, {"$set": data})
-            return result.modified_count
+            if "brand_id" not in data:
+                result = mongo.db.clothing.update_one(filtro_por_id(id), {"$set": data})
+                if result.modified_count:
+                    report_cache.invalidar("clothing")
+                    document_cache.invalidar("clothing", id)
+                    search_index.actualizar("clothing", id, data)
+                return result.modified_count
+            anterior = mongo.db.clothing.find_one_and_update(
+                filtro_por_id(id), {"$set": data}, return_document=ReturnDocument.BEFORE
+            )
         except:
             return -1
+        if not anterior or all(anterior.get(k) == v for k, v in data.items()):
+            return 0
+        report_cache.invalidar("clothing")
+        document_cache.invalidar("clothing", id)
+        search_index.actualizar("clothing", anterior["_id"], data)
+        if anterior.get("brand_id") != data["brand_id"]:
+            try:
+                RollupsModel.mover_prenda(anterior["_id"], anterior.get("brand_id"), data["brand_id"])
+            except Exception as e:
+                print("ClothingModel.actualizar rollups error:", e)
+        return 1
 
     @staticmethod
     def eliminar(id):
         try:
-            result = mongo.db.clothing.delete_one({"_id": ObjectId(id)})
-            return result.deleted_count
+            anterior = mongo.db.clothing.find_one_and_delete(filtro_por_id(id), projection={"_id": 1})
         except:
             return -1
+        if not anterior:
+            return 0
+        report_cache.invalidar("clothing")
+        document_cache.invalidar("clothing", id)
+        search_index.eliminar("clothing", anterior["_id"])
+        try:
+            RollupsModel.quitar_prenda(anterior["_id"])
+        except Exception as e:
+            print("ClothingModel.eliminar rollups error:", e)
+        return 1
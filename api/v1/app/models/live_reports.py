@@ -0,0 +1,222 @@
+# api/v1/app/models/live_reports.py
+import queue
+import threading
+import time
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.index import mongo
+from app.models.reports import ReportsModel
+from app.models.rollups import RollupsModel, ROLLUP_PRENDAS, ROLLUP_MARCAS
+
+# Colecciones cuyos cambios afectan a los reportes. Los rollups se vigilan también:
+# se actualizan justo después de cada venta y así el último cambio siempre dispara un recálculo.
+COLECCIONES_VIGILADAS = ["sales", "clothing", "brands", ROLLUP_PRENDAS, ROLLUP_MARCAS]
+# Filas del reporte que cambia cada colección, por el _id del documento
+FILAS_POR_COLECCION = {"clothing": "items", ROLLUP_PRENDAS: "items", "brands": "brands", ROLLUP_MARCAS: "brands"}
+
+
+class LiveReportsHub:
+    """
+    Un hilo por proceso vigila la base (change stream o sondeo periódico), recalcula
+    el reporte una sola vez por ventana de cambios y reparte a cada cliente SSE
+    solo las filas que cambiaron:
+      { "items": [...], "items_removed": [...], "brands": [...], "brands_removed": [...], "top5": [...] }
+    Con change streams y los rollups construidos, cada ventana relee solo las prendas
+    y marcas de sus eventos; el sondeo (o un $out, drop o rename) recalcula todo.
+    El hilo arranca con el primer cliente y termina cuando no queda ninguno; al
+    terminar descarta la instantánea, que la próxima suscripción recalcula completa.
+    """
+
+    MAX_PENDIENTES = 100
+
+    def __init__(self, modo="auto", intervalo_sondeo=5.0, ventana=0.5):
+        self.modo = modo
+        self.intervalo_sondeo = intervalo_sondeo
+        self.ventana = ventana
+        self._suscriptores = set()
+        self._actual = None
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def configurar(self, modo=None, intervalo_sondeo=None):
+        if modo is not None:
+            self.modo = modo
+        if intervalo_sondeo is not None:
+            self.intervalo_sondeo = intervalo_sondeo
+
+    # ---- suscripciones ----
+
+    def suscribir(self):
+        cola = queue.Queue(maxsize=self.MAX_PENDIENTES)
+        with self._lock:
+            self._suscriptores.add(cola)
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._vigilar, name="live-reports", daemon=True)
+                self._hilo.start()
+        return cola
+
+    def desuscribir(self, cola):
+        with self._lock:
+            self._suscriptores.discard(cola)
+
+    def actual(self):
+        # El cálculo va fuera del lock: suscribir/publicar no esperan a MongoDB
+        with self._lock:
+            if self._actual is not None:
+                return self._actual
+        instantanea = self._instantanea()
+        with self._lock:
+            if self._actual is None:
+                self._actual = instantanea
+            return self._actual
+
+    def _publicar(self, delta):
+        with self._lock:
+            suscriptores = list(self._suscriptores)
+        for cola in suscriptores:
+            try:
+                cola.put_nowait(delta)
+            except queue.Full:
+                # Cliente lento: descartar lo pendiente y pedirle que se resincronice
+                with cola.mutex:
+                    cola.queue.clear()
+                cola.put_nowait(None)
+
+    # ---- cálculo ----
+
+    @staticmethod
+    def _instantanea():
+        data = ReportsModel.obtener_todos_combinado()
+        return {
+            "items": {i["item_id"]: i for i in data["items_sold"]},
+            "brands": {b["brand_id"]: b for b in data["brands_with_sales"]},
+            "top5": data["top5_brands"]
+        }
+
+    @staticmethod
+    def diferencias(anterior, actual):
+        delta = {}
+        for clave in ("items", "brands"):
+            cambiadas = [fila for k, fila in actual[clave].items() if anterior[clave].get(k) != fila]
+            quitadas = [k for k in anterior[clave] if k not in actual[clave]]
+            if cambiadas:
+                delta[clave] = cambiadas
+            if quitadas:
+                delta[clave + "_removed"] = quitadas
+        if anterior["top5"] != actual["top5"]:
+            delta["top5"] = actual["top5"]
+        return delta
+
+    @staticmethod
+    def _aplicar(anterior, cambios):
+        # Relee solo las filas de cambios = { "items": ids, "brands": ids } sobre la instantánea anterior
+        prendas, marcas = ReportsModel.filas_combinado(cambios["items"], cambios["brands"])
+        actual = {"items": dict(anterior["items"]), "brands": dict(anterior["brands"])}
+        for id_doc in cambios["items"]:
+            actual["items"].pop(str(id_doc), None)
+        for id_doc in cambios["brands"]:
+            actual["brands"].pop(id_doc, None)
+        actual["items"].update({p["item_id"]: p for p in prendas})
+        actual["brands"].update({b["brand_id"]: b for b in marcas})
+        top5 = sorted(actual["brands"].values(), key=lambda b: -b["sales_count"])[:5]
+        actual["top5"] = [{"name": b["name"], "sales_count": b["sales_count"]} for b in top5]
+        return actual
+
+    def _recalcular(self, cambios=None):
+        anterior = self.actual()
+        if cambios is not None and not cambios["completo"] and RollupsModel.construidos():
+            actual = self._aplicar(anterior, cambios)
+        else:
+            actual = self._instantanea()
+        with self._lock:
+            self._actual = actual
+        delta = self.diferencias(anterior, actual)
+        if delta:
+            self._publicar(delta)
+
+    # ---- vigilancia ----
+
+    def _activo(self):
+        with self._lock:
+            if self._suscriptores:
+                return True
+            # Sin hilo nadie ve los cambios: la próxima suscripción recalcula todo
+            self._hilo = None
+            self._actual = None
+            return False
+
+    def _vigilar(self):
+        try:
+            if self.modo in ("auto", "changestream"):
+                try:
+                    self._vigilar_change_stream()
+                    return
+                except OperationFailure as e:
+                    # Servidor standalone: los change streams requieren replica set
+                    if self.modo == "changestream":
+                        raise
+                    print("LiveReportsHub: change streams no disponibles, se usa sondeo:", e)
+            self._vigilar_sondeo()
+        except Exception as e:
+            print("LiveReportsHub._vigilar error:", e)
+            with self._lock:
+                self._hilo = None
+                self._actual = None
+
+    @staticmethod
+    def _sin_cambios():
+        return {"items": set(), "brands": set(), "completo": False}
+
+    @staticmethod
+    def _anotar(cambio, cambios):
+        """
+        Anota en cambios las filas que toca un evento. Las ventas se reflejan con los
+        eventos de sus rollups; lo que no se puede acotar a documentos (drop, rename
+        del $out de reconstruir, invalidate) pide recalcular todo.
+        """
+        id_doc = cambio.get("documentKey", {}).get("_id")
+        if cambio.get("operationType") not in ("insert", "update", "replace", "delete") or id_doc is None:
+            cambios["completo"] = True
+            return
+        filas = FILAS_POR_COLECCION.get(cambio.get("ns", {}).get("coll"))
+        if filas:
+            cambios[filas].add(id_doc)
+
+    def _vigilar_change_stream(self):
+        colecciones = {"$in": COLECCIONES_VIGILADAS}
+        pipeline = [{"$match": {"$or": [{"ns.coll": colecciones}, {"to.coll": colecciones}]}}]
+        token = None
+        while self._activo():
+            try:
+                with mongo.db.watch(pipeline, resume_after=token, max_await_time_ms=1000) as stream:
+                    pendiente_desde = None
+                    cambios = self._sin_cambios()
+                    while self._activo():
+                        cambio = stream.try_next()
+                        if cambio is not None:
+                            token = stream.resume_token
+                            self._anotar(cambio, cambios)
+                            pendiente_desde = pendiente_desde or time.monotonic()
+                            continue
+                        # Agrupar los cambios de una ventana en un solo recálculo
+                        if pendiente_desde and time.monotonic() - pendiente_desde >= self.ventana:
+                            pendiente_desde = None
+                            ventana, cambios = cambios, self._sin_cambios()
+                            self._recalcular(ventana)
+            except OperationFailure:
+                raise
+            except PyMongoError as e:
+                print("LiveReportsHub change stream error, reintentando:", e)
+                time.sleep(1)
+
+    def _vigilar_sondeo(self):
+        while self._activo():
+            time.sleep(self.intervalo_sondeo)
+            try:
+                self._recalcular()
+            except PyMongoError as e:
+                print("LiveReportsHub sondeo error:", e)
+
+
+live_reports = LiveReportsHub()
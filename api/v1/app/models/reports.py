@@ -1,57 +1,67 @@
 # api/v1/app/models/reports.py
 from app.index import mongo
+from app.models.rollups import RollupsModel
 
 class ReportsModel:
     """
     Modelo de reportes con pipelines eficientes.
+    Los joins usan localField/foreignField sobre _id (strings), servidos por índice.
+    Si los rollups de ventas (models/rollups.py) están construidos, los reportes
+    se leen de ellos en O(marcas + prendas) en lugar de agregar todo sales.
     Métodos:
       - obtener_marcas_con_ventas()
       - obtener_prendas_vendidas_stock()
       - obtener_top5_marcas()
       - obtener_todos_combinado()  -> devuelve { brands_with_sales, items_sold, top5_brands }
+      - obtener_ventas_por_periodo(desde, hasta, bucket, grupo)
+    Las consultas y el armado de resultados están separados para que la variante
+    async (app/aio) reutilice los mismos pipelines y normalizaciones.
     """
 
+    PROYECCION_PRENDAS = {"name": 1, "in_stock": 1, "stock": 1}
+
+    @staticmethod
+    def _etapa_ventas_por_prenda():
+        # Total vendido por prenda (una pasada sobre sales)
+        return {"$group": {"_id": "$clothing_id", "ventas": {"$sum": {"$ifNull": ["$quantity", {"$ifNull": ["$amount", 0]}]}}}}
+
+    @staticmethod
+    def _etapas_marca_desde_prendas():
+        """
+        A partir de los totales por prenda, resuelve la marca de cada prenda (join
+        por igualdad sobre clothing._id) y agrupa por marca. Al agrupar primero por
+        prenda, el $lookup se hace una vez por prenda y no por venta.
+        """
+        return [
+            {"$lookup": {"from": "clothing", "localField": "_id", "foreignField": "_id", "as": "clothing_doc"}},
+            {"$unwind": "$clothing_doc"},
+            {"$group": {"_id": "$clothing_doc.brand_id", "ventas": {"$sum": "$ventas"}}},
+        ]
+
+    @staticmethod
+    def _etapas_ventas_por_marca():
+        # Etapas comunes de marcas y top5
+        return [ReportsModel._etapa_ventas_por_prenda()] + ReportsModel._etapas_marca_desde_prendas()
+
+    @staticmethod
+    def _etapas_datos_marca():
+        # Traer datos de la marca (join por igualdad sobre brands._id)
+        return [
+            {"$lookup": {"from": "brands", "localField": "_id", "foreignField": "_id", "as": "brand_doc"}},
+            {"$unwind": "$brand_doc"},
+            {"$project": {"brand": "$brand_doc.name", "brand_id": "$_id", "ventas": 1}},
+        ]
+
     @staticmethod
     def obtener_marcas_con_ventas():
         """
         Retorna lista de { brand: <nombre>, ventas: <cantidad> } para marcas con al menos una venta.
         """
         try:
-            pipeline = [
-                # Resolver clothing desde sales (coincidir string(ObjectId) o string id)
-                {
-                    "$lookup": {
-                        "from": "clothing",
-                        "let": {"cid": "$clothing_id"},
-                        "pipeline": [
-                            {"$match": {"$expr": {"$eq": [{"$toString": "$_id"}, "$$cid"]}} },
-                            {"$project": {"_id": {"$toString": "$_id"}, "brand_id": {"$toString": "$brand_id"}, "name": 1}}
-                        ],
-                        "as": "clothing_doc"
-                    }
-                },
-                {"$unwind": "$clothing_doc"},
-                # Agrupar ventas por brand_id resuelto desde el documento de clothing
-                {
-                    "$group": {
-                        "_id": "$clothing_doc.brand_id",
-                        "ventas": {"$sum": {"$ifNull": ["$quantity", {"$ifNull": ["$amount", 0]}]}}
-                    }
-                },
-                # Traer datos de la marca
-                {
-                    "$lookup": {
-                        "from": "brands",
-                        "let": {"bid": "$_id"},
-                        "pipeline": [
-                            {"$match": {"$expr": {"$eq": [{"$toString": "$_id"}, "$$bid"]}} },
-                            {"$project": {"_id": {"$toString": "$_id"}, "name": 1, "country": 1}}
-                        ],
-                        "as": "brand_doc"
-                    }
-                },
-                {"$unwind": "$brand_doc"},
-                {"$project": {"brand": "$brand_doc.name", "brand_id": "$brand_doc._id", "ventas": 1}},
+            if RollupsModel.disponibles():
+                return ReportsModel._marcas_desde_rollups()
+
+            pipeline = ReportsModel._etapas_ventas_por_marca() + ReportsModel._etapas_datos_marca() + [
                 {"$sort": {"ventas": -1}}
             ]
 
@@ -70,70 +80,67 @@ class ReportsModel:
         Usa aggregation sobre 'clothing' con lookup a 'sales' para sumar cantidades.
         """
         try:
+            if RollupsModel.disponibles():
+                return ReportsModel._prendas_con_stock(RollupsModel.obtener_prendas())
+
             pipeline = [
-                # Para cada prenda, buscar ventas que coincidan (coincidir por string(_id))
+                # Para cada prenda, sumar sus ventas usando el índice de sales.clothing_id
+                # (el $group dentro del lookup evita traer un arreglo con todas las ventas)
                 {
                     "$lookup": {
                         "from": "sales",
-                        "let": {"cid": "$_id"},
+                        "localField": "_id",
+                        "foreignField": "clothing_id",
                         "pipeline": [
-                            {"$match": {"$expr": {"$eq": [{"$toString": "$clothing_id"}, {"$toString": "$$cid"}]}} },
-                            {"$project": {"quantity": {"$ifNull": ["$quantity", {"$ifNull": ["$amount", 0]}]}, "date": 1}}
+                            {"$group": {"_id": None, "sold": {"$sum": {"$ifNull": ["$quantity", {"$ifNull": ["$amount", 0]}]}}}}
                         ],
                         "as": "ventas"
                     }
                 },
-                # sumar las cantidades vendidas (ventas.quantity es un arreglo)
                 {
                     "$addFields": {
-                        "sold": {"$ifNull": [{"$sum": "$ventas.quantity"}, 0]},
+                        "sold": {"$ifNull": [{"$first": "$ventas.sold"}, 0]},
                         # normalizar campo de stock (in_stock o stock)
                         "in_stock": {"$ifNull": ["$in_stock", "$stock"]}
                     }
                 },
                 {
                     "$project": {
-                        "_id": {"$toString": "$_id"},
+                        "_id": 0,
                         "item_id": {"$toString": "$_id"},
                         "name": 1,
-                        "sold": {"$toInt": {"$ifNull": ["$sold", 0]}},
-                        "in_stock": 1,
-                        "remaining": {
-                            "$cond": [
-                                {"$and": [{"$ne": ["$in_stock", None]}, {"$ne": ["$sold", None]}]},
-                                {"$subtract": ["$in_stock", {"$ifNull": ["$sold", 0]}]},
-                                None
-                            ]
-                        }
+                        "sold": {"$toInt": "$sold"},
+                        "in_stock": 1
                     }
                 },
                 {"$sort": {"sold": -1, "name": 1}}
             ]
 
             result = list(mongo.db.clothing.aggregate(pipeline))
-            # Asegurar tipos y nombres consistentes
-            out = []
-            for r in result:
-                in_stock = r.get("in_stock", None)
-                sold = int(r.get("sold", 0))
-                remaining = None
-                try:
-                    if in_stock is not None:
-                        remaining = int(in_stock) - sold
-                except Exception:
-                    remaining = None
-                out.append({
-                    "item_id": r.get("item_id"),
-                    "name": r.get("name"),
-                    "sold": sold,
-                    "in_stock": in_stock if in_stock is not None else None,
-                    "remaining": remaining
-                })
-            return out
+            return [ReportsModel._normalizar_prenda(r) for r in result]
         except Exception as e:
             print("ReportsModel.obtener_prendas_vendidas_stock error:", e)
             return []
 
+    @staticmethod
+    def _normalizar_prenda(r):
+        # Asegurar tipos y nombres consistentes
+        in_stock = r.get("in_stock", None)
+        sold = int(r.get("sold", 0))
+        remaining = None
+        try:
+            if in_stock is not None:
+                remaining = int(in_stock) - sold
+        except Exception:
+            remaining = None
+        return {
+            "item_id": r.get("item_id"),
+            "name": r.get("name"),
+            "sold": sold,
+            "in_stock": in_stock,
+            "remaining": remaining
+        }
+
     @staticmethod
     def obtener_top5_marcas():
         """
@@ -141,37 +148,13 @@ class ReportsModel:
         Reusa el pipeline de marcas y limita a 5.
         """
         try:
-            pipeline = [
-                # lookup clothing from sales
-                {
-                    "$lookup": {
-                        "from": "clothing",
-                        "let": {"cid": "$clothing_id"},
-                        "pipeline": [
-                            {"$match": {"$expr": {"$eq": [{"$toString": "$_id"}, "$$cid"]}} },
-                            {"$project": {"brand_id": {"$toString": "$brand_id"}}}
-                        ],
-                        "as": "clothing_doc"
-                    }
-                },
-                {"$unwind": "$clothing_doc"},
-                {"$group": {"_id": "$clothing_doc.brand_id", "ventas": {"$sum": {"$ifNull": ["$quantity", {"$ifNull": ["$amount", 0]}]}}}},
+            if RollupsModel.disponibles():
+                return [{"brand": m["brand"], "ventas": m["ventas"]} for m in ReportsModel._marcas_desde_rollups()[:5]]
+
+            pipeline = ReportsModel._etapas_ventas_por_marca() + [
                 {"$sort": {"ventas": -1}},
-                {"$limit": 5},
-                {
-                    "$lookup": {
-                        "from": "brands",
-                        "let": {"bid": "$_id"},
-                        "pipeline": [
-                            {"$match": {"$expr": {"$eq": [{"$toString": "$_id"}, "$$bid"]}} },
-                            {"$project": {"_id": {"$toString": "$_id"}, "name": 1}}
-                        ],
-                        "as": "brand_doc"
-                    }
-                },
-                {"$unwind": "$brand_doc"},
-                {"$project": {"brand": "$brand_doc.name", "ventas": 1}}
-            ]
+                {"$limit": 5}
+            ] + ReportsModel._etapas_datos_marca()
 
             result = list(mongo.db.sales.aggregate(pipeline))
             return [{"brand": r.get("brand"), "ventas": int(r.get("ventas", 0))} for r in result]
@@ -189,21 +172,167 @@ class ReportsModel:
            "top5_brands": [...]
          }
         Útil para tener un único endpoint que el front-end puede consumir.
+        Lee los rollups; sin ellos hace una sola pasada sobre sales con $facet.
+        El top5 sale de las marcas ya ordenadas.
         """
         try:
-            marcas = ReportsModel.obtener_marcas_con_ventas()
-            prendas = ReportsModel.obtener_prendas_vendidas_stock()
-            top5 = ReportsModel.obtener_top5_marcas()
-            # Normalizar nombres de campos para el front
-            brands_with_sales = [{"name": m.get("brand"), "sales_count": m.get("ventas", 0), "brand_id": m.get("brand_id")} for m in marcas]
-            items_sold = [{"item_id": p.get("item_id"), "name": p.get("name"), "sold": p.get("sold", 0), "in_stock": p.get("in_stock"), "remaining": p.get("remaining")} for p in prendas]
-            top5_brands = [{"name": t.get("brand"), "sales_count": t.get("ventas", 0)} for t in top5]
-
-            return {
-                "brands_with_sales": brands_with_sales,
-                "items_sold": items_sold,
-                "top5_brands": top5_brands
-            }
+            if RollupsModel.disponibles():
+                marcas = ReportsModel._marcas_desde_rollups()
+                vendidas = RollupsModel.obtener_prendas()
+            else:
+                marcas, vendidas = ReportsModel._marcas_y_prendas_facet()
+            return ReportsModel._armar_combinado(marcas, ReportsModel._prendas_con_stock(vendidas))
         except Exception as e:
             print("ReportsModel.obtener_todos_combinado error:", e)
-            return {"brands_with_sales": [], "items_sold": [], "top5_brands": []}
\ No newline at end of file
+            return {"brands_with_sales": [], "items_sold": [], "top5_brands": []}
+
+    # Agrupaciones soportadas por obtener_ventas_por_periodo: campo de clothing y colección con el nombre
+    GRUPOS_PERIODO = {
+        "item": ("_id", "clothing"),
+        "brand": ("brand_id", "brands"),
+        "category": ("category", None),
+    }
+
+    @staticmethod
+    def obtener_ventas_por_periodo(desde, hasta, bucket="day", grupo="item", zona="UTC"):
+        """
+        Ventas en [desde, hasta) agrupadas por intervalo (hour | day | week) y por
+        prenda, marca o categoría:
+          [{ bucket: <inicio del intervalo>, key: <id o categoría>, name, ventas }, ...]
+        El $match sobre date usa el índice de sales.date, así el costo depende de las
+        ventas de la ventana y no del histórico completo.
+        """
+        try:
+            campo, coleccion_nombres = ReportsModel.GRUPOS_PERIODO[grupo]
+            pipeline = [
+                {"$match": {"date": {"$gte": desde, "$lt": hasta}}},
+                # Primero por prenda e intervalo: el $lookup a clothing se hace por grupo y no por venta
+                {
+                    "$group": {
+                        "_id": {
+                            "clothing_id": "$clothing_id",
+                            "bucket": {"$dateTrunc": {"date": "$date", "unit": bucket, "timezone": zona, "startOfWeek": "monday"}}
+                        },
+                        "ventas": {"$sum": {"$ifNull": ["$quantity", {"$ifNull": ["$amount", 0]}]}}
+                    }
+                }
+            ]
+            if grupo != "item":
+                pipeline += [
+                    {"$lookup": {"from": "clothing", "localField": "_id.clothing_id", "foreignField": "_id", "as": "clothing_doc"}},
+                    {"$unwind": "$clothing_doc"},
+                    {"$group": {"_id": {"key": f"$clothing_doc.{campo}", "bucket": "$_id.bucket"}, "ventas": {"$sum": "$ventas"}}}
+                ]
+            else:
+                pipeline.append({"$project": {"_id": {"key": "$_id.clothing_id", "bucket": "$_id.bucket"}, "ventas": 1}})
+            if coleccion_nombres:
+                pipeline += [
+                    {"$lookup": {"from": coleccion_nombres, "localField": "_id.key", "foreignField": "_id", "as": "doc"}},
+                    {"$addFields": {"name": {"$first": "$doc.name"}}}
+                ]
+            pipeline += [
+                {"$project": {"_id": 0, "bucket": "$_id.bucket", "key": "$_id.key", "name": 1, "ventas": 1}},
+                {"$sort": {"bucket": 1, "ventas": -1}}
+            ]
+
+            result = list(mongo.db.sales.aggregate(pipeline))
+            return [
+                {
+                    "bucket": r["bucket"].isoformat() if r.get("bucket") else None,
+                    "key": r.get("key"),
+                    "name": r.get("name", r.get("key")),
+                    "ventas": int(r.get("ventas", 0))
+                }
+                for r in result
+            ]
+        except Exception as e:
+            print("ReportsModel.obtener_ventas_por_periodo error:", e)
+            return []
+
+    @staticmethod
+    def _armar_combinado(marcas, prendas):
+        # Normalizar nombres de campos para el front
+        brands_with_sales = [{"name": m.get("brand"), "sales_count": m.get("ventas", 0), "brand_id": m.get("brand_id")} for m in marcas]
+        top5_brands = [{"name": m["name"], "sales_count": m["sales_count"]} for m in brands_with_sales[:5]]
+        return {
+            "brands_with_sales": brands_with_sales,
+            "items_sold": prendas,
+            "top5_brands": top5_brands
+        }
+
+    @staticmethod
+    def _marcas_y_prendas_facet():
+        """
+        Una sola pasada sobre sales: el $facet reparte los totales por prenda entre
+        el reporte de prendas y el de marcas.
+        Retorna (marcas, { clothing_id: vendidas }).
+        """
+        resultado = next(mongo.db.sales.aggregate(ReportsModel._pipeline_facet()), None)
+        return ReportsModel._leer_facet(resultado)
+
+    @staticmethod
+    def _pipeline_facet():
+        return [
+            ReportsModel._etapa_ventas_por_prenda(),
+            {
+                "$facet": {
+                    "prendas": [{"$project": {"ventas": 1}}],
+                    "marcas": ReportsModel._etapas_marca_desde_prendas() + ReportsModel._etapas_datos_marca() + [
+                        {"$sort": {"ventas": -1}}
+                    ]
+                }
+            }
+        ]
+
+    @staticmethod
+    def _leer_facet(resultado):
+        resultado = resultado or {"prendas": [], "marcas": []}
+        marcas = [{"brand": r.get("brand"), "ventas": int(r.get("ventas", 0)), "brand_id": r.get("brand_id")} for r in resultado["marcas"]]
+        return marcas, {p["_id"]: p.get("ventas", 0) for p in resultado["prendas"]}
+
+    @staticmethod
+    def _marcas_desde_rollups(ids=None):
+        # Totales por marca ya ordenados + nombres de las marcas existentes
+        totales = RollupsModel.obtener_marcas(ids)
+        marcas = mongo.db.brands.find({"_id": {"$in": [t["_id"] for t in totales]}}, {"name": 1})
+        return ReportsModel._armar_marcas(totales, marcas)
+
+    @staticmethod
+    def filas_combinado(ids_prendas, ids_marcas):
+        """
+        Filas de obtener_todos_combinado solo para las prendas y marcas indicadas,
+        leídas de los rollups: (items_sold, brands_with_sales). Una prenda o marca
+        sin fila ya no aparece en el reporte (borrada, o marca sin ventas).
+        """
+        documentos = mongo.db.clothing.find({"_id": {"$in": list(ids_prendas)}}, ReportsModel.PROYECCION_PRENDAS)
+        prendas = ReportsModel._armar_prendas(documentos, RollupsModel.obtener_prendas(ids_prendas))
+        combinado = ReportsModel._armar_combinado(ReportsModel._marcas_desde_rollups(ids_marcas), prendas)
+        return combinado["items_sold"], combinado["brands_with_sales"]
+
+    @staticmethod
+    def _armar_marcas(totales, marcas):
+        # totales: [{ _id: brand_id, ventas }] ordenados; marcas: documentos de brands
+        nombres = {b["_id"]: b.get("name") for b in marcas}
+        return [
+            {"brand": nombres[t["_id"]], "ventas": int(t.get("ventas", 0)), "brand_id": t["_id"]}
+            for t in totales if t["_id"] in nombres
+        ]
+
+    @staticmethod
+    def _prendas_con_stock(vendidas):
+        # Todas las prendas (también las que no tienen ventas) con su stock y total vendido
+        return ReportsModel._armar_prendas(mongo.db.clothing.find({}, ReportsModel.PROYECCION_PRENDAS), vendidas)
+
+    @staticmethod
+    def _armar_prendas(documentos, vendidas):
+        prendas = [
+            ReportsModel._normalizar_prenda({
+                "item_id": str(c["_id"]),
+                "name": c.get("name"),
+                "sold": vendidas.get(c["_id"], 0),
+                "in_stock": c.get("in_stock", c.get("stock"))
+            })
+            for c in documentos
+        ]
+        prendas.sort(key=lambda p: (-p["sold"], p["name"] or ""))
+        return prendas
@@ -0,0 +1,263 @@
+# api/v1/app/models/rollups.py
+from datetime import datetime, timezone
+
+from pymongo import ReturnDocument, UpdateOne
+from app.index import mongo
+
+ROLLUP_PRENDAS = "sales_rollup_by_item"
+ROLLUP_MARCAS = "sales_rollup_by_brand"
+# Marcador que deja reconstruir(): { _id: "construidos", fecha }
+ROLLUP_ESTADO = "sales_rollup_state"
+MARCADOR_CONSTRUIDOS = {"_id": "construidos"}
+
+# Lectura de sales_rollup_by_brand: solo marcas con ventas, de mayor a menor
+FILTRO_MARCAS_CON_VENTAS = {"ventas": {"$gt": 0}}
+ORDEN_MARCAS = [("ventas", -1)]
+
+# Una vez visto el marcador no se vuelve a consultar en el proceso
+_estado = {"construidos": False}
+
+
+class RollupsModel:
+    """
+    Totales de ventas materializados, mantenidos con $inc en cada escritura de sales:
+      - sales_rollup_by_item:  { _id: <clothing_id>, sold: n, brand_id: <id> }
+      - sales_rollup_by_brand: { _id: <brand_id>, ventas: n }
+    Solo cuentan las ventas de prendas existentes (igual que el join de los reportes).
+    reconstruir() / verificar() recalculan los totales desde sales para reparar desvíos.
+
+    Hasta que reconstruir() deja su marcador en sales_rollup_state los rollups no se
+    leen ni se escriben: en una base con ventas anteriores estarían incompletos.
+    """
+
+    @staticmethod
+    def cantidad(venta):
+        # Igual que {"$ifNull": ["$quantity", {"$ifNull": ["$amount", 0]}]} con $sum:
+        # los valores no numéricos no suman
+        valor = venta.get("quantity")
+        if valor is None:
+            valor = venta.get("amount", 0)
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            return 0
+        return valor
+
+    @staticmethod
+    def aplicar_venta(venta, signo=1):
+        """
+        Suma (signo=1) o resta (signo=-1) la venta en los totales de su prenda y su marca.
+        """
+        cantidad = RollupsModel.cantidad(venta) * signo
+        clothing_id = venta.get("clothing_id")
+        if not cantidad or clothing_id is None or not RollupsModel.construidos():
+            return
+        prenda = mongo.db.clothing.find_one({"_id": clothing_id}, {"brand_id": 1})
+        if not prenda:
+            return
+        for coleccion, filtro, cambios in RollupsModel.operaciones_venta(clothing_id, prenda.get("brand_id"), cantidad):
+            mongo.db[coleccion].update_one(filtro, cambios, upsert=True)
+
+    @staticmethod
+    def aplicar_ventas(ventas, anteriores=()):
+        """
+        Versión por lotes de aplicar_venta: suma ventas y resta anteriores (las versiones
+        previas de ventas editadas o borradas) con una consulta para las marcas y un
+        bulk_write por colección de rollup, sin importar cuántas ventas sean.
+        """
+        cantidades = {}
+        for signo, lista in ((1, ventas), (-1, anteriores)):
+            for venta in lista:
+                cantidad = RollupsModel.cantidad(venta) * signo
+                if cantidad and venta.get("clothing_id") is not None:
+                    cantidades[venta["clothing_id"]] = cantidades.get(venta["clothing_id"], 0) + cantidad
+        cantidades = {clothing_id: cantidad for clothing_id, cantidad in cantidades.items() if cantidad}
+        if not cantidades or not RollupsModel.construidos():
+            return
+        marcas = {
+            p["_id"]: p.get("brand_id")
+            for p in mongo.db.clothing.find({"_id": {"$in": list(cantidades)}}, {"brand_id": 1})
+        }
+        operaciones = {}
+        for clothing_id, brand_id in marcas.items():
+            for coleccion, filtro, cambios in RollupsModel.operaciones_venta(clothing_id, brand_id, cantidades[clothing_id]):
+                operaciones.setdefault(coleccion, []).append(UpdateOne(filtro, cambios, upsert=True))
+        for coleccion, lote in operaciones.items():
+            mongo.db[coleccion].bulk_write(lote, ordered=False)
+
+    @staticmethod
+    def operaciones_venta(clothing_id, brand_id, cantidad):
+        """
+        Updates (upsert) que aplican una cantidad vendida a los rollups:
+        [(coleccion, filtro, cambios), ...]. Compartido con la variante async.
+        """
+        operaciones = [(
+            ROLLUP_PRENDAS,
+            {"_id": clothing_id},
+            {"$inc": {"sold": cantidad}, "$set": {"brand_id": brand_id}}
+        )]
+        if brand_id is not None:
+            operaciones.append((ROLLUP_MARCAS, {"_id": brand_id}, {"$inc": {"ventas": cantidad}}))
+        return operaciones
+
+    @staticmethod
+    def mover_prenda(clothing_id, brand_anterior, brand_nueva):
+        """
+        La prenda cambió de marca: mover su total vendido de una marca a la otra.
+        """
+        if not RollupsModel.construidos():
+            return
+        prenda = mongo.db[ROLLUP_PRENDAS].find_one_and_update(
+            *RollupsModel.cambio_marca(clothing_id, brand_nueva), return_document=ReturnDocument.BEFORE
+        )
+        for coleccion, filtro, cambios, upsert in RollupsModel.operaciones_mover(prenda, brand_anterior, brand_nueva):
+            mongo.db[coleccion].update_one(filtro, cambios, upsert=upsert)
+
+    @staticmethod
+    def quitar_prenda(clothing_id):
+        # La prenda se eliminó: sus ventas dejan de contar para su marca
+        if not RollupsModel.construidos():
+            return
+        prenda = mongo.db[ROLLUP_PRENDAS].find_one_and_delete({"_id": clothing_id})
+        for coleccion, filtro, cambios, upsert in RollupsModel.operaciones_quitar(prenda):
+            mongo.db[coleccion].update_one(filtro, cambios, upsert=upsert)
+
+    # Partes puras de mover_prenda / quitar_prenda, compartidas con la variante async
+
+    @staticmethod
+    def cambio_marca(clothing_id, brand_nueva):
+        # (filtro, cambios) del find_one_and_update sobre sales_rollup_by_item
+        return {"_id": clothing_id}, {"$set": {"brand_id": brand_nueva}}
+
+    @staticmethod
+    def operaciones_mover(prenda, brand_anterior, brand_nueva):
+        """
+        Updates que mueven el total de la prenda (su rollup antes del cambio, o None)
+        entre marcas: [(coleccion, filtro, cambios, upsert), ...].
+        """
+        vendidas = prenda.get("sold", 0) if prenda else 0
+        if not vendidas:
+            return []
+        operaciones = []
+        if brand_anterior is not None:
+            operaciones.append((ROLLUP_MARCAS, {"_id": brand_anterior}, {"$inc": {"ventas": -vendidas}}, False))
+        if brand_nueva is not None:
+            operaciones.append((ROLLUP_MARCAS, {"_id": brand_nueva}, {"$inc": {"ventas": vendidas}}, True))
+        return operaciones
+
+    @staticmethod
+    def operaciones_quitar(prenda):
+        # Igual que operaciones_mover para el rollup borrado de una prenda eliminada
+        if not prenda or prenda.get("brand_id") is None or not prenda.get("sold"):
+            return []
+        return [(ROLLUP_MARCAS, {"_id": prenda["brand_id"]}, {"$inc": {"ventas": -prenda["sold"]}}, False)]
+
+    @staticmethod
+    def recordar_marcador(marcador=None):
+        """
+        Recuerda el marcador leído de sales_rollup_state (si no es None) y retorna
+        si los rollups están construidos. Compartido con la variante async.
+        """
+        if marcador is not None:
+            _estado["construidos"] = True
+        return _estado["construidos"]
+
+    @staticmethod
+    def construidos():
+        if not RollupsModel.recordar_marcador():
+            RollupsModel.recordar_marcador(mongo.db[ROLLUP_ESTADO].find_one(MARCADOR_CONSTRUIDOS))
+        return RollupsModel.recordar_marcador()
+
+    @staticmethod
+    def disponibles():
+        # Los reportes leen los rollups solo si reconstruir() ya dejó su marcador; si no, usan los pipelines
+        return RollupsModel.construidos()
+
+    @staticmethod
+    def construir_si_vacia():
+        """
+        Al iniciar: con sales vacía los rollups se construyen en el momento (vacíos,
+        por lo tanto completos) para que una base nueva no dependa del comando. Con
+        ventas hay que correr "rollups rebuild"; las lecturas nunca reconstruyen.
+        """
+        if not RollupsModel.construidos() and mongo.db.sales.estimated_document_count() == 0:
+            RollupsModel.reconstruir()
+
+    @staticmethod
+    def obtener_prendas(ids=None):
+        # { clothing_id: sold } de todas las prendas o solo de ids
+        filtro = {} if ids is None else {"_id": {"$in": list(ids)}}
+        return {r["_id"]: r.get("sold", 0) for r in mongo.db[ROLLUP_PRENDAS].find(filtro, {"sold": 1})}
+
+    @staticmethod
+    def obtener_marcas(ids=None):
+        # [{ _id: brand_id, ventas }] ordenado por ventas, solo marcas con ventas (todas o solo ids)
+        filtro = FILTRO_MARCAS_CON_VENTAS if ids is None else {**FILTRO_MARCAS_CON_VENTAS, "_id": {"$in": list(ids)}}
+        return list(mongo.db[ROLLUP_MARCAS].find(filtro).sort(ORDEN_MARCAS))
+
+    @staticmethod
+    def _pipeline_prendas():
+        return [
+            {"$group": {"_id": "$clothing_id", "sold": {"$sum": {"$ifNull": ["$quantity", {"$ifNull": ["$amount", 0]}]}}}},
+            {"$lookup": {"from": "clothing", "localField": "_id", "foreignField": "_id", "as": "clothing_doc"}},
+            {"$unwind": "$clothing_doc"},
+            {"$project": {"sold": 1, "brand_id": "$clothing_doc.brand_id"}}
+        ]
+
+    @staticmethod
+    def _pipeline_marcas():
+        return [
+            {"$match": {"brand_id": {"$ne": None}}},
+            {"$group": {"_id": "$brand_id", "ventas": {"$sum": "$sold"}}}
+        ]
+
+    @staticmethod
+    def pasos_reconstruccion():
+        # [(colección de origen, pipeline con $out)] en orden. Compartido con la variante async
+        return [
+            ("sales", RollupsModel._pipeline_prendas() + [{"$out": ROLLUP_PRENDAS}]),
+            (ROLLUP_PRENDAS, RollupsModel._pipeline_marcas() + [{"$out": ROLLUP_MARCAS}]),
+        ]
+
+    @staticmethod
+    def marcador():
+        return {**MARCADOR_CONSTRUIDOS, "fecha": datetime.now(timezone.utc)}
+
+    @staticmethod
+    def reconstruir():
+        """
+        Recalcula ambos rollups desde sales. $out reemplaza cada colección de una vez.
+        Al terminar deja el marcador que habilita leerlos y mantenerlos; las ventas
+        escritas mientras corre pueden quedar afuera (verify --repair las recupera).
+        """
+        for origen, pipeline in RollupsModel.pasos_reconstruccion():
+            mongo.db[origen].aggregate(pipeline)
+        mongo.db[ROLLUP_ESTADO].replace_one(MARCADOR_CONSTRUIDOS, RollupsModel.marcador(), upsert=True)
+        RollupsModel.recordar_marcador(MARCADOR_CONSTRUIDOS)
+
+    @staticmethod
+    def verificar():
+        """
+        Compara los rollups guardados con los totales recalculados desde sales.
+        Retorna { "prendas": [...], "marcas": [...] } con las diferencias
+        ({ _id, guardado, esperado }); listas vacías si no hay desvíos.
+        """
+        esperado_prendas = {r["_id"]: r for r in mongo.db.sales.aggregate(RollupsModel._pipeline_prendas())}
+        esperado_marcas = {}
+        for r in esperado_prendas.values():
+            if r.get("brand_id") is not None:
+                esperado_marcas[r["brand_id"]] = esperado_marcas.get(r["brand_id"], 0) + r["sold"]
+
+        guardado_prendas = {r["_id"]: r.get("sold", 0) for r in mongo.db[ROLLUP_PRENDAS].find()}
+        guardado_marcas = {r["_id"]: r.get("ventas", 0) for r in mongo.db[ROLLUP_MARCAS].find()}
+
+        return {
+            "prendas": RollupsModel._diferencias(guardado_prendas, {k: r["sold"] for k, r in esperado_prendas.items()}),
+            "marcas": RollupsModel._diferencias(guardado_marcas, esperado_marcas)
+        }
+
+    @staticmethod
+    def _diferencias(guardado, esperado):
+        return [
+            {"_id": k, "guardado": guardado.get(k, 0), "esperado": esperado.get(k, 0)}
+            for k in set(guardado) | set(esperado)
+            if guardado.get(k, 0) != esperado.get(k, 0)
+        ]
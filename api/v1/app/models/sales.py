@@ -1,46 +1,106 @@
-from bson.objectid import ObjectId
+from pymongo import ReturnDocument
 from app.index import mongo
+from app.utils.cache import report_cache, document_cache, EDICIONES_VENTAS
+from app.models.rollups import RollupsModel
+from app.utils.ids import nuevo_id, filtro_por_id
+from app.utils.pagination import paginar, orden_find
+from app.utils.export import exportar as exportar_coleccion
+from app.utils.expand import expandir
+from app.utils.bulk import ejecutar_bulk
 
 class SalesModel:
+    # Columnas del CSV de exportación (sin fields)
+    COLUMNAS_CSV = ["_id", "user_id", "clothing_id", "quantity", "amount", "date"]
+
+    @staticmethod
+    def obtener_todos(proyeccion=None, filtro=None, orden=None):
+        cursor = mongo.db.sales.find(filtro or {}, proyeccion)
+        return list(cursor.sort(orden_find(orden)) if orden else cursor)
+
+    @staticmethod
+    def obtener_pagina(limit, after=None, con_total=False, proyeccion=None, filtro=None, orden=None):
+        return paginar(mongo.db.sales, limit, after, con_total, proyeccion, filtro, orden)
+
+    @staticmethod
+    def expandir(ventas, expand):
+        # ?expand=user,clothing,clothing.brand: una consulta $in por relación para todas las ventas
+        return expandir(mongo.db, "sales", ventas, expand)
+
     @staticmethod
-    def obtener_todos():
-        sales_cursor = mongo.db.sales.find()
-        sales = []
-        for sale in sales_cursor:
-            sale["_id"] = str(sale["_id"])
-            sales.append(sale)
-        return sales
+    def exportar(formato, batch_size, campos=None, filtro=None):
+        return exportar_coleccion(mongo.db.sales, formato, batch_size, SalesModel.COLUMNAS_CSV, campos, filtro)
 
     @staticmethod
-    def obtener_por_id(id):
+    def bulk(operaciones, batch_size):
+        resultados, cambios = ejecutar_bulk(mongo.db.sales, "sales", operaciones, batch_size)
+        # Rollups de todo el lote en un bulk_write: resta las versiones anteriores y suma las nuevas
         try:
-            sale = mongo.db.sales.find_one({"_id": ObjectId(id)})
-            if sale:
-                sale["_id"] = str(sale["_id"])
-            return sale
+            RollupsModel.aplicar_ventas(
+                [nueva for _, _, _, nueva in cambios if nueva],
+                [anterior for _, _, anterior, _ in cambios if anterior]
+            )
+        except Exception as e:
+            print("SalesModel.bulk rollups error:", e)
+        if any(anterior for _, _, anterior, _ in cambios):
+            report_cache.invalidar(EDICIONES_VENTAS)
+        return resultados
+
+    @staticmethod
+    def obtener_por_id(id, proyeccion=None):
+        try:
+            return document_cache.obtener(
+                "sales", id, proyeccion, lambda: mongo.db.sales.find_one(filtro_por_id(id), proyeccion)
+            )
         except:
             return None
 
     @staticmethod
     def crear(data):
         try:
+            data.setdefault("_id", nuevo_id())
             result = mongo.db.sales.insert_one(data)
-            return str(result.inserted_id)
         except:
             return None
+        SalesModel._actualizar_rollups(nueva=data)
+        return str(result.inserted_id)
 
     @staticmethod
     def actualizar(id, data):
         try:
-            result = mongo.db.sales.update_one({"_id": ObjectId(id)}, {"$set": data})
-            return result.modified_count
+            anterior = mongo.db.sales.find_one_and_update(
+                filtro_por_id(id), {"$set": data}, return_document=ReturnDocument.BEFORE
+            )
         except:
             return -1
+        if not anterior or all(anterior.get(k) == v for k, v in data.items()):
+            return 0
+        document_cache.invalidar("sales", id)
+        SalesModel._actualizar_rollups(anterior=anterior, nueva={**anterior, **data})
+        return 1
 
     @staticmethod
     def eliminar(id):
         try:
-            result = mongo.db.sales.delete_one({"_id": ObjectId(id)})
-            return result.deleted_count
+            anterior = mongo.db.sales.find_one_and_delete(filtro_por_id(id))
         except:
             return -1
+        if not anterior:
+            return 0
+        document_cache.invalidar("sales", id)
+        SalesModel._actualizar_rollups(anterior=anterior)
+        return 1
+
+    @staticmethod
+    def _actualizar_rollups(anterior=None, nueva=None):
+        # La venta ya quedó guardada: un fallo aquí solo desvía los rollups
+        # (se corrige con "flask rollups verify --repair")
+        report_cache.invalidar("sales")
+        if anterior:
+            report_cache.invalidar(EDICIONES_VENTAS)
+        try:
+            if anterior:
+                RollupsModel.aplicar_venta(anterior, -1)
+            if nueva:
+                RollupsModel.aplicar_venta(nueva, 1)
+        except Exception as e:
+            print("SalesModel._actualizar_rollups error:", e)
@@ -0,0 +1,287 @@
+# api/v1/app/models/sales_ingest.py
+import atexit
+import queue
+import threading
+import time
+
+import bson
+from bson.errors import InvalidDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+
+from app.index import mongo
+from app.models.rollups import RollupsModel
+from app.utils.cache import report_cache
+from app.utils.ids import nuevo_id
+from app.utils.metrics import EVENTOS_INGESTA_VENTAS
+
+# Modos de confirmación: "flush" responde cuando la venta ya está en MongoDB,
+# "async" responde al entrar a la cola (una caída del proceso pierde lo pendiente)
+MODOS_CONFIRMACION = ("flush", "async")
+
+# Tamaño máximo de un documento BSON en MongoDB
+MAX_BSON = 16 * 1024 * 1024
+
+
+class ColaLlena(Exception):
+    """La cola está llena (o el buffer se está deteniendo): el cliente debe reintentar."""
+
+
+class SinConfirmar(Exception):
+    """
+    Modo flush: el lote de la venta no se escribió dentro de espera_confirmacion.
+    La venta puede escribirse igual más tarde; args[0] es su _id.
+    """
+
+
+class _Pendiente:
+    __slots__ = ("venta", "id_cliente", "listo", "error", "repetida")
+
+    def __init__(self, venta, id_cliente):
+        self.venta = venta
+        # El cliente trajo el _id: puede ser el reintento de una venta ya escrita
+        self.id_cliente = id_cliente
+        self.listo = threading.Event()
+        self.error = None
+        self.repetida = False
+
+
+class SalesIngestBuffer:
+    """
+    Ingesta de ventas de alto volumen (POST /sales con SALES_INGEST=1): cada venta
+    entra a una cola acotada del proceso y recibe su _id como recibo. Un hilo las
+    junta y las escribe con insert_many cada intervalo_ms o cada max_lote ventas,
+    y aplica los rollups y la invalidación de la caché una vez por lote.
+      - Cola llena: encolar() lanza ColaLlena (503 con Retry-After).
+      - confirmacion="flush": encolar() espera a que su lote se escriba;
+        "async": retorna apenas la venta entra a la cola.
+      - Errores de conexión: el lote se reintenta con espera creciente; mientras
+        tanto la cola se llena y se aplica la contrapresión.
+      - detener(): deja de aceptar ventas y vacía la cola (atexit y worker_exit de gunicorn).
+    """
+
+    def __init__(self, capacidad=10000, max_lote=500, intervalo_ms=50, confirmacion="flush", espera_confirmacion=10.0):
+        self.activo = False
+        self.capacidad = capacidad
+        self.max_lote = max_lote
+        self.intervalo_ms = intervalo_ms
+        self.confirmacion = confirmacion
+        self.espera_confirmacion = espera_confirmacion
+        self._cola = None
+        self._hilo = None
+        self._deteniendo = False
+        self._contadores = dict.fromkeys(("aceptadas", "rechazadas", "insertadas", "repetidas", "fallidas", "sin_confirmar", "lotes"), 0)
+        self._lock = threading.Lock()
+
+    def configurar(self, activo=False, capacidad=None, max_lote=None, intervalo_ms=None, confirmacion=None,
+                   espera_confirmacion=None):
+        if capacidad is not None:
+            self.capacidad = capacidad
+        if max_lote is not None:
+            self.max_lote = max_lote
+        if intervalo_ms is not None:
+            self.intervalo_ms = intervalo_ms
+        if confirmacion is not None:
+            if confirmacion not in MODOS_CONFIRMACION:
+                raise ValueError(f"SALES_INGEST_ACK debe ser uno de {MODOS_CONFIRMACION}")
+            self.confirmacion = confirmacion
+        if espera_confirmacion is not None:
+            self.espera_confirmacion = espera_confirmacion
+        self.activo = activo
+        if activo and self._hilo is None:
+            self._cola = queue.Queue(maxsize=self.capacidad)
+            self._hilo = threading.Thread(target=self._vaciar_continuamente, name="sales-ingest", daemon=True)
+            self._hilo.start()
+            atexit.register(self.detener)
+
+    # ---- entrada ----
+
+    def encolar(self, venta):
+        """
+        Agrega la venta a la cola y retorna (recibo, estado). recibo es el _id de la
+        venta; estado es "escrita" si ya está en MongoDB (modo flush), "repetida" si
+        el _id que trajo el cliente ya estaba escrito con la misma venta (reintento
+        tras un 503) y "pendiente" si quedó en la cola. Lanza ColaLlena si no hay
+        espacio y ValueError si la venta no se puede guardar en BSON o si no se pudo
+        escribir (modo flush). En modo flush, si la escritura no se confirma a tiempo
+        lanza SinConfirmar: nunca se responde como escrita una venta que no se sabe
+        si quedó en MongoDB.
+        """
+        id_cliente = "_id" in venta
+        venta.setdefault("_id", nuevo_id())
+        # Se valida aquí para que una venta inválida no llegue al lote de otras
+        try:
+            tamano = len(bson.encode(venta))
+        except (InvalidDocument, TypeError, OverflowError) as e:
+            raise ValueError(f"Venta inválida: {e}")
+        if tamano > MAX_BSON:
+            raise ValueError("Venta demasiado grande")
+        pendiente = _Pendiente(venta, id_cliente)
+        try:
+            if self._deteniendo:
+                raise queue.Full()
+            self._cola.put_nowait(pendiente)
+        except queue.Full:
+            self._contar("rechazadas")
+            raise ColaLlena()
+        self._contar("aceptadas")
+        if self.confirmacion == "async":
+            return venta["_id"], "pendiente"
+        if not pendiente.listo.wait(self.espera_confirmacion):
+            self._contar("sin_confirmar")
+            raise SinConfirmar(venta["_id"])
+        if pendiente.error:
+            raise ValueError(pendiente.error)
+        return venta["_id"], "repetida" if pendiente.repetida else "escrita"
+
+    def _contar(self, evento, n=1):
+        with self._lock:
+            self._contadores[evento] += n
+        EVENTOS_INGESTA_VENTAS.labels(evento).inc(n)
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "activo": self.activo,
+                "confirmacion": self.confirmacion,
+                "en_cola": self._cola.qsize() if self._cola is not None else 0,
+                "capacidad": self.capacidad,
+                "max_lote": self.max_lote,
+                "intervalo_ms": self.intervalo_ms,
+                **self._contadores,
+            }
+
+    # ---- escritura ----
+
+    def detener(self, espera=30.0):
+        # Deja de aceptar ventas y espera a que el hilo escriba lo que queda en la cola
+        if self._hilo is None or self._deteniendo:
+            return
+        self._deteniendo = True
+        self._hilo.join(espera)
+
+    def _vaciar_continuamente(self):
+        # Un error inesperado falla las ventas de su lote, nunca el hilo
+        while True:
+            lote = self._siguiente_lote()
+            if lote:
+                try:
+                    self._escribir(lote)
+                except Exception as e:
+                    print("SalesIngestBuffer error:", e)
+                    self._fallar(lote, "Error al escribir el lote")
+            elif self._deteniendo:
+                return
+
+    def _fallar(self, lote, error):
+        pendientes = [p for p in lote if not p.listo.is_set()]
+        for pendiente in pendientes:
+            pendiente.error = error
+            pendiente.listo.set()
+        if pendientes:
+            self._contar("fallidas", len(pendientes))
+
+    def _siguiente_lote(self):
+        # Espera la primera venta y junta las que lleguen hasta intervalo_ms o max_lote
+        try:
+            lote = [self._cola.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+        limite = time.monotonic() + self.intervalo_ms / 1000
+        while len(lote) < self.max_lote:
+            restante = 0 if self._deteniendo else limite - time.monotonic()
+            try:
+                lote.append(self._cola.get(timeout=restante) if restante > 0 else self._cola.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _escribir(self, lote):
+        errores = self._insertar(lote)
+        # Las repetidas ya aplicaron sus rollups cuando se escribieron la primera vez
+        insertadas = [p.venta for i, p in enumerate(lote) if i not in errores and not p.repetida]
+        if insertadas:
+            try:
+                report_cache.invalidar("sales")
+                RollupsModel.aplicar_ventas(insertadas)
+            except Exception as e:
+                print("SalesIngestBuffer rollups error:", e)
+        for i, pendiente in enumerate(lote):
+            pendiente.error = errores.get(i)
+            pendiente.listo.set()
+        self._contar("lotes")
+        self._contar("insertadas", len(insertadas))
+        repetidas = sum(1 for p in lote if p.repetida)
+        if repetidas:
+            self._contar("repetidas", repetidas)
+        if errores:
+            self._contar("fallidas", len(errores))
+
+    def _insertar(self, lote):
+        """
+        insert_many(ordered=False) del lote. Retorna {posición: error} de las ventas
+        que no se escribieron. Los errores de conexión se reintentan; al detener se
+        abandona el lote después de unos intentos. Si algún documento no se puede
+        codificar, el lote se escribe de a una venta para fallar solo esa.
+        """
+        intento = 0
+        while True:
+            try:
+                mongo.db.sales.insert_many([p.venta for p in lote], ordered=False)
+                return {}
+            except BulkWriteError as e:
+                errores, duplicadas = {}, []
+                for error in e.details.get("writeErrors", []):
+                    # Tras un reintento, un _id duplicado es una venta que ya había entrado en el intento anterior
+                    if intento and error.get("code") == 11000:
+                        continue
+                    if error.get("code") == 11000 and lote[error["index"]].id_cliente:
+                        duplicadas.append(error["index"])
+                        continue
+                    errores[error["index"]] = error.get("errmsg", "Error de escritura")
+                errores.update(self._marcar_repetidas(lote, duplicadas))
+                return errores
+            except InvalidDocument as e:
+                print("SalesIngestBuffer insert_many error:", e)
+                return self._insertar_por_venta(lote)
+            except PyMongoError as e:
+                intento += 1
+                print("SalesIngestBuffer insert_many error:", e)
+                if self._deteniendo and intento >= 3:
+                    return dict.fromkeys(range(len(lote)), "Error de base de datos")
+                time.sleep(min(0.1 * 2 ** intento, 5))
+
+    def _insertar_por_venta(self, lote):
+        # insert_many pudo enviar parte del lote: un _id duplicado ya está escrito
+        errores, duplicadas = {}, []
+        for i, pendiente in enumerate(lote):
+            try:
+                mongo.db.sales.insert_one(pendiente.venta)
+            except DuplicateKeyError:
+                if pendiente.id_cliente:
+                    duplicadas.append(i)
+            except (InvalidDocument, PyMongoError) as e:
+                errores[i] = str(e) or "Error de escritura"
+        errores.update(self._marcar_repetidas(lote, duplicadas))
+        return errores
+
+    @staticmethod
+    def _marcar_repetidas(lote, posiciones):
+        """
+        Ventas con _id del cliente que ya existía: si el documento guardado es la misma
+        venta es un reintento (se marca repetida); si no, es un _id en conflicto.
+        Retorna {posición: error} de las que no coinciden.
+        """
+        if not posiciones:
+            return {}
+        ids = [lote[i].venta["_id"] for i in posiciones]
+        guardadas = {v["_id"]: v for v in mongo.db.sales.find({"_id": {"$in": ids}})}
+        errores = {}
+        for i in posiciones:
+            if guardadas.get(lote[i].venta["_id"]) == lote[i].venta:
+                lote[i].repetida = True
+            else:
+                errores[i] = "_id duplicado"
+        return errores
+
+
+sales_ingest = SalesIngestBuffer()
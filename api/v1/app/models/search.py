@@ -0,0 +1,303 @@
+# api/v1/app/models/search.py
+import bisect
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+
+from app.index import mongo
+from app.utils.cache import report_cache
+
+# Campos donde se busca y campos que se devuelven en cada resultado
+CAMPOS_BUSQUEDA = {
+    "clothing": {"buscar": ("name",), "devolver": ("name", "price", "brand_id")},
+    "brands": {"buscar": ("name",), "devolver": ("name",)},
+    "users": {"buscar": ("name", "email"), "devolver": ("name", "email")},
+}
+
+LIMITE_POR_DEFECTO = 10
+LIMITE_MAXIMO = 50
+ESCANEO_MAXIMO = 2000      # términos revisados por búsqueda de prefijo
+CANDIDATOS_APROXIMADOS = 50  # palabras con más trigramas en común que se comparan
+SIMILITUD_MINIMA = 0.6
+
+
+def normalizar(texto):
+    # minúsculas y sin tildes: "Camisón" -> "camison"
+    texto = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(texto.lower().split())
+
+
+def _terminos(valor):
+    """
+    (termino, completo) de un valor: el valor entero y cada palabra. En los
+    emails las palabras salen solo de la parte local (antes de la @).
+    """
+    completo = normalizar(valor)
+    if not completo:
+        return []
+    palabras = re.findall(r"[a-z0-9]+", completo.split("@")[0])
+    return [(completo, True)] + [(p, False) for p in palabras if p != completo]
+
+
+def _trigramas(texto):
+    texto = f" {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class _IndiceColeccion:
+    """
+    Índice de una colección en memoria:
+      - terminos: lista ordenada de (termino, completo, id) para buscar por prefijo con bisect
+      - palabras / trigramas: vocabulario (palabra -> documentos que la usan) y
+        trigrama -> palabras, para corregir errores de tipeo en la consulta
+      - docs: id -> campos devueltos
+    """
+
+    def __init__(self, campos):
+        self.buscar_en = campos["buscar"]
+        self.devolver = campos["devolver"]
+        self.docs = {}
+        self.terminos = []
+        self.palabras = Counter()
+        self.trigramas = {}
+        self._por_id = {}
+
+    @classmethod
+    def construir(cls, documentos, campos):
+        indice = cls(campos)
+        for doc in documentos:
+            id_doc = str(doc["_id"])
+            indice.terminos.extend((t, c, id_doc) for t, c in indice._registrar(id_doc, doc))
+        indice.terminos.sort()
+        return indice
+
+    def _registrar(self, id_doc, doc):
+        self.docs[id_doc] = {c: doc[c] for c in self.devolver if c in doc}
+        terminos = list(dict.fromkeys(t for c in self.buscar_en if doc.get(c) for t in _terminos(doc[c])))
+        for palabra in {t for t, _ in terminos if " " not in t}:
+            if not self.palabras[palabra]:
+                for trigrama in _trigramas(palabra):
+                    self.trigramas.setdefault(trigrama, set()).add(palabra)
+            self.palabras[palabra] += 1
+        self._por_id[id_doc] = terminos
+        return terminos
+
+    def agregar(self, id_doc, doc):
+        self.quitar(id_doc)
+        for termino, completo in self._registrar(id_doc, doc):
+            bisect.insort(self.terminos, (termino, completo, id_doc))
+
+    def quitar(self, id_doc):
+        terminos = self._por_id.pop(id_doc, ())
+        self.docs.pop(id_doc, None)
+        for termino, completo in terminos:
+            i = bisect.bisect_left(self.terminos, (termino, completo, id_doc))
+            if i < len(self.terminos) and self.terminos[i] == (termino, completo, id_doc):
+                del self.terminos[i]
+        for palabra in {t for t, _ in terminos if " " not in t}:
+            self.palabras[palabra] -= 1
+            if self.palabras[palabra] <= 0:
+                del self.palabras[palabra]
+                for trigrama in _trigramas(palabra):
+                    self.trigramas.get(trigrama, set()).discard(palabra)
+
+    def aplicar(self, accion, id_doc, cambios=None):
+        if accion == "eliminar":
+            self.quitar(id_doc)
+            return
+        relevantes = {k: v for k, v in cambios.items() if k in self.buscar_en or k in self.devolver}
+        if relevantes:
+            self.agregar(id_doc, {**self.docs.get(id_doc, {}), **relevantes})
+
+    def buscar(self, consulta, k):
+        """
+        Puntaje (menor es mejor): 0 valor exacto, 1 prefijo del valor o palabra
+        exacta, 2 prefijo de una palabra. Con menos de k resultados se corrigen
+        las palabras de la consulta que no aparecen en el índice y se vuelve a
+        buscar (puntaje 3..4 según la similitud).
+        """
+        if not consulta:
+            return []
+        puntajes = self._por_prefijo(consulta, 0)
+        if len(puntajes) < k:
+            corregida, similitud = self._corregir(consulta)
+            if corregida != consulta and similitud >= SIMILITUD_MINIMA:
+                for id_doc, puntaje in self._por_prefijo(corregida, 4 - similitud).items():
+                    puntajes.setdefault(id_doc, puntaje)
+
+        def orden(par):
+            id_doc, puntaje = par
+            etiqueta = str(self.docs[id_doc].get(self.buscar_en[0], ""))
+            return (puntaje, len(etiqueta), etiqueta, id_doc)
+
+        return [{"_id": id_doc, **self.docs[id_doc]} for id_doc, _ in heapq.nsmallest(k, puntajes.items(), key=orden)]
+
+    def _por_prefijo(self, consulta, base):
+        puntajes = {}
+        inicio = bisect.bisect_left(self.terminos, (consulta,))
+        for termino, completo, id_doc in self.terminos[inicio:inicio + ESCANEO_MAXIMO]:
+            if not termino.startswith(consulta):
+                break
+            puntaje = base + (termino != consulta) + (not completo)
+            if puntaje < puntajes.get(id_doc, base + 3):
+                puntajes[id_doc] = puntaje
+        return puntajes
+
+    def _es_prefijo(self, palabra):
+        i = bisect.bisect_left(self.terminos, (palabra,))
+        return i < len(self.terminos) and self.terminos[i][0].startswith(palabra)
+
+    def _corregir(self, consulta):
+        # Reemplaza cada palabra que no es prefijo de ningún término por la palabra
+        # del vocabulario más parecida. Retorna (consulta corregida, peor similitud).
+        corregidas, peor = [], 1.0
+        for palabra in consulta.split(" "):
+            if self._es_prefijo(palabra):
+                corregidas.append(palabra)
+                continue
+            conteo = Counter()
+            for trigrama in _trigramas(palabra):
+                conteo.update(self.trigramas.get(trigrama, ()))
+            mejor, similitud = palabra, 0.0
+            for candidata, _ in conteo.most_common(CANDIDATOS_APROXIMADOS):
+                # Completa o como prefijo: la última palabra puede estar a medio escribir
+                parecido = max(
+                    SequenceMatcher(None, palabra, candidata).ratio(),
+                    SequenceMatcher(None, palabra, candidata[:len(palabra)]).ratio(),
+                )
+                if (parecido, self.palabras[candidata]) > (similitud, self.palabras.get(mejor, 0)):
+                    mejor, similitud = candidata, parecido
+            corregidas.append(mejor)
+            peor = min(peor, similitud)
+        return " ".join(corregidas), peor
+
+
+class SearchIndex:
+    """
+    Índices de búsqueda en memoria por colección (uno por proceso), para el
+    autocompletado: prefijo con bisect y un vocabulario con trigramas para corregir
+    errores de tipeo.
+
+    Se construye con la primera búsqueda (o al iniciar, con SEARCH_WARMUP=1) y se
+    mantiene al día con las escrituras de este proceso (actualizar / eliminar desde
+    los modelos). Las escrituras de otros procesos se detectan por la versión de la
+    colección en report_cache: si avanzó sin pasar por este proceso, o si el índice
+    tiene más de edad_maxima segundos (cambios hechos por fuera de la API), se
+    reconstruye en segundo plano mientras se sigue respondiendo con el anterior.
+    """
+
+    def __init__(self, edad_maxima=300, intervalo_comprobacion=1.0):
+        self.edad_maxima = edad_maxima
+        self.intervalo_comprobacion = intervalo_comprobacion
+        self._indices = {}
+        self._versiones = {}
+        self._construido = {}
+        self._comprobado = {}
+        self._pendientes = {}
+        self._construccion = {c: threading.Lock() for c in CAMPOS_BUSQUEDA}
+        self._lock = threading.Lock()
+        report_cache.suscribir(self._al_invalidar)
+
+    def configurar(self, edad_maxima=None, intervalo_comprobacion=None, precargar=False):
+        if edad_maxima is not None:
+            self.edad_maxima = edad_maxima
+        if intervalo_comprobacion is not None:
+            self.intervalo_comprobacion = intervalo_comprobacion
+        if precargar:
+            threading.Thread(target=self._precargar, name="search-warmup", daemon=True).start()
+
+    def _precargar(self):
+        for coleccion in CAMPOS_BUSQUEDA:
+            try:
+                self._reconstruir(coleccion)
+            except Exception as e:
+                print("SearchIndex precarga error:", coleccion, e)
+
+    # ---- escrituras ----
+
+    def _al_invalidar(self, coleccion, version):
+        # Una versión consecutiva es una escritura de este proceso, que el modelo aplica
+        # con actualizar()/eliminar(). Si no es consecutiva, se reconstruye al buscar.
+        with self._lock:
+            if coleccion in self._versiones and version == self._versiones[coleccion] + 1:
+                self._versiones[coleccion] = version
+
+    def actualizar(self, coleccion, id_doc, cambios):
+        self._aplicar(coleccion, ("actualizar", str(id_doc), cambios))
+
+    def eliminar(self, coleccion, id_doc):
+        self._aplicar(coleccion, ("eliminar", str(id_doc)))
+
+    def _aplicar(self, coleccion, cambio):
+        with self._lock:
+            if coleccion in self._pendientes:
+                self._pendientes[coleccion].append(cambio)
+            if coleccion in self._indices:
+                self._indices[coleccion].aplicar(*cambio)
+
+    # ---- búsqueda ----
+
+    def buscar(self, coleccion, consulta, k=LIMITE_POR_DEFECTO):
+        indice = self._vigente(coleccion)
+        with self._lock:
+            return indice.buscar(normalizar(consulta), k)
+
+    def _vigente(self, coleccion):
+        ahora = time.monotonic()
+        with self._lock:
+            indice = self._indices.get(coleccion)
+            comprobar = ahora - self._comprobado.get(coleccion, 0) >= self.intervalo_comprobacion
+            if comprobar:
+                self._comprobado[coleccion] = ahora
+        if indice is None:
+            return self._reconstruir(coleccion)
+        if comprobar:
+            vencido = ahora - self._construido[coleccion] >= self.edad_maxima
+            if vencido or report_cache.version(coleccion) != self._versiones[coleccion]:
+                threading.Thread(
+                    target=self._reconstruir_en_segundo_plano, args=(coleccion,), name="search-rebuild", daemon=True
+                ).start()
+        return indice
+
+    def _reconstruir_en_segundo_plano(self, coleccion):
+        try:
+            self._reconstruir(coleccion, esperar=False)
+        except Exception as e:
+            print("SearchIndex reconstrucción error:", coleccion, e)
+
+    def _reconstruir(self, coleccion, esperar=True):
+        # Una reconstrucción a la vez por colección. Las escrituras que llegan mientras
+        # se lee la base se aplican también sobre el índice nuevo antes de reemplazar al anterior.
+        construccion = self._construccion[coleccion]
+        if not construccion.acquire(blocking=esperar):
+            return self._indices.get(coleccion)
+        try:
+            if esperar and coleccion in self._indices:
+                return self._indices[coleccion]
+            with self._lock:
+                self._pendientes[coleccion] = []
+            version = report_cache.version(coleccion)
+            campos = CAMPOS_BUSQUEDA[coleccion]
+            proyeccion = dict.fromkeys(campos["buscar"] + campos["devolver"], 1)
+            try:
+                indice = _IndiceColeccion.construir(mongo.db[coleccion].find({}, proyeccion), campos)
+            except Exception:
+                with self._lock:
+                    self._pendientes.pop(coleccion, None)
+                raise
+            with self._lock:
+                for cambio in self._pendientes.pop(coleccion):
+                    indice.aplicar(*cambio)
+                self._indices[coleccion] = indice
+                self._versiones[coleccion] = version
+                self._construido[coleccion] = time.monotonic()
+            return indice
+        finally:
+            construccion.release()
+
+
+search_index = SearchIndex()
@@ -1,30 +1,53 @@
-from bson.objectid import ObjectId
 from app.index import mongo
+from app.utils.cache import report_cache, document_cache
+from app.models.search import search_index
+from app.utils.ids import nuevo_id, filtro_por_id
+from app.utils.pagination import paginar, orden_find
+from app.utils.export import exportar as exportar_coleccion
+from app.utils.bulk import ejecutar_bulk
 
 class UsersModel:
+    # Sin fields explícitos no se devuelven la contraseña ni el historial de pedidos (crece sin límite)
+    PROYECCION = {"password": 0, "orders": 0}
+    # Columnas del CSV de exportación (sin fields)
+    COLUMNAS_CSV = ["_id", "name", "email", "address"]
+
+    @staticmethod
+    def obtener_todos(proyeccion=None, filtro=None, orden=None):
+        cursor = mongo.db.users.find(filtro or {}, proyeccion or UsersModel.PROYECCION)
+        return list(cursor.sort(orden_find(orden)) if orden else cursor)
+
+    @staticmethod
+    def obtener_pagina(limit, after=None, con_total=False, proyeccion=None, filtro=None, orden=None):
+        return paginar(mongo.db.users, limit, after, con_total, proyeccion or UsersModel.PROYECCION, filtro, orden)
+
+    @staticmethod
+    def exportar(formato, batch_size, campos=None, filtro=None):
+        return exportar_coleccion(
+            mongo.db.users, formato, batch_size, UsersModel.COLUMNAS_CSV, campos, filtro, UsersModel.PROYECCION
+        )
+
     @staticmethod
-    def obtener_todos():
-        users_cursor = mongo.db.users.find()
-        users = []
-        for user in users_cursor:
-            user["_id"] = str(user["_id"])
-            users.append(user)
-        return users
+    def bulk(operaciones, batch_size):
+        return ejecutar_bulk(mongo.db.users, "users", operaciones, batch_size, search_index)[0]
 
     @staticmethod
-    def obtener_por_id(id):
+    def obtener_por_id(id, proyeccion=None):
         try:
-            user = mongo.db.users.find_one({"_id": ObjectId(id)})
-            if user:
-                user["_id"] = str(user["_id"])
-            return user
+            proyeccion = proyeccion or UsersModel.PROYECCION
+            return document_cache.obtener(
+                "users", id, proyeccion, lambda: mongo.db.users.find_one(filtro_por_id(id), proyeccion)
+            )
         except:
             return None
 
     @staticmethod
     def crear(data):
         try:
+            data.setdefault("_id", nuevo_id())
             result = mongo.db.users.insert_one(data)
+            report_cache.invalidar("users")
+            search_index.actualizar("users", result.inserted_id, data)
             return str(result.inserted_id)
         except:
             return None
@@ -32,7 +55,11 @@ class UsersModel:
     @staticmethod
     def actualizar(id, data):
         try:
-            result = mongo.db.users.update_one({"_id": ObjectId(id)}, {"$set": data})
+            result = mongo.db.users.update_one(filtro_por_id(id), {"$set": data})
+            if result.modified_count:
+                report_cache.invalidar("users")
+                document_cache.invalidar("users", id)
+                search_index.actualizar("users", id, data)
             return result.modified_count
         except:
             return -1
@@ -40,7 +67,11 @@ class UsersModel:
     @staticmethod
     def eliminar(id):
         try:
-            result = mongo.db.users.delete_one({"_id": ObjectId(id)})
+            result = mongo.db.users.delete_one(filtro_por_id(id))
+            if result.deleted_count:
+                report_cache.invalidar("users")
+                document_cache.invalidar("users", id)
+                search_index.eliminar("users", id)
             return result.deleted_count
         except:
             return -1
@@ -0,0 +1,167 @@
+# api/v1/app/utils/bulk.py
+import os
+
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from .cache import report_cache, document_cache
+from .ids import nuevo_id, filtro_por_id
+
+TIPOS = ("upserts", "patches", "deletes")
+
+
+class LoteDemasiadoGrande(ValueError):
+    pass
+
+
+def limites_bulk():
+    # BULK_MAX_ITEMS: operaciones por petición | BULK_BATCH_SIZE: operaciones por bulk_write
+    return int(os.getenv("BULK_MAX_ITEMS", "10000")), int(os.getenv("BULK_BATCH_SIZE", "1000"))
+
+
+def leer_bulk(data, max_items):
+    """
+    Lee { "upserts": [doc, ...], "patches": [{"_id": ..., campo: valor}, ...], "deletes": [id, ...] }
+    (todas las listas son opcionales). Lanza ValueError si el cuerpo no tiene esa
+    forma y LoteDemasiadoGrande si trae más de max_items operaciones.
+    """
+    if not isinstance(data, dict) or not set(data) <= set(TIPOS):
+        raise ValueError("Cuerpo inválido")
+    operaciones = {tipo: data.get(tipo) or [] for tipo in TIPOS}
+    if not all(isinstance(lista, list) for lista in operaciones.values()):
+        raise ValueError("upserts, patches y deletes deben ser listas")
+    total = sum(len(lista) for lista in operaciones.values())
+    if not total:
+        raise ValueError("No hay operaciones")
+    if total > max_items:
+        raise LoteDemasiadoGrande(f"Máximo {max_items} operaciones por petición")
+    return operaciones
+
+
+def _campos_validos(doc):
+    # Sin operadores ni rutas: un patch solo puede hacer $set de campos de primer nivel
+    return all(isinstance(k, str) and k and not k.startswith("$") and "." not in k for k in doc)
+
+
+def _operacion(tipo, item):
+    """
+    (id, operación de bulk_write, documento nuevo o campos cambiados) de un item,
+    o ValueError con el motivo si no es válido.
+    """
+    if tipo == "upserts":
+        if not isinstance(item, dict) or not _campos_validos(item):
+            raise ValueError("Documento inválido")
+        doc = {"_id": nuevo_id(), **item}
+        return doc["_id"], ReplaceOne({"_id": doc["_id"]}, doc, upsert=True), doc
+    if tipo == "patches":
+        if not isinstance(item, dict) or not item.get("_id") or len(item) < 2 or not _campos_validos(item):
+            raise ValueError("Se requiere _id y al menos un campo")
+        campos = {k: v for k, v in item.items() if k != "_id"}
+        return item["_id"], UpdateOne(filtro_por_id(item["_id"]), {"$set": campos}), campos
+    id_doc = item.get("_id") if isinstance(item, dict) else item
+    if not isinstance(id_doc, str) or not id_doc:
+        raise ValueError("Se requiere _id")
+    return id_doc, DeleteOne(filtro_por_id(id_doc)), None
+
+
+def _filtro_ids(ids):
+    # Un solo $in con los _id del lote, también como ObjectId (igual que filtro_por_id)
+    valores = []
+    for id_doc in ids:
+        filtro = filtro_por_id(id_doc)["_id"]
+        valores.extend(filtro["$in"] if isinstance(filtro, dict) else [filtro])
+    return {"_id": {"$in": valores}}
+
+
+def ejecutar_bulk(coleccion, nombre, operaciones, batch_size, indice_busqueda=None):
+    """
+    Aplica upserts (ReplaceOne con upsert), patches ($set) y deletes en lotes de
+    batch_size con bulk_write(ordered=False): un error en un item no frena al resto.
+
+    Antes de cada lote se leen con un solo $in los documentos que toca, para saber
+    si cada item creó, actualizó o no encontró su documento, y para que el modelo
+    mantenga lo que depende del estado anterior (rollups).
+
+    Retorna (resultados, cambios):
+      - resultados: por tipo, una entrada por item en el orden recibido:
+        {"_id", "ok", "estado": "creado"|"actualizado"|"eliminado"} o {"_id", "ok": False, "error"}
+      - cambios: [(tipo, id, anterior, nuevo), ...] de los items aplicados
+        (nuevo es el documento completo tras el cambio; None en los deletes)
+
+    Invalida report_cache una vez por petición, document_cache por documento y,
+    si se pasa indice_busqueda, lo actualiza.
+    """
+    resultados = {tipo: [None] * len(lista) for tipo, lista in operaciones.items()}
+    pendientes = []
+    vistos = set()
+    for tipo in TIPOS:
+        for i, item in enumerate(operaciones[tipo]):
+            try:
+                id_doc, operacion, nuevo = _operacion(tipo, item)
+            except ValueError as e:
+                resultados[tipo][i] = {"_id": item.get("_id") if isinstance(item, dict) else None, "ok": False, "error": str(e)}
+                continue
+            # Con ordered=False el orden de aplicación no está garantizado: un _id por petición
+            if str(id_doc) in vistos:
+                resultados[tipo][i] = {"_id": id_doc, "ok": False, "error": "_id repetido en la petición"}
+                continue
+            vistos.add(str(id_doc))
+            pendientes.append((tipo, i, id_doc, operacion, nuevo))
+
+    cambios = []
+    for inicio in range(0, len(pendientes), batch_size):
+        lote = pendientes[inicio:inicio + batch_size]
+        errores = {}
+        try:
+            anteriores = {str(d["_id"]): d for d in coleccion.find(_filtro_ids([p[2] for p in lote]))}
+            coleccion.bulk_write([p[3] for p in lote], ordered=False)
+        except BulkWriteError as e:
+            # index es la posición dentro del lote enviado
+            errores = {error["index"]: error.get("errmsg", "Error de escritura") for error in e.details.get("writeErrors", [])}
+        except PyMongoError as e:
+            print("ejecutar_bulk error:", nombre, e)
+            errores = dict.fromkeys(range(len(lote)), "Error de base de datos")
+            anteriores = {}
+
+        for j, (tipo, i, id_doc, _, nuevo) in enumerate(lote):
+            anterior = anteriores.get(str(id_doc))
+            if tipo == "upserts" and anterior is not None and anterior["_id"] != id_doc:
+                anterior = None  # ReplaceOne busca el _id exacto: un ObjectId antiguo no se reemplaza
+            if j in errores:
+                resultados[tipo][i] = {"_id": id_doc, "ok": False, "error": errores[j]}
+                continue
+            if tipo != "upserts" and anterior is None:
+                resultados[tipo][i] = {"_id": id_doc, "ok": False, "error": "No encontrado"}
+                continue
+            estado = "eliminado" if tipo == "deletes" else "actualizado" if anterior else "creado"
+            resultados[tipo][i] = {"_id": id_doc, "ok": True, "estado": estado}
+            if indice_busqueda is not None:
+                _actualizar_indice(indice_busqueda, nombre, tipo, anterior, nuevo)
+            cambios.append((tipo, id_doc, anterior, {**anterior, **nuevo} if tipo == "patches" else nuevo))
+
+    if cambios:
+        report_cache.invalidar(nombre)
+        document_cache.invalidar_varios(nombre, [c[1] for c in cambios])
+    return resultados, cambios
+
+
+def _actualizar_indice(indice, nombre, tipo, anterior, nuevo):
+    # Los patches pasan solo los campos cambiados; un upsert reemplaza el documento entero
+    if tipo == "patches":
+        indice.actualizar(nombre, anterior["_id"], nuevo)
+        return
+    if anterior is not None:
+        indice.eliminar(nombre, anterior["_id"])
+    if nuevo is not None:
+        indice.actualizar(nombre, nuevo["_id"], nuevo)
+
+
+def respuesta_bulk(resultados):
+    """
+    Cuerpo y código de la respuesta: 200 si todos los items se aplicaron, 207 si
+    solo algunos (cada item trae su resultado).
+    """
+    aplicados = sum(1 for lista in resultados.values() for r in lista if r["ok"])
+    total = sum(len(lista) for lista in resultados.values())
+    cuerpo = {"aplicados": aplicados, "fallidos": total - aplicados, **resultados}
+    return cuerpo, 200 if aplicados == total else 207
@@ -0,0 +1,480 @@
+# api/v1/app/utils/cache.py
+import hashlib
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, jsonify, make_response, request
+from pymongo import CursorType, ReturnDocument
+from pymongo.errors import CollectionInvalid
+from werkzeug.utils import import_string
+
+from .json_provider import codificar
+from .metrics import EVENTOS_CACHE_DOCUMENTOS
+
+
+class CacheBackend(ABC):
+    """
+    Interfaz de almacenamiento de la caché. Para compartir la caché entre
+    procesos (varios workers) se implementa con un almacén común (p. ej. Redis)
+    y se configura con REPORT_CACHE_BACKEND="modulo:Clase".
+      - get / set / delete: entradas con TTL en segundos
+      - version / incr: contadores de versión por colección (no deben expirar)
+      - versiones: varias versiones de una vez (por defecto, version() de cada una)
+      - id: identifica el almacén; dos procesos con el mismo id ven las mismas versiones
+    """
+    id = "compartido"
+
+    @abstractmethod
+    def get(self, clave):
+        """Valor guardado o None si no existe o expiró."""
+
+    @abstractmethod
+    def set(self, clave, valor, ttl):
+        """Guarda valor por ttl segundos (sin expiración si ttl es 0 o None)."""
+
+    @abstractmethod
+    def delete(self, clave):
+        """Quita la entrada si existe."""
+
+    @abstractmethod
+    def version(self, clave):
+        """Versión actual del contador (0 si nunca se incrementó)."""
+
+    @abstractmethod
+    def incr(self, clave):
+        """Incrementa el contador y retorna la nueva versión."""
+
+    def versiones(self, claves):
+        return [self.version(c) for c in claves]
+
+
+class LRUCache(CacheBackend):
+    """
+    Caché en memoria del proceso: LRU acotada a max_items con expiración por TTL.
+    Los contadores de versión se guardan aparte y nunca se desalojan.
+    """
+
+    def __init__(self, max_items=256):
+        self.max_items = max_items
+        self.id = uuid.uuid4().hex  # las versiones solo valen dentro de este proceso
+        self._entradas = OrderedDict()
+        self._versiones = {}
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            expira, valor = entrada
+            if expira is not None and expira < time.monotonic():
+                del self._entradas[clave]
+                return None
+            self._entradas.move_to_end(clave)
+            return valor
+
+    def set(self, clave, valor, ttl):
+        with self._lock:
+            expira = time.monotonic() + ttl if ttl else None
+            self._entradas[clave] = (expira, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_items:
+                self._entradas.popitem(last=False)
+
+    def delete(self, clave):
+        with self._lock:
+            self._entradas.pop(clave, None)
+
+    def version(self, clave):
+        return self._versiones.get(clave, 0)
+
+    def incr(self, clave):
+        with self._lock:
+            self._versiones[clave] = self._versiones.get(clave, 0) + 1
+            return self._versiones[clave]
+
+
+class MongoVersionBackend(LRUCache):
+    """
+    Para varios workers: las entradas siguen en la LRU de cada proceso, pero los
+    contadores de versión se guardan en la colección cache_versions. Una escritura
+    en cualquier worker invalida los reportes y los ETag de listados de todos.
+    Cuesta una lectura por _id a MongoDB por petición cacheada. db es la base
+    (síncrona) a usar; por defecto la de Flask-PyMongo.
+    """
+
+    COLECCION = "cache_versions"
+    id = "mongo"
+
+    def __init__(self, max_items=256, db=None):
+        super().__init__(max_items)
+        self.id = MongoVersionBackend.id
+        self.db = db
+
+    def _coleccion(self):
+        if self.db is not None:
+            return self.db[self.COLECCION]
+        from ..index import mongo
+        return mongo.db[self.COLECCION]
+
+    def version(self, clave):
+        return self.versiones([clave])[0]
+
+    def versiones(self, claves):
+        guardadas = {d["_id"]: d["v"] for d in self._coleccion().find({"_id": {"$in": list(claves)}})}
+        return [guardadas.get(c, 0) for c in claves]
+
+    def incr(self, clave):
+        documento = self._coleccion().find_one_and_update(
+            {"_id": clave}, {"$inc": {"v": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        return documento["v"]
+
+
+class ReportCache:
+    """
+    Caché de resultados de reportes. Cada entrada depende de las versiones de las
+    colecciones que lee: una escritura en sales/clothing/brands incrementa la versión
+    (invalidar) y las entradas anteriores dejan de usarse. Las mismas versiones dan
+    los ETag de los listados (listado_condicional). El TTL acota cuánto puede
+    vivir un resultado si la base se modifica por fuera de la API.
+    """
+
+    def __init__(self, backend=None, ttl=60):
+        self.backend = backend or LRUCache()
+        self.ttl = ttl
+        self._inicio = time.time()
+        self._modificado = {}
+        self._suscriptores = []
+
+    def configurar(self, backend=None, ttl=None):
+        if backend is not None:
+            self.backend = backend
+        if ttl is not None:
+            self.ttl = ttl
+
+    def suscribir(self, funcion):
+        # funcion(coleccion, version) se llama tras cada invalidar() de este proceso
+        self._suscriptores.append(funcion)
+
+    def invalidar(self, coleccion):
+        version = self.backend.incr(f"version:{coleccion}")
+        self._modificado[coleccion] = time.time()
+        for funcion in self._suscriptores:
+            funcion(coleccion, version)
+
+    def version(self, coleccion):
+        return self.backend.version(f"version:{coleccion}")
+
+    def validadores(self, *colecciones):
+        """
+        (etag, last_modified) de un listado sin consultar MongoDB. Cambian con cada
+        escritura de la API en las colecciones y, como mucho, cada ttl segundos (para
+        que se vean también los cambios hechos por fuera de la API).
+        """
+        ventana = int(time.time() // self.ttl) * self.ttl if self.ttl else 0
+        token = f"{self._token_versiones(colecciones)}:{ventana}"
+        modificado = max([self._modificado.get(c, self._inicio) for c in colecciones] + [ventana])
+        etag = hashlib.sha1(token.encode("utf-8")).hexdigest()[:20]
+        return etag, datetime.fromtimestamp(int(modificado), timezone.utc)
+
+    def _token_versiones(self, colecciones):
+        versiones = self.backend.versiones([f"version:{c}" for c in colecciones])
+        return self.backend.id + ":" + ",".join(str(v) for v in versiones)
+
+    def obtener(self, clave, calcular, colecciones):
+        """
+        Retorna (valor, etag). Solo llama a calcular() si no hay entrada vigente
+        para las versiones actuales de las colecciones.
+        """
+        clave_entrada = f"{clave}|{self._token_versiones(colecciones)}"
+        entrada = self.backend.get(clave_entrada)
+        if entrada is not None:
+            return entrada
+        return self._guardar(clave_entrada, calcular())
+
+    async def obtener_async(self, clave, calcular, colecciones):
+        # Igual que obtener(), con calcular() asíncrono (variante ASGI)
+        clave_entrada = f"{clave}|{self._token_versiones(colecciones)}"
+        entrada = self.backend.get(clave_entrada)
+        if entrada is not None:
+            return entrada
+        return self._guardar(clave_entrada, await calcular())
+
+    def _guardar(self, clave_entrada, valor):
+        contenido = codificar(valor, ordenar=True)
+        entrada = (valor, hashlib.sha1(contenido).hexdigest())
+        self.backend.set(clave_entrada, entrada, self.ttl)
+        return entrada
+
+
+report_cache = ReportCache()
+
+
+class DocumentCache:
+    """
+    Caché de lectura (read-through) delante de obtener_por_id: LRU por proceso
+    acotada a max_items, con expiración por TTL. La clave incluye la proyección.
+    Los modelos llaman a invalidar() en actualizar/eliminar (y el checkout al
+    descontar stock). Con varios procesos, un canal reparte las invalidaciones:
+      - publicar(coleccion, id): avisa a los demás procesos
+      - publicar_varios(coleccion, ids) (opcional): un solo aviso para varios _id
+      - escuchar(funcion): llama a funcion(coleccion, id) con los avisos de los demás
+    (MongoInvalidationChannel, o p. ej. Redis pub/sub con DOCUMENT_CACHE_INVALIDATION="modulo:Clase").
+    El TTL acota cuánto puede vivir un documento cambiado por fuera de la API.
+    """
+
+    EVENTOS = ("hit", "miss", "eviction", "invalidation")
+
+    def __init__(self, max_items=10000, ttl=30):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.canal = None
+        self._entradas = OrderedDict()   # (coleccion, id, proyeccion) -> (expira, documento)
+        self._claves = {}                # (coleccion, id) -> claves de sus proyecciones
+        self._generacion = Counter()     # coleccion -> invalidaciones
+        self._contadores = Counter()     # (coleccion, evento) -> n
+        self._lock = threading.Lock()
+
+    def configurar(self, max_items=None, ttl=None, canal=None):
+        if max_items is not None:
+            self.max_items = max_items
+        if ttl is not None:
+            self.ttl = ttl
+        if canal is not None:
+            self.canal = canal
+            canal.escuchar(self._quitar)
+
+    def _contar(self, coleccion, evento):
+        self._contadores[(coleccion, evento)] += 1
+        EVENTOS_CACHE_DOCUMENTOS.labels(coleccion, evento).inc()
+
+    def obtener(self, coleccion, id_documento, proyeccion, cargar):
+        """
+        Retorna el documento en caché o el de cargar(). Los documentos se comparten
+        entre peticiones: no deben modificarse.
+        """
+        if not self.max_items:
+            return cargar()
+        clave = (coleccion, str(id_documento), tuple(sorted(proyeccion.items())) if proyeccion else ())
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and (entrada[0] is None or entrada[0] >= time.monotonic()):
+                self._entradas.move_to_end(clave)
+                self._contar(coleccion, "hit")
+                return entrada[1]
+            self._contar(coleccion, "miss")
+            generacion = self._generacion[coleccion]
+
+        documento = cargar()
+        if documento is None:
+            return None
+        with self._lock:
+            # Si hubo una invalidación mientras se leía, el documento leído puede ser viejo
+            if self._generacion[coleccion] != generacion:
+                return documento
+            self._entradas[clave] = (time.monotonic() + self.ttl if self.ttl else None, documento)
+            self._entradas.move_to_end(clave)
+            self._claves.setdefault(clave[:2], set()).add(clave)
+            while len(self._entradas) > self.max_items:
+                desalojada, _ = self._entradas.popitem(last=False)
+                self._claves.get(desalojada[:2], set()).discard(desalojada)
+                self._contar(desalojada[0], "eviction")
+        return documento
+
+    def invalidar(self, coleccion, id_documento):
+        self._quitar(coleccion, id_documento)
+        if self.canal is not None:
+            try:
+                self.canal.publicar(coleccion, str(id_documento))
+            except Exception as e:
+                print("DocumentCache.invalidar canal error:", e)
+
+    def invalidar_varios(self, coleccion, ids):
+        # Escrituras por lotes (/bulk): un aviso al canal para todos los _id si el canal lo soporta
+        ids = [str(id_documento) for id_documento in ids]
+        for id_documento in ids:
+            self._quitar(coleccion, id_documento)
+        if self.canal is None or not ids:
+            return
+        try:
+            if hasattr(self.canal, "publicar_varios"):
+                self.canal.publicar_varios(coleccion, ids)
+            else:
+                for id_documento in ids:
+                    self.canal.publicar(coleccion, id_documento)
+        except Exception as e:
+            print("DocumentCache.invalidar_varios canal error:", e)
+
+    def _quitar(self, coleccion, id_documento):
+        with self._lock:
+            self._generacion[coleccion] += 1
+            for clave in self._claves.pop((coleccion, str(id_documento)), ()):
+                self._entradas.pop(clave, None)
+            self._contar(coleccion, "invalidation")
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._claves.clear()
+            for coleccion in list(self._generacion):
+                self._generacion[coleccion] += 1
+
+    def estadisticas(self):
+        with self._lock:
+            por_coleccion = {}
+            for (coleccion, evento), n in self._contadores.items():
+                por_coleccion.setdefault(coleccion, dict.fromkeys(self.EVENTOS, 0))[evento] = n
+            return {
+                "items": len(self._entradas),
+                "max_items": self.max_items,
+                "ttl": self.ttl,
+                "canal": type(self.canal).__name__ if self.canal else None,
+                "colecciones": por_coleccion,
+            }
+
+
+class MongoInvalidationChannel:
+    """
+    Canal de invalidaciones entre procesos sobre una colección capped de MongoDB:
+    publicar() inserta un aviso y cada proceso lo lee con un cursor tailable desde
+    un hilo propio. Funciona sin replica set. Ignora sus propios avisos.
+    db es la base (síncrona) a usar; por defecto la de Flask-PyMongo.
+    """
+
+    COLECCION = "cache_invalidations"
+    TAMANO = 1024 * 1024  # bytes; los avisos viejos se descartan solos
+    IDS_POR_AVISO = 1000
+
+    def __init__(self, db=None):
+        self.origen = uuid.uuid4().hex
+        self.db = db
+        self._hilo = None
+
+    def _coleccion(self):
+        if self.db is not None:
+            return self.db[self.COLECCION]
+        from ..index import mongo
+        return mongo.db[self.COLECCION]
+
+    def publicar(self, coleccion, id_documento):
+        self._coleccion().insert_one({"c": coleccion, "id": id_documento, "o": self.origen})
+
+    def publicar_varios(self, coleccion, ids):
+        self._coleccion().insert_many([
+            {"c": coleccion, "ids": ids[i:i + self.IDS_POR_AVISO], "o": self.origen}
+            for i in range(0, len(ids), self.IDS_POR_AVISO)
+        ])
+
+    def escuchar(self, funcion):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._seguir, args=(funcion,), name="cache-invalidations", daemon=True)
+            self._hilo.start()
+
+    def _seguir(self, funcion):
+        ultimo = None
+        while True:
+            try:
+                avisos = self._coleccion()
+                if ultimo is None:
+                    try:
+                        avisos.database.create_collection(self.COLECCION, capped=True, size=self.TAMANO)
+                    except CollectionInvalid:
+                        pass  # ya existe
+                    reciente = avisos.find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+                    ultimo = reciente["_id"] if reciente else False
+                filtro = {"_id": {"$gt": ultimo}} if ultimo else {}
+                cursor = avisos.find(filtro, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    for aviso in cursor:
+                        ultimo = aviso["_id"]
+                        if aviso.get("o") != self.origen:
+                            for id_documento in aviso.get("ids") or [aviso["id"]]:
+                                funcion(aviso["c"], id_documento)
+            except Exception as e:
+                print("MongoInvalidationChannel error:", e)
+            time.sleep(1)
+
+
+document_cache = DocumentCache()
+
+
+def _instanciar(ruta, db):
+    # Las clases que guardan en MongoDB reciben db si la app no usa Flask-PyMongo (variante async)
+    clase = import_string(ruta)
+    if db is not None and issubclass(clase, (MongoVersionBackend, MongoInvalidationChannel)):
+        return clase(db=db)
+    return clase()
+
+
+def configurar_cache(db=None):
+    # REPORT_CACHE_BACKEND="modulo:Clase" | REPORT_CACHE_MAX_ITEMS | REPORT_CACHE_TTL
+    backend = os.getenv("REPORT_CACHE_BACKEND")
+    report_cache.configurar(
+        backend=_instanciar(backend, db) if backend else LRUCache(int(os.getenv("REPORT_CACHE_MAX_ITEMS", "256"))),
+        ttl=int(os.getenv("REPORT_CACHE_TTL", "60"))
+    )
+    # DOCUMENT_CACHE_MAX_ITEMS (0 la desactiva) | DOCUMENT_CACHE_TTL | DOCUMENT_CACHE_INVALIDATION="modulo:Clase"
+    canal = os.getenv("DOCUMENT_CACHE_INVALIDATION")
+    document_cache.configurar(
+        max_items=int(os.getenv("DOCUMENT_CACHE_MAX_ITEMS", "10000")),
+        ttl=int(os.getenv("DOCUMENT_CACHE_TTL", "30")),
+        canal=_instanciar(canal, db) if canal else None
+    )
+
+# Colecciones que leen los reportes
+COLECCIONES_REPORTES = ("sales", "clothing", "brands")
+
+# Versión que cambia solo con ediciones y borrados de ventas (las altas no la tocan):
+# la analítica la compara para saber si puede extender su copia de sales
+EDICIONES_VENTAS = "sales_edits"
+
+
+def respuesta_reporte(clave, calcular):
+    """
+    Responde un reporte usando la caché: si el cliente envía If-None-Match con el
+    ETag vigente se contesta 304 sin consultar MongoDB.
+    """
+    data, etag = report_cache.obtener(clave, calcular, COLECCIONES_REPORTES)
+    if request.if_none_match.contains(etag):
+        respuesta = Response(status=304)
+    else:
+        respuesta = jsonify(data)
+    respuesta.set_etag(etag)
+    respuesta.headers["Cache-Control"] = "no-cache"
+    return respuesta
+
+
+def listado_condicional(coleccion, relacionadas=None):
+    """
+    GET condicional para los listados: ETag débil y Last-Modified a partir de la
+    versión de la colección. Si el cliente ya tiene la versión vigente se responde
+    304 sin ejecutar la consulta. Los validadores se calculan antes de consultar:
+    si una escritura ocurre en medio, el cliente queda con un ETag viejo y la
+    próxima petición trae los datos de nuevo (nunca un 304 con datos viejos).
+    relacionadas(request.args) agrega las colecciones que también lee la
+    petición (p. ej. las de ?expand=).
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            colecciones = [coleccion] + (relacionadas(request.args) if relacionadas else [])
+            etag, modificado = report_cache.validadores(*dict.fromkeys(colecciones))
+            if request.if_none_match:
+                vigente = request.if_none_match.contains_weak(etag)
+            else:
+                vigente = request.if_modified_since is not None and request.if_modified_since >= modificado
+            respuesta = Response(status=304) if vigente else make_response(vista(*args, **kwargs))
+            if respuesta.status_code in (200, 304):
+                respuesta.set_etag(etag, weak=True)
+                respuesta.last_modified = modificado
+                respuesta.headers["Cache-Control"] = "no-cache"
+            return respuesta
+        return envoltura
+    return decorador
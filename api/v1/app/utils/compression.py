@@ -0,0 +1,60 @@
+# api/v1/app/utils/compression.py
+import gzip
+import os
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin el paquete solo se ofrece gzip
+    brotli = None
+
+TIPOS_COMPRIMIBLES = ("application/json", "text/csv", "text/plain", "application/x-ndjson")
+
+# Niveles bajos: en respuestas de API importa más la CPU por petición que el último byte
+NIVEL_GZIP = 5
+CALIDAD_BROTLI = 4
+
+
+def _codificacion_aceptada():
+    aceptadas = request.accept_encodings
+    if brotli is not None and aceptadas["br"]:
+        return "br"
+    if aceptadas["gzip"]:
+        return "gzip"
+    return None
+
+
+def _comprimir(respuesta, minimo):
+    if (
+        respuesta.status_code != 200
+        or respuesta.is_streamed
+        or respuesta.direct_passthrough
+        or "Content-Encoding" in respuesta.headers
+        or respuesta.mimetype not in TIPOS_COMPRIMIBLES
+    ):
+        return respuesta
+
+    respuesta.vary.add("Accept-Encoding")
+    datos = respuesta.get_data()
+    codificacion = _codificacion_aceptada()
+    if len(datos) < minimo or codificacion is None:
+        return respuesta
+
+    if codificacion == "br":
+        comprimido = brotli.compress(datos, quality=CALIDAD_BROTLI)
+    else:
+        comprimido = gzip.compress(datos, compresslevel=NIVEL_GZIP)
+    respuesta.set_data(comprimido)
+    respuesta.headers["Content-Encoding"] = codificacion
+    return respuesta
+
+
+def configurar_compresion(app):
+    """
+    Comprime con brotli o gzip (según Accept-Encoding) las respuestas JSON/CSV
+    de al menos COMPRESS_MIN_SIZE bytes (1024 por defecto). Las respuestas en
+    streaming (exportación, SSE) se envían sin comprimir.
+    """
+    minimo = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    app.after_request(lambda respuesta: _comprimir(respuesta, minimo))
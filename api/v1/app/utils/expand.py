@@ -0,0 +1,78 @@
+# api/v1/app/utils/expand.py
+from bson.objectid import ObjectId
+
+# ?expand= por colección: nombre -> (campo con el id, colección relacionada, proyección).
+# "a.b" expande b dentro del documento ya expandido en a.
+RELACIONES = {
+    "sales": {
+        "user": ("user_id", "users", {"name": 1, "email": 1}),
+        "clothing": ("clothing_id", "clothing", {"name": 1, "price": 1, "category": 1, "brand_id": 1, "in_stock": 1}),
+        "clothing.brand": ("brand_id", "brands", {"name": 1, "country": 1}),
+    },
+}
+
+# Ids por consulta $in (el listado completo sin paginar puede referenciar muchos)
+LOTE_IN = 5000
+
+
+def leer_expand(args, coleccion):
+    """
+    Lee ?expand=user,clothing.brand. Retorna las relaciones a resolver, padres
+    antes que hijos (clothing.brand incluye clothing), o [] si no se pide.
+    Lanza ValueError si alguna relación no existe.
+    """
+    if not args.get("expand"):
+        return []
+    relaciones = RELACIONES.get(coleccion, {})
+    pedidas = set()
+    for nombre in (n.strip() for n in args["expand"].split(",") if n.strip()):
+        if nombre not in relaciones:
+            raise ValueError("expand inválido")
+        partes = nombre.split(".")
+        pedidas.update(".".join(partes[:i]) for i in range(1, len(partes) + 1))
+    return sorted(pedidas, key=lambda n: (n.count("."), n))
+
+
+def colecciones_expand(args, coleccion):
+    # Colecciones que lee un ?expand= (para los validadores del GET condicional)
+    try:
+        return [RELACIONES[coleccion][n][1] for n in leer_expand(args, coleccion)]
+    except ValueError:
+        return []
+
+
+def campos_expand(coleccion, expand):
+    # Campos de la colección principal que necesita el expand (se agregan a ?fields=)
+    return {RELACIONES[coleccion][n][0] for n in expand if "." not in n}
+
+
+def expandir(db, coleccion, docs, expand):
+    """
+    Agrega a cada doc el documento relacionado con el nombre de la relación
+    (sale["user"], sale["clothing"]["brand"]; None si no existe), con una consulta
+    $in por relación para todos los docs: la cantidad de consultas no depende de
+    la cantidad de filas (sin N+1). Modifica docs y los retorna.
+    """
+    for nombre in expand:
+        campo, destino, proyeccion = RELACIONES[coleccion][nombre]
+        padre, _, clave = nombre.rpartition(".")
+        contenedores = docs if not padre else [d.get(padre) for d in docs]
+        contenedores = [c for c in contenedores if isinstance(c, dict)]
+        ids = {str(c[campo]) for c in contenedores if c.get(campo) is not None}
+        relacionados = _por_ids(db[destino], ids, proyeccion)
+        for contenedor in contenedores:
+            valor = contenedor.get(campo)
+            contenedor[clave] = relacionados.get(str(valor)) if valor is not None else None
+    return docs
+
+
+def _por_ids(coleccion, ids, proyeccion):
+    # Como filtro_por_id: también encuentra documentos antiguos con _id ObjectId
+    ids = list(ids)
+    encontrados = {}
+    for inicio in range(0, len(ids), LOTE_IN):
+        lote = ids[inicio:inicio + LOTE_IN]
+        valores = lote + [ObjectId(i) for i in lote if ObjectId.is_valid(i)]
+        for doc in coleccion.find({"_id": {"$in": valores}}, proyeccion):
+            encontrados[str(doc["_id"])] = doc
+    return encontrados
@@ -0,0 +1,105 @@
+# api/v1/app/utils/export.py
+import csv
+import io
+from datetime import datetime
+
+from flask import Response, stream_with_context
+
+from .json_provider import a_json, codificar
+
+FORMATOS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+BATCH_POR_DEFECTO = 1000
+BATCH_MAXIMO = 10000
+
+
+def leer_exportacion(args):
+    """
+    Lee ?format=ndjson|csv&batch_size=<n>&fields=a,b,c
+    Lanza ValueError si algún parámetro no es válido.
+    """
+    formato = args.get("format", "ndjson")
+    if formato not in FORMATOS:
+        raise ValueError("Formato no soportado")
+    batch_size = int(args.get("batch_size", BATCH_POR_DEFECTO))
+    if batch_size <= 0:
+        raise ValueError("batch_size debe ser mayor que 0")
+    campos = [c.strip() for c in args.get("fields", "").split(",") if c.strip()]
+    return {"formato": formato, "batch_size": min(batch_size, BATCH_MAXIMO), "campos": campos or None}
+
+
+def _celda(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, (dict, list)):
+        return codificar(valor).decode("utf-8")
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return a_json(valor)
+
+
+def _valor(doc, ruta):
+    # Valor de una ruta con puntos ("address.city"); en un arreglo, el de cada elemento como en MongoDB
+    valor = doc
+    for parte in ruta.split("."):
+        if isinstance(valor, list):
+            valor = [v[parte] for v in valor if isinstance(v, dict) and parte in v]
+        elif isinstance(valor, dict):
+            valor = valor.get(parte)
+        else:
+            return None
+    return valor
+
+
+def _filas_ndjson(cursor, batch_size):
+    bloque = []
+    for doc in cursor:
+        bloque.append(codificar(doc).decode("utf-8"))
+        if len(bloque) >= batch_size:
+            yield "\n".join(bloque) + "\n"
+            bloque = []
+    if bloque:
+        yield "\n".join(bloque) + "\n"
+
+
+def _filas_csv(cursor, batch_size, columnas):
+    # Columnas fijas: un campo que solo traen algunos documentos no corre las filas
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columnas)
+    filas = 0
+    for doc in cursor:
+        writer.writerow([_celda(_valor(doc, c)) for c in columnas])
+        filas += 1
+        if filas >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            filas = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def exportar(coleccion, formato, batch_size, columnas, campos=None, filtro=None, proyeccion=None):
+    """
+    Recorre la colección con un cursor del servidor (batch_size documentos por
+    getMore) y genera el contenido por bloques: la memoria no crece con el
+    número de filas exportadas. proyeccion se usa si no se piden campos.
+    columnas: encabezado del CSV si no se piden campos (los campos de la colección
+    que no estén ahí solo salen en NDJSON).
+    """
+    if campos:
+        proyeccion = {c: 1 for c in campos}
+        if "_id" not in campos:
+            proyeccion["_id"] = 0
+    cursor = coleccion.find(filtro or {}, proyeccion, batch_size=batch_size)
+    if formato == "csv":
+        return _filas_csv(cursor, batch_size, campos or columnas)
+    return _filas_ndjson(cursor, batch_size)
+
+
+def respuesta_exportacion(nombre, filas, formato):
+    return Response(
+        stream_with_context(filas),
+        mimetype=FORMATOS[formato],
+        headers={"Content-Disposition": f"attachment; filename={nombre}.{formato}"},
+    )
@@ -0,0 +1,78 @@
+# api/v1/app/utils/filters.py
+from datetime import datetime
+
+# Filtros y ordenamientos que aceptan los GET de cada colección. Cada combinación
+# (un filtro de igualdad + un orden) tiene su índice en app/indexes.py;
+# "flask --app run indexes verify" comprueba que así sea.
+
+# ?param=valor -> { campo: valor }
+IGUALDAD = {
+    "brands": {},
+    "clothing": {"category": "category", "brand_id": "brand_id"},
+    "sales": {"user_id": "user_id", "clothing_id": "clothing_id"},
+    "users": {"city": "address.city", "country": "address.country"},
+}
+
+# ?param=valor -> { campo: { operador: convertir(valor) } }
+RANGOS = {
+    "brands": {},
+    "clothing": {"min_price": ("price", "$gte", float), "max_price": ("price", "$lte", float)},
+    "sales": {"from": ("date", "$gte", datetime.fromisoformat), "to": ("date", "$lt", datetime.fromisoformat)},
+    "users": {},
+}
+
+# ?param=1 -> condición fija
+BANDERAS = {
+    "brands": {},
+    "clothing": {"in_stock": ("in_stock", {"$gt": 0})},
+    "sales": {},
+    "users": {},
+}
+
+# ?sort=campo | ?sort=-campo (además del orden por _id, que es el de siempre)
+ORDENES = {
+    "brands": ["name"],
+    "clothing": ["price", "name"],
+    "sales": ["date"],
+    "users": ["name"],
+}
+
+
+def leer_filtros(args, coleccion):
+    """
+    Arma el filtro de find() con los parámetros soportados por la colección.
+    Los parámetros desconocidos se ignoran (paginación, fields, id...).
+    Lanza ValueError si algún valor no se puede convertir.
+    """
+    filtro = {}
+    for parametro, campo in IGUALDAD[coleccion].items():
+        if args.get(parametro):
+            filtro[campo] = args[parametro]
+    for parametro, (campo, operador, convertir) in RANGOS[coleccion].items():
+        if args.get(parametro):
+            filtro.setdefault(campo, {})[operador] = convertir(args[parametro])
+    for parametro, (campo, condicion) in BANDERAS[coleccion].items():
+        if args.get(parametro) in ("1", "true"):
+            filtro[campo] = condicion
+    return filtro
+
+
+def leer_orden(args, coleccion, filtro=None):
+    """
+    Retorna (campo, 1 | -1) o None (orden por _id). Sin ?sort, un filtro de rango
+    ordena por su propio campo: así el rango y el orden usan el mismo índice.
+    Lanza ValueError si el campo no se puede ordenar.
+    """
+    orden = args.get("sort")
+    if not orden:
+        for campo, _, _ in RANGOS[coleccion].values():
+            if isinstance((filtro or {}).get(campo), dict):
+                return (campo, 1)
+        return None
+    direccion = -1 if orden.startswith("-") else 1
+    campo = orden.lstrip("-")
+    if campo == "_id":
+        return None if direccion == 1 else ("_id", -1)
+    if campo not in ORDENES[coleccion]:
+        raise ValueError("sort inválido")
+    return (campo, direccion)
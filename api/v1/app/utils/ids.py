@@ -0,0 +1,21 @@
+# api/v1/app/utils/ids.py
+from bson.objectid import ObjectId
+
+
+def nuevo_id():
+    """
+    Los _id se guardan siempre como string (igual que los datos sembrados en
+    DataBase/op.py, p. ej. "cloth010"), así las referencias brand_id /
+    clothing_id / user_id se pueden unir por igualdad con el índice de _id.
+    """
+    return str(ObjectId())
+
+
+def filtro_por_id(id):
+    """
+    Filtro por _id que también encuentra documentos antiguos con _id ObjectId
+    (aún no migrados con DataBase/normalize_ids.py). Ambos valores usan el índice de _id.
+    """
+    if ObjectId.is_valid(id):
+        return {"_id": {"$in": [id, ObjectId(id)]}}
+    return {"_id": id}
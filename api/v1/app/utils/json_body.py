@@ -0,0 +1,22 @@
+# api/v1/app/utils/json_body.py
+from bson import json_util
+from flask import request
+
+
+def leer_json():
+    """
+    Lee el cuerpo de la petición decodificando Extended JSON, que es el formato
+    que envía el front-end: {"$numberInt": "2"} -> 2, {"$date": {...}} -> datetime.
+    Así quantity, in_stock, price y date se guardan como tipos numéricos/fecha y
+    se pueden sumar ($inc, $sum) y filtrar por rango.
+    """
+    return decodificar_json(request.get_data(as_text=True))
+
+
+def decodificar_json(datos):
+    if not datos:
+        return None
+    try:
+        return json_util.loads(datos)
+    except ValueError:
+        return None
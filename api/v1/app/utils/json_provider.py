@@ -0,0 +1,48 @@
+# api/v1/app/utils/json_provider.py
+import orjson
+from bson import decode, json_util
+from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
+from flask.json.provider import JSONProvider
+
+# Tipos que orjson no conoce. datetime, date y los subtipos de int (Int64) los serializa orjson
+# directamente; las fechas de MongoDB vienen sin zona y se emiten como UTC ("...+00:00").
+OPCIONES = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+def a_json(valor):
+    if isinstance(valor, ObjectId):
+        return str(valor)
+    if isinstance(valor, RawBSONDocument):
+        return decode(valor.raw)
+    # Decimal128 como texto (un número JSON perdería precisión); Regex, Binary, etc. también
+    return str(valor)
+
+
+def codificar(valor, ordenar=False):
+    """
+    JSON en bytes (UTF-8) con los tipos BSON resueltos. ordenar=True da una salida
+    estable para calcular hashes (ETag).
+    """
+    return orjson.dumps(valor, default=a_json, option=OPCIONES | orjson.OPT_SORT_KEYS if ordenar else OPCIONES)
+
+
+class BSONJSONProvider(JSONProvider):
+    """
+    Reemplaza al BSONProvider de Flask-PyMongo (json_util, Extended JSON) para las
+    respuestas: ObjectId como string, fechas ISO 8601, Decimal128 como string y
+    RawBSONDocument como objeto, codificados con orjson sin pasar por str.
+    Las peticiones siguen aceptando Extended JSON ({"$date": ...}).
+    Sirve para la app Flask y para la app Quart (misma interfaz de JSONProvider).
+    """
+
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs):
+        return codificar(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return json_util.loads(s)
+
+    def response(self, *args, **kwargs):
+        return self._app.response_class(codificar(self._prepare_response_obj(args, kwargs)), mimetype=self.mimetype)
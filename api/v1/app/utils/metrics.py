@@ -0,0 +1,137 @@
+# api/v1/app/utils/metrics.py
+import os
+import time
+
+from flask import g, request
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+from pymongo import monitoring
+
+# Métricas Prometheus de la API (expuestas en GET /metrics)
+#   http_request_duration_seconds{blueprint, endpoint, method, status}
+#   http_requests_in_progress{blueprint, endpoint, method}
+#   http_response_size_bytes{blueprint, endpoint}
+#   mongodb_command_duration_seconds{command, collection}
+#   mongodb_command_failures_total{command, collection}
+#   document_cache_events_total{collection, event}   (hit | miss | eviction | invalidation)
+#   sales_ingest_events_total{event}   (aceptadas | rechazadas | insertadas | fallidas | lotes)
+# Las etiquetas usan la regla de la ruta ("/api/v1/admin/sales"), no la URL con parámetros,
+# para que la cantidad de series no crezca con cada id.
+
+DURACION_HTTP = Histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP",
+    ["blueprint", "endpoint", "method", "status"]
+)
+
+EN_CURSO_HTTP = Gauge(
+    "http_requests_in_progress", "Peticiones HTTP en curso",
+    ["blueprint", "endpoint", "method"], multiprocess_mode="livesum"
+)
+
+TAMANO_RESPUESTA = Histogram(
+    "http_response_size_bytes", "Tamaño del cuerpo de las respuestas (sin las respuestas en streaming)",
+    ["blueprint", "endpoint"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+)
+
+DURACION_MONGO = Histogram(
+    "mongodb_command_duration_seconds", "Duración de los comandos enviados a MongoDB",
+    ["command", "collection"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+FALLOS_MONGO = Counter(
+    "mongodb_command_failures_total", "Comandos de MongoDB que terminaron con error",
+    ["command", "collection"]
+)
+
+EVENTOS_CACHE_DOCUMENTOS = Counter(
+    "document_cache_events_total", "Aciertos, fallos, desalojos e invalidaciones de la caché de documentos por _id",
+    ["collection", "event"]
+)
+
+EVENTOS_INGESTA_VENTAS = Counter(
+    "sales_ingest_events_total", "Ventas aceptadas, rechazadas (cola llena), insertadas, repetidas (reintentos ya escritos), fallidas y sin confirmar del buffer de ingesta",
+    ["event"]
+)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Mide cada comando por nombre y colección. La duración la informa el driver
+    (duration_micros); del evento de inicio solo se guarda la colección, que no
+    viene en los eventos de fin.
+    """
+
+    # Comandos de handshake y monitoreo: no son consultas de la aplicación
+    IGNORADOS = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "endSessions", "buildInfo"}
+
+    def __init__(self):
+        self._colecciones = {}
+
+    def started(self, event):
+        if event.command_name in self.IGNORADOS:
+            return
+        coleccion = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            coleccion = event.command.get("collection")
+        self._colecciones[(event.connection_id, event.request_id)] = coleccion if isinstance(coleccion, str) else ""
+
+    def succeeded(self, event):
+        coleccion = self._colecciones.pop((event.connection_id, event.request_id), None)
+        if coleccion is not None:
+            DURACION_MONGO.labels(event.command_name, coleccion).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        coleccion = self._colecciones.pop((event.connection_id, event.request_id), None)
+        if coleccion is not None:
+            DURACION_MONGO.labels(event.command_name, coleccion).observe(event.duration_micros / 1e6)
+            FALLOS_MONGO.labels(event.command_name, coleccion).inc()
+
+
+mongo_metrics = MongoCommandMetrics()
+
+
+def _etiquetas():
+    regla = request.url_rule.rule if request.url_rule else "<sin_ruta>"
+    return request.blueprint or "", regla, request.method
+
+
+def _antes():
+    g.metricas = (time.perf_counter(), _etiquetas())
+    EN_CURSO_HTTP.labels(*g.metricas[1]).inc()
+
+
+def _despues(respuesta):
+    # En respuestas en streaming (export, SSE) la latencia cubre hasta el primer byte
+    if "metricas" not in g:
+        return respuesta
+    inicio, (blueprint, endpoint, metodo) = g.metricas
+    DURACION_HTTP.labels(blueprint, endpoint, metodo, str(respuesta.status_code)).observe(time.perf_counter() - inicio)
+    if not respuesta.is_streamed and respuesta.content_length is not None:
+        TAMANO_RESPUESTA.labels(blueprint, endpoint).observe(respuesta.content_length)
+    return respuesta
+
+
+def _al_terminar(error=None):
+    # teardown corre siempre, también si la vista lanzó una excepción
+    metricas = g.pop("metricas", None)
+    if metricas:
+        EN_CURSO_HTTP.labels(*metricas[1]).dec()
+
+
+def configurar_metricas(app):
+    app.before_request(_antes)
+    app.after_request(_despues)
+    app.teardown_request(_al_terminar)
+
+
+def exportar_metricas():
+    """
+    Texto en formato Prometheus. Con varios procesos (gunicorn) se define
+    PROMETHEUS_MULTIPROC_DIR y se agregan los valores de todos los workers.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+        return generate_latest(registro)
+    return generate_latest(REGISTRY)
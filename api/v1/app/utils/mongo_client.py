@@ -0,0 +1,48 @@
+# api/v1/app/utils/mongo_client.py
+import os
+
+import pymongo
+from flask import g, request
+
+# Variable de entorno -> opción de MongoClient. Solo se pasan las definidas,
+# así las opciones de la URI y los valores por defecto del driver siguen valiendo.
+OPCIONES_CLIENTE = {
+    "MONGO_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGO_MIN_POOL_SIZE": "minPoolSize",
+    "MONGO_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+    "MONGO_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGO_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+}
+
+# Vistas en streaming: pueden durar más que cualquier límite por petición
+VISTAS_SIN_LIMITE = {"exportar", "reports_stream"}
+
+
+def opciones_cliente():
+    return {opcion: int(os.environ[variable]) for variable, opcion in OPCIONES_CLIENTE.items() if os.getenv(variable)}
+
+
+def _iniciar_limite(segundos):
+    if request.endpoint and request.endpoint.rsplit(".", 1)[-1] in VISTAS_SIN_LIMITE:
+        return
+    g.limite_mongo = pymongo.timeout(segundos)
+    g.limite_mongo.__enter__()
+
+
+def _terminar_limite(error=None):
+    limite = g.pop("limite_mongo", None)
+    if limite is not None:
+        limite.__exit__(None, None, None)
+
+
+def configurar_limite_consultas(app, ms):
+    """
+    MONGO_MAX_TIME_MS: tiempo máximo de todas las operaciones de MongoDB de una
+    petición (pymongo.timeout: el driver envía maxTimeMS con lo que quede del
+    plazo y corta la espera de conexiones del pool). Sin valor, no hay límite.
+    """
+    if not ms:
+        return
+    app.before_request(lambda: _iniciar_limite(ms / 1000))
+    app.teardown_request(_terminar_limite)
@@ -0,0 +1,164 @@
+# api/v1/app/utils/pagination.py
+import base64
+
+from bson import json_util
+from bson.objectid import ObjectId
+
+LIMITE_POR_DEFECTO = 10
+LIMITE_MAXIMO = 500
+
+
+def leer_paginacion(args, orden=None):
+    """
+    Lee los parámetros de paginación de la query string:
+      ?limit=<n>&after=<cursor>&total=1
+    Retorna None si la petición no pide paginación (se mantiene el listado completo).
+    Lanza ValueError si los parámetros no son válidos o el cursor es de otro orden.
+    """
+    if "limit" not in args and "after" not in args:
+        return None
+
+    limit = int(args.get("limit", LIMITE_POR_DEFECTO))
+    if limit <= 0:
+        raise ValueError("limit debe ser mayor que 0")
+
+    after = args.get("after") or None
+    if after is not None:
+        filtro_pagina(after, orden)
+
+    return {
+        "limit": min(limit, LIMITE_MAXIMO),
+        "after": after,
+        "con_total": args.get("total") in ("1", "true"),
+    }
+
+
+def codificar_cursor(id_documento, valor=None, orden=None):
+    """
+    El cursor conserva el tipo BSON del _id ("o:" ObjectId, "s:" string) porque
+    MongoDB solo compara $gt dentro del mismo tipo. Con un orden por otro campo
+    el cursor ("k:") lleva el valor de ese campo y el _id, en Extended JSON para
+    no perder el tipo (fechas, números).
+    """
+    if orden is not None and orden[0] != "_id":
+        clave = json_util.dumps([valor, id_documento]).encode("utf-8")
+        return "k:" + base64.urlsafe_b64encode(clave).decode("ascii").rstrip("=")
+    if isinstance(id_documento, ObjectId):
+        return "o:" + str(id_documento)
+    return "s:" + str(id_documento)
+
+
+def decodificar_cursor(cursor):
+    tipo, _, valor = cursor.partition(":")
+    if tipo == "o" and ObjectId.is_valid(valor):
+        return ObjectId(valor)
+    if tipo == "s" and valor:
+        return valor
+    if tipo == "k" and valor:
+        try:
+            clave = json_util.loads(base64.urlsafe_b64decode(valor + "=" * (-len(valor) % 4)))
+        except Exception:
+            raise ValueError("Cursor inválido")
+        if isinstance(clave, list) and len(clave) == 2:
+            return tuple(clave)
+    raise ValueError("Cursor inválido")
+
+
+def filtro_pagina(after, orden=None):
+    if after is None:
+        return {}
+    valor = decodificar_cursor(after)
+    if orden is not None and orden[0] != "_id":
+        if not isinstance(valor, tuple):
+            raise ValueError("Cursor inválido para este orden")
+        return _filtro_despues_de(orden, *valor)
+    if isinstance(valor, tuple):
+        raise ValueError("Cursor inválido para este orden")
+    if orden is not None:
+        # _id descendente: los ObjectId van después de los strings en el orden BSON,
+        # así que al recorrer hacia atrás se termina con los strings.
+        if isinstance(valor, ObjectId):
+            return {"$or": [{"_id": {"$lt": valor}}, {"_id": {"$type": "string"}}]}
+        return {"_id": {"$lt": valor}}
+    if isinstance(valor, ObjectId):
+        return {"_id": {"$gt": valor}}
+    # En el orden BSON los strings van antes que los ObjectId: al terminar los ids
+    # string se continúa con los ObjectId.
+    return {"$or": [{"_id": {"$gt": valor}}, {"_id": {"$type": "objectId"}}]}
+
+
+def _filtro_despues_de(orden, valor, id_documento):
+    """
+    Documentos posteriores a (valor, _id) en el orden { campo: dir, _id: dir }.
+    Los documentos sin el campo (null) van primero en orden ascendente y al final
+    en descendente. El desempate por _id supone ids de un solo tipo (ver DataBase/normalize_ids.py).
+    """
+    campo, direccion = orden
+    mayor = "$gt" if direccion == 1 else "$lt"
+    mismo_valor = {campo: valor, "_id": {mayor: id_documento}}
+    if valor is None:
+        if direccion == 1:
+            return {"$or": [mismo_valor, {campo: {"$ne": None}}]}
+        return mismo_valor
+    condiciones = [{campo: {mayor: valor}}, mismo_valor]
+    if direccion == -1:
+        condiciones.append({campo: None})
+    return {"$or": condiciones}
+
+
+def combinar_filtros(*filtros):
+    filtros = [f for f in filtros if f]
+    if not filtros:
+        return {}
+    return filtros[0] if len(filtros) == 1 else {"$and": filtros}
+
+
+def orden_find(orden):
+    # Lista para .sort(): el _id desempata siempre en la misma dirección
+    if orden is None:
+        return [("_id", 1)]
+    campo, direccion = orden
+    if campo == "_id":
+        return [("_id", direccion)]
+    return [(campo, direccion), ("_id", direccion)]
+
+
+def proyeccion_con_orden(proyeccion, orden):
+    # El cursor necesita el campo de orden aunque ?fields no lo pida
+    if proyeccion and orden is not None and any(v for v in proyeccion.values()):
+        return {**proyeccion, orden[0]: 1}
+    return proyeccion
+
+
+def paginar(coleccion, limit, after=None, con_total=False, proyeccion=None, filtro=None, orden=None):
+    """
+    Paginación keyset ordenada por _id (o por orden=(campo, dir) con _id de
+    desempate) dentro de filtro. Solo se leen limit + 1 documentos (el extra
+    indica si hay página siguiente), sin skip.
+    Retorna { items, next_cursor, limit[, total_estimate] }.
+    """
+    consulta = combinar_filtros(filtro, filtro_pagina(after, orden))
+    docs = list(
+        coleccion.find(consulta, proyeccion_con_orden(proyeccion, orden)).sort(orden_find(orden)).limit(limit + 1)
+    )
+    pagina = armar_pagina(docs, limit, orden)
+    if con_total:
+        # Sin filtro: conteo estimado a partir de los metadatos de la colección (no recorre
+        # documentos). Con filtro: count_documents sobre el índice del filtro.
+        pagina["total_estimate"] = coleccion.count_documents(filtro) if filtro else coleccion.estimated_document_count()
+    return pagina
+
+
+def armar_pagina(docs, limit, orden=None):
+    """
+    docs: hasta limit + 1 documentos en el orden de la página.
+    """
+    hay_mas = len(docs) > limit
+    docs = docs[:limit]
+
+    next_cursor = None
+    if hay_mas:
+        ultimo = docs[-1]
+        valor = ultimo.get(orden[0]) if orden is not None else None
+        next_cursor = codificar_cursor(ultimo["_id"], valor, orden)
+    return {"items": docs, "next_cursor": next_cursor, "limit": limit}
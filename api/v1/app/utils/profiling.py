@@ -0,0 +1,225 @@
+# api/v1/app/utils/profiling.py
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from pymongo import monitoring
+
+# Campos de cada comando que se repiten en el explain (el resto son de sesión/transporte: lsid, $db, $clusterTime...)
+CAMPOS_EXPLICABLES = {
+    "find": {"find", "filter", "sort", "projection", "hint", "skip", "limit", "collation", "let", "min", "max"},
+    "aggregate": {"aggregate", "pipeline", "cursor", "allowDiskUse", "collation", "hint", "let"},
+}
+
+
+class SlowQueryProfiler(monitoring.CommandListener):
+    """
+    Modo de perfilado: cada find o aggregate que tarda más de umbral_ms se repite
+    con explain("executionStats") y se guarda un resumen del plan con alertas:
+      - COLLSCAN en la consulta o dentro de un $lookup
+      - $lookup cuyo foreignField no tiene índice en la colección destino
+      - $lookup con pipeline que convierte ids ($toString / $toObjectId): no puede usar índices
+    Las consultas se agrupan por forma (el comando con los valores reemplazados por "?"),
+    así una misma consulta lenta se explica una sola vez aunque se repita.
+
+    El listener no puede enviar comandos al servidor: las consultas lentas se encolan
+    y un hilo aparte corre los explain. Con sincronico=True (CLI) no se inicia el hilo:
+    quien perfila llama a procesar_pendientes(). Desactivado, el costo es un if por comando.
+    """
+
+    def __init__(self, umbral_ms=100, max_entradas=100):
+        self.activo = False
+        self.sincronico = False
+        self.umbral_ms = umbral_ms
+        self.max_entradas = max_entradas
+        self.cliente = None
+        self._comandos = {}
+        self._entradas = OrderedDict()
+        self._pendientes = queue.Queue(maxsize=100)
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def configurar(self, cliente=None, activo=None, umbral_ms=None, max_entradas=None, sincronico=None):
+        if cliente is not None:
+            self.cliente = cliente
+        if activo is not None:
+            self.activo = activo
+        if sincronico is not None:
+            self.sincronico = sincronico
+        if umbral_ms is not None:
+            self.umbral_ms = umbral_ms
+        if max_entradas is not None:
+            self.max_entradas = max_entradas
+
+    # ---- eventos del driver ----
+
+    def started(self, event):
+        if self.activo and event.command_name in CAMPOS_EXPLICABLES:
+            self._comandos[(event.connection_id, event.request_id)] = (event.database_name, event.command)
+
+    def succeeded(self, event):
+        capturado = self._comandos.pop((event.connection_id, event.request_id), None)
+        if capturado and event.duration_micros >= self.umbral_ms * 1000:
+            self._encolar(capturado[0], capturado[1], event.duration_micros / 1000)
+
+    def failed(self, event):
+        self._comandos.pop((event.connection_id, event.request_id), None)
+
+    # ---- captura ----
+
+    def _encolar(self, base, comando, duracion_ms):
+        try:
+            self._pendientes.put_nowait((base, comando, duracion_ms))
+        except queue.Full:
+            return
+        if self.sincronico:
+            return
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._procesar_siempre, name="slow-queries", daemon=True)
+                self._hilo.start()
+
+    def _procesar_siempre(self):
+        while True:
+            self._analizar(*self._pendientes.get())
+
+    def procesar_pendientes(self):
+        # Modo sincronico (CLI): analiza lo encolado hasta el momento en este hilo
+        while True:
+            try:
+                pendiente = self._pendientes.get_nowait()
+            except queue.Empty:
+                return
+            self._analizar(*pendiente)
+
+    def _analizar(self, base, comando, duracion_ms):
+        nombre = next(iter(comando))
+        comando = {k: v for k, v in comando.items() if k in CAMPOS_EXPLICABLES[nombre]}
+        forma = json.dumps(_forma(comando), sort_keys=True, default=str)
+
+        with self._lock:
+            entrada = self._entradas.get(forma)
+            if entrada:
+                entrada["conteo"] += 1
+                entrada["ultima_ms"] = duracion_ms
+                entrada["max_ms"] = max(entrada["max_ms"], duracion_ms)
+                entrada["visto"] = time.time()
+                self._entradas.move_to_end(forma)
+                return
+
+        entrada = {
+            "comando": nombre,
+            "coleccion": comando[nombre],
+            "base": base,
+            "consulta": comando,
+            "conteo": 1,
+            "ultima_ms": duracion_ms,
+            "max_ms": duracion_ms,
+            "visto": time.time(),
+        }
+        pipeline = comando.get("pipeline", [])
+        if any("$out" in etapa or "$merge" in etapa for etapa in pipeline):
+            # explain con executionStats volvería a escribir la colección de salida
+            entrada.update({"plan": None, "alertas": ["pipeline con $out/$merge: sin explain"]})
+        else:
+            try:
+                explain = self.cliente[base].command({"explain": comando, "verbosity": "executionStats"})
+                entrada.update(_resumir(explain))
+                entrada["alertas"] = _alertas(explain, pipeline, self.cliente[base])
+            except Exception as e:
+                entrada.update({"plan": None, "alertas": [f"explain falló: {e}"]})
+
+        with self._lock:
+            self._entradas[forma] = entrada
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    # ---- consulta ----
+
+    def entradas(self):
+        # Más lentas primero
+        with self._lock:
+            return sorted(self._entradas.values(), key=lambda e: e["max_ms"], reverse=True)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+def _forma(valor):
+    if isinstance(valor, dict):
+        return {k: _forma(v) for k, v in valor.items()}
+    if isinstance(valor, list) and any(isinstance(v, (dict, list)) for v in valor):
+        return [_forma(v) for v in valor]
+    return "?"
+
+
+def _buscar(documento, clave):
+    # Primer valor de clave en cualquier nivel del explain (find y aggregate lo anidan distinto)
+    if isinstance(documento, dict):
+        if clave in documento:
+            return documento[clave]
+        documento = list(documento.values())
+    if isinstance(documento, list):
+        for valor in documento:
+            encontrado = _buscar(valor, clave)
+            if encontrado is not None:
+                return encontrado
+    return None
+
+
+def _etapas(documento, encontradas=None):
+    # Todas las etapas de los planes ("IXSCAN", "FETCH", "COLLSCAN", ...)
+    encontradas = [] if encontradas is None else encontradas
+    if isinstance(documento, dict):
+        if isinstance(documento.get("stage"), str):
+            encontradas.append(documento["stage"])
+        for valor in documento.values():
+            _etapas(valor, encontradas)
+    elif isinstance(documento, list):
+        for valor in documento:
+            _etapas(valor, encontradas)
+    return encontradas
+
+
+def _resumir(explain):
+    estadisticas = _buscar(explain, "executionStats") or {}
+    return {
+        "plan": _etapas(_buscar(explain, "winningPlan") or {}),
+        "n_devueltos": estadisticas.get("nReturned"),
+        "docs_examinados": estadisticas.get("totalDocsExamined"),
+        "claves_examinadas": estadisticas.get("totalKeysExamined"),
+        "tiempo_explain_ms": estadisticas.get("executionTimeMillis"),
+    }
+
+
+def _alertas(explain, pipeline, db):
+    alertas = []
+    if "COLLSCAN" in _etapas(_buscar(explain, "winningPlan") or {}):
+        alertas.append("COLLSCAN")
+
+    # MongoDB 5+ informa por cada $lookup cuántas búsquedas recorrieron la colección completa
+    for etapa in explain.get("stages", []):
+        if "$lookup" in etapa and etapa.get("collectionScans"):
+            alertas.append(f"$lookup a {etapa['$lookup'].get('from')}: {etapa['collectionScans']} COLLSCAN")
+
+    indices = {}
+    for etapa in pipeline:
+        lookup = etapa.get("$lookup")
+        if not lookup:
+            continue
+        destino = lookup.get("from")
+        if "pipeline" in lookup and any(op in json.dumps(lookup["pipeline"], default=str) for op in ("$toString", "$toObjectId")):
+            alertas.append(f"$lookup a {destino} convierte ids ($toString/$toObjectId): no usa índices")
+        campo = lookup.get("foreignField")
+        if campo and campo != "_id":
+            if destino not in indices:
+                indices[destino] = [next(iter(i["key"]))[0] for i in db[destino].index_information().values()]
+            if campo not in indices[destino]:
+                alertas.append(f"$lookup a {destino}: {campo} no tiene índice")
+    return alertas
+
+
+slow_queries = SlowQueryProfiler()
@@ -0,0 +1,20 @@
+# api/v1/app/utils/projection.py
+import re
+
+# Nombres de campo aceptados en ?fields= (también rutas con punto: address.city)
+CAMPO_VALIDO = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+def leer_campos(args):
+    """
+    Lee ?fields=a,b,c y arma la proyección de find(): { a: 1, b: 1, c: 1 }.
+    MongoDB incluye siempre el _id (lo necesita la paginación por cursor).
+    Retorna None si no se pide (cada modelo aplica su proyección por defecto).
+    Lanza ValueError si algún campo no es válido.
+    """
+    if "fields" not in args:
+        return None
+    campos = [c.strip() for c in args["fields"].split(",") if c.strip()]
+    if not campos or not all(CAMPO_VALIDO.match(c) for c in campos):
+        raise ValueError("fields inválido")
+    return {c: 1 for c in campos}
@@ -0,0 +1,412 @@
+"""
+Benchmark de la API y de los pipelines de reportes.
+
+Carga la base de benchmark con varios tamaños de datos (DataBase/generate.py), mide
+latencia (p50/p90/p95/p99) y throughput de cada ruta de los blueprints con el cliente
+de pruebas de Flask y de cada método de ReportsModel llamado directamente, y guarda
+los resultados en JSON. Una respuesta con el estado esperado pero sin datos (los
+modelos atrapan sus errores y retornan []) cuenta como error; la corrida termina con
+código 1 si hubo errores, o si con --baseline algún p95 empeora más que --threshold.
+Con --memoria, las consultas que mongomock no soporta se marcan como omitidas.
+
+    python benchmark.py --sizes 1000,10000,100000 --output bench.json
+    python benchmark.py --sizes 10000 --baseline bench.json --threshold 0.2
+    python benchmark.py --memoria          # mongomock en lugar de mongod
+
+¡Borra y vuelve a cargar la base indicada en --uri! No apuntar a la base real.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import json_util
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "DataBase"))
+
+URI_POR_DEFECTO = "mongodb://localhost:27017/clothing-store-bench"
+
+COLECCIONES = ["brands", "clothing", "users", "sales"]
+
+LOTE_CARGA = 5000
+
+
+def leer_argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark de rutas y reportes de la API.")
+    parser.add_argument("--uri", default=os.getenv("BENCH_MONGO_URI", URI_POR_DEFECTO))
+    parser.add_argument("--memoria", action="store_true", help="Usar mongomock (en memoria) en lugar de mongod")
+    parser.add_argument("--sizes", default="1000,10000", help="Cantidades de ventas a cargar, separadas por coma")
+    parser.add_argument("--sin-carga", action="store_true", help="Medir los datos que ya están en la base (un solo tamaño)")
+    parser.add_argument("--iteraciones", type=int, default=100)
+    parser.add_argument("--calentamiento", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Regresión máxima tolerada del p95 (0.2 = 20%%)")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="Diferencias de p95 menores a esto se ignoran")
+    return parser.parse_args()
+
+
+# ---- conexión y carga de datos ----
+
+def crear_app(args):
+    if args.memoria:
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit("--memoria requiere mongomock (pip install mongomock)")
+        # Sin mongod: create_app no debe quedarse esperando al crear los índices
+        os.environ["MONGO_URI"] = URI_POR_DEFECTO + "?serverSelectionTimeoutMS=1"
+    else:
+        os.environ["MONGO_URI"] = args.uri
+
+    from app.index import create_app, mongo
+    app = create_app()
+
+    if args.memoria:
+        mongo.cx = mongomock.MongoClient()
+        mongo.db = mongo.cx["clothing-store-bench"]
+    return app
+
+
+def dimensiones(ventas):
+    # Proporciones parecidas a producción: pocas marcas, catálogo mediano, muchos usuarios
+    return {
+        "brands": max(10, ventas // 1000),
+        "clothing": max(50, ventas // 50),
+        "users": max(100, ventas // 10),
+        "sales": ventas,
+    }
+
+
+def cargar(db, ventas, seed):
+    import generate
+    from app.indexes import asegurar_indices
+    from app.models.rollups import RollupsModel, ROLLUP_PRENDAS, ROLLUP_MARCAS, ROLLUP_ESTADO
+
+    totales = dimensiones(ventas)
+    hasta = datetime(2025, 1, 1)
+    generate.iniciar_proceso({
+        "seed": seed, "brands": totales["brands"], "clothing": totales["clothing"], "users": totales["users"],
+        "skew": 1.1, "desde": hasta - timedelta(days=365), "hasta": hasta,
+    })
+
+    for nombre in COLECCIONES + [ROLLUP_PRENDAS, ROLLUP_MARCAS, ROLLUP_ESTADO]:
+        db[nombre].drop()
+    for nombre in COLECCIONES:
+        generar = generate.GENERADORES[nombre]
+        for inicio in range(0, totales[nombre], LOTE_CARGA):
+            rng = generate.random.Random(f"{seed}:{nombre}:{inicio}")
+            fin = min(inicio + LOTE_CARGA, totales[nombre])
+            db[nombre].insert_many([generar(n, rng) for n in range(inicio, fin)], ordered=False)
+
+    asegurar_indices(db)
+    RollupsModel.reconstruir()
+    return totales
+
+
+# ---- medición ----
+
+def estadisticas(tiempos, total, errores):
+    ordenados = sorted(tiempos)
+
+    def percentil(p):
+        return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)] * 1000
+
+    return {
+        "n": len(ordenados),
+        "errores": errores,
+        "media_ms": sum(ordenados) / len(ordenados) * 1000,
+        "min_ms": ordenados[0] * 1000,
+        "p50_ms": percentil(50),
+        "p90_ms": percentil(90),
+        "p95_ms": percentil(95),
+        "p99_ms": percentil(99),
+        "max_ms": ordenados[-1] * 1000,
+        "throughput_rps": len(ordenados) / total if total else None,
+    }
+
+
+def medir(funcion, iteraciones, calentamiento, antes=None):
+    """
+    funcion(i) -> True si la llamada fue correcta. antes(i), si se indica, corre
+    fuera del tiempo medido (p. ej. invalidar la caché o crear el documento a borrar).
+    """
+    for i in range(calentamiento):
+        if antes:
+            antes(-1 - i)
+        funcion(-1 - i)
+
+    tiempos = []
+    errores = 0
+    inicio_total = time.perf_counter()
+    for i in range(iteraciones):
+        if antes:
+            antes(i)
+        inicio = time.perf_counter()
+        ok = funcion(i)
+        tiempos.append(time.perf_counter() - inicio)
+        if not ok:
+            errores += 1
+    return estadisticas(tiempos, time.perf_counter() - inicio_total, errores)
+
+
+def medir_validado(args, funcion, iteraciones, calentamiento, antes=None):
+    """
+    medir() con una llamada de prueba: con --memoria, si falla, la consulta usa algo
+    que mongomock no implementa ($dateTrunc, sesiones, ...) y se marca como omitida
+    en lugar de medir un error. Contra mongod los fallos cuentan como errores.
+    """
+    if args.memoria:
+        if antes:
+            antes(-1)
+        if not funcion(-1):
+            return {"omitido": "mongomock no soporta la consulta"}
+    return medir(funcion, iteraciones, calentamiento, antes)
+
+
+def filas_con(*claves):
+    # Lista no vacía cuyas filas traen las claves indicadas
+    def validar(data):
+        return isinstance(data, list) and bool(data) and all(isinstance(f, dict) and all(c in f for c in claves) for f in data)
+    return validar
+
+
+def combinado_valido(data):
+    return (isinstance(data, dict)
+            and filas_con("name", "sales_count")(data.get("brands_with_sales"))
+            and filas_con("item_id", "sold", "remaining")(data.get("items_sold"))
+            and filas_con("name", "sales_count")(data.get("top5_brands")))
+
+
+def pagina_valida(data):
+    return isinstance(data, dict) and bool(data.get("items"))
+
+
+# Validación de cada reporte (por ruta y por método de ReportsModel)
+REPORTES = {
+    "/reports": ("obtener_todos_combinado", combinado_valido),
+    "/reports/marcas": ("obtener_marcas_con_ventas", filas_con("brand", "ventas")),
+    "/reports/prendas": ("obtener_prendas_vendidas_stock", filas_con("item_id", "sold", "remaining")),
+    "/reports/top5": ("obtener_top5_marcas", filas_con("brand", "ventas")),
+    "/reports/ventas?from=2024-01-01&to=2025-01-01&group=brand": ("obtener_ventas_por_periodo", filas_con("bucket", "key", "ventas")),
+}
+
+
+def iteraciones_para(pesado, args):
+    # Los listados completos y exportaciones recorren toda la colección: menos vueltas
+    return max(3, args.iteraciones // 10) if pesado else args.iteraciones
+
+
+# ---- rutas ----
+
+CUERPOS = {
+    "brands": lambda i: {"name": f"Bench {i}", "country": "Costa Rica", "founded": 2020},
+    "clothing": lambda i: {"name": f"Bench {i}", "category": "T-Shirts", "price": 10.5, "brand_id": "genbrand000000", "in_stock": 10},
+    "users": lambda i: {"name": f"Bench {i}", "email": f"bench{i}@example.com", "password": "x", "address": {"city": "San José", "country": "Costa Rica"}},
+    "sales": lambda i: {"user_id": "genuser00000000", "clothing_id": "gencloth0000000", "quantity": 1, "date": datetime(2024, 6, 1)},
+}
+
+CAMBIOS = {
+    "brands": {"country": "USA"},
+    "clothing": {"price": 11.5},
+    "users": {"name": "Bench editado"},
+    "sales": {"quantity": 2},
+}
+
+
+def peticion(client, metodo, ruta, esperado=200, validar=None):
+    def llamar(i):
+        respuesta = client.open(ruta, method=metodo)
+        respuesta.get_data()
+        if respuesta.status_code != esperado:
+            return False
+        return validar is None or validar(respuesta.get_json(silent=True))
+    return llamar
+
+
+def medir_rutas(client, args):
+    from app.index import mongo
+    from app.utils.cache import report_cache, COLECCIONES_REPORTES
+
+    base = "/api/v1/admin"
+    resultados = {}
+
+    for coleccion in COLECCIONES:
+        ruta = f"{base}/{coleccion}"
+        primero = client.get(f"{ruta}?limit=1").get_json()["items"][0]["_id"]
+
+        resultados[f"GET /{coleccion}"] = medir(peticion(client, "GET", ruta), iteraciones_para(True, args), 1)
+        resultados[f"GET /{coleccion}?limit=50"] = medir(
+            peticion(client, "GET", f"{ruta}?limit=50", validar=pagina_valida), args.iteraciones, args.calentamiento
+        )
+        resultados[f"GET /{coleccion}?id"] = medir(peticion(client, "GET", f"{ruta}?id={primero}"), args.iteraciones, args.calentamiento)
+        resultados[f"GET /{coleccion}/export"] = medir(peticion(client, "GET", f"{ruta}/export?format=ndjson"), iteraciones_para(True, args), 1)
+
+        # POST crea los documentos que después se editan y se borran
+        creados = {}
+
+        def crear(i, ruta=ruta, coleccion=coleccion, creados=creados):
+            respuesta = client.post(ruta, data=json_util.dumps(CUERPOS[coleccion](i)), content_type="application/json")
+            creados[i] = (respuesta.get_json() or {}).get("id")
+            return respuesta.status_code == 201
+
+        resultados[f"POST /{coleccion}"] = medir(crear, args.iteraciones, args.calentamiento)
+
+        # El cambio alterna valores para que cada PUT modifique el documento
+        def actualizar(i, ruta=ruta, coleccion=coleccion, creados=creados):
+            campo, valor = next(iter(CAMBIOS[coleccion].items()))
+            cuerpo = {campo: f"{valor}-{i}" if isinstance(valor, str) else valor + (i % 2)}
+            respuesta = client.put(f"{ruta}?id={creados[i]}", data=json_util.dumps(cuerpo), content_type="application/json")
+            return respuesta.status_code == 200
+
+        resultados[f"PUT /{coleccion}"] = medir(actualizar, args.iteraciones, args.calentamiento)
+
+        def eliminar(i, ruta=ruta, creados=creados):
+            return client.delete(f"{ruta}?id={creados[i]}").status_code == 200
+
+        resultados[f"DELETE /{coleccion}"] = medir(eliminar, args.iteraciones, args.calentamiento)
+
+    # Checkout de una línea sobre una prenda con stock de sobra para todas las vueltas
+    prenda = CUERPOS["sales"](0)["clothing_id"]
+    mongo.db.clothing.update_one({"_id": prenda}, {"$set": {"in_stock": 10 * (args.iteraciones + args.calentamiento + 10)}})
+    carrito = json_util.dumps({"user_id": CUERPOS["sales"](0)["user_id"], "items": [{"clothing_id": prenda, "quantity": 1}]})
+
+    def checkout(i):
+        respuesta = client.post(f"{base}/sales/checkout", data=carrito, content_type="application/json")
+        return respuesta.status_code == 201
+
+    resultados["POST /sales/checkout"] = medir_validado(args, checkout, args.iteraciones, args.calentamiento)
+
+    def invalidar(_):
+        for coleccion in COLECCIONES_REPORTES:
+            report_cache.invalidar(coleccion)
+
+    for ruta, (_, validar) in REPORTES.items():
+        # Sin caché (se invalida antes de cada llamada) y con la caché caliente
+        llamar = peticion(client, "GET", base + ruta, validar=validar)
+        resultados[f"GET {ruta}"] = medir_validado(args, llamar, args.iteraciones, args.calentamiento, antes=invalidar)
+        if not ruta.startswith("/reports/ventas"):
+            resultados[f"GET {ruta} (caché)"] = medir_validado(args, llamar, args.iteraciones, args.calentamiento)
+
+    return resultados
+
+
+# ---- pipelines de ReportsModel ----
+
+def medir_reportes(args):
+    from app.models.reports import ReportsModel
+    from app.models.rollups import RollupsModel
+
+    metodos = {
+        "obtener_marcas_con_ventas": lambda: ReportsModel.obtener_marcas_con_ventas(),
+        "obtener_prendas_vendidas_stock": lambda: ReportsModel.obtener_prendas_vendidas_stock(),
+        "obtener_top5_marcas": lambda: ReportsModel.obtener_top5_marcas(),
+        "obtener_todos_combinado": lambda: ReportsModel.obtener_todos_combinado(),
+        "obtener_ventas_por_periodo": lambda: ReportsModel.obtener_ventas_por_periodo(datetime(2024, 1, 1), datetime(2025, 1, 1), "day", "brand"),
+    }
+
+    validaciones = dict(REPORTES.values())
+    resultados = {}
+    disponibles = RollupsModel.disponibles
+    try:
+        for modo in ["rollups", "agregación"]:
+            if modo == "agregación":
+                # Los mismos métodos con los rollups "vacíos": corren los pipelines sobre sales
+                RollupsModel.disponibles = staticmethod(lambda: False)
+            for nombre, metodo in metodos.items():
+                llamar = lambda i, metodo=metodo, validar=validaciones[nombre]: validar(metodo())
+                resultados[f"ReportsModel.{nombre} ({modo})"] = medir_validado(args, llamar, args.iteraciones, args.calentamiento)
+    finally:
+        RollupsModel.disponibles = disponibles
+    return resultados
+
+
+# ---- comparación ----
+
+def comparar(actual, baseline, threshold, min_ms):
+    """
+    Retorna la lista de regresiones [(tamaño, nombre, p95 base, p95 actual)].
+    Solo se comparan las mediciones presentes en ambas corridas.
+    """
+    regresiones = []
+    for tamano, mediciones in actual["resultados"].items():
+        base = baseline.get("resultados", {}).get(tamano, {})
+        for nombre, stats in mediciones.items():
+            if "p95_ms" not in stats or "p95_ms" not in base.get(nombre, {}):
+                continue
+            antes, ahora = base[nombre]["p95_ms"], stats["p95_ms"]
+            if ahora - antes > min_ms and ahora > antes * (1 + threshold):
+                regresiones.append((tamano, nombre, antes, ahora))
+    return regresiones
+
+
+def imprimir(tamano, resultados):
+    print(f"\n--- {tamano} VENTAS ---")
+    print(f"{'medición':<66} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>9} {'err':>4}")
+    for nombre, s in resultados.items():
+        if "omitido" in s:
+            print(f"{nombre:<66} omitido: {s['omitido']}")
+            continue
+        print(f"{nombre:<66} {s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f} {s['throughput_rps']:>9.1f} {s['errores']:>4}")
+
+
+def main():
+    args = leer_argumentos()
+    app = crear_app(args)
+    client = app.test_client()
+
+    from app.index import mongo
+
+    corrida = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "motor": "mongomock" if args.memoria else "mongod",
+        "iteraciones": args.iteraciones,
+        "resultados": {},
+    }
+
+    if args.sin_carga:
+        tamanos = [mongo.db.sales.estimated_document_count()]
+    else:
+        tamanos = [int(t) for t in args.sizes.split(",")]
+
+    for tamano in tamanos:
+        if not args.sin_carga:
+            print(f"\n➡️ Cargando {tamano} ventas...")
+            cargar(mongo.db, tamano, args.seed)
+        resultados = medir_rutas(client, args)
+        resultados.update(medir_reportes(args))
+        corrida["resultados"][str(tamano)] = resultados
+        imprimir(tamano, resultados)
+
+    with open(args.output, "w", encoding="utf-8") as archivo:
+        json.dump(corrida, archivo, indent=2, ensure_ascii=False)
+    print(f"\n✔️ Resultados guardados en {args.output}")
+
+    fallidas = [
+        (tamano, nombre, s["errores"])
+        for tamano, resultados in corrida["resultados"].items()
+        for nombre, s in resultados.items() if s.get("errores")
+    ]
+    for tamano, nombre, errores in fallidas:
+        print(f"❌ [{tamano}] {nombre}: {errores} errores")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as archivo:
+            baseline = json.load(archivo)
+        regresiones = comparar(corrida, baseline, args.threshold, args.min_ms)
+        for tamano, nombre, antes, ahora in regresiones:
+            print(f"⚠️ [{tamano}] {nombre}: p95 {antes:.2f} ms -> {ahora:.2f} ms")
+        if regresiones:
+            sys.exit(1)
+        print(f"✔️ Sin regresiones mayores a {args.threshold:.0%} respecto de {args.baseline}")
+
+    if fallidas:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
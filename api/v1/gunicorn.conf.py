@@ -0,0 +1,54 @@
+# api/v1/gunicorn.conf.py
+"""
+Modo producción (desde api/v1):
+    gunicorn -c gunicorn.conf.py run:app
+
+Varios procesos (WEB_CONCURRENCY) con varios hilos cada uno (GUNICORN_THREADS).
+Cada worker importa run.py después del fork, así create_app crea un MongoClient
+propio por proceso (un MongoClient no se puede usar en un proceso hijo).
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+preload_app = False
+
+# timeout: un worker que no responde en este tiempo se reinicia.
+# graceful_timeout: al recibir SIGTERM cada worker deja de aceptar conexiones y
+# tiene este plazo para terminar las peticiones en curso (los streams SSE se cortan al final).
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+
+# Con varios procesos, las versiones de la caché (invalidación de reportes y ETag de
+# listados) tienen que ser compartidas: se guardan en MongoDB.
+os.environ.setdefault("REPORT_CACHE_BACKEND", "app.utils.cache:MongoVersionBackend")
+# La caché de documentos por _id es de cada worker: las invalidaciones se reparten
+# por una colección capped.
+os.environ.setdefault("DOCUMENT_CACHE_INVALIDATION", "app.utils.cache:MongoInvalidationChannel")
+
+# Cada worker arma su índice de búsqueda al iniciar en vez de con la primera búsqueda
+os.environ.setdefault("SEARCH_WARMUP", "1")
+
+
+def worker_exit(server, worker):
+    # Escribe las ventas que quedan en el buffer de ingesta y cierra el pool de
+    # conexiones del worker al terminar (SIGTERM, max_requests)
+    from app.models.sales_ingest import sales_ingest
+    sales_ingest.detener()
+    from app.index import mongo
+    if mongo.cx is not None:
+        mongo.cx.close()
+
+
+def child_exit(server, worker):
+    # Métricas multiproceso: quitar los gauges del worker que terminó
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,8 @@
+import os
+from app.aio.index import create_async_app
+
+app = create_async_app()
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("run_async:app", host="127.0.0.1", port=5000, workers=int(os.getenv("WEB_CONCURRENCY", "1")))